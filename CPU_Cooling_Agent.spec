@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('requirements.txt', '.')],
-    hiddenimports=['sklearn.linear_model', 'sklearn.utils._typedefs', 'sklearn.utils._heap', 'sklearn.utils._sorting', 'sklearn.utils._vector_sentinel', 'wmi', 'comtypes', 'win32com.client'],
+    hiddenimports=['wmi', 'comtypes', 'win32com.client'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,73 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+
+class AdaptiveInterval:
+    """Picks the sampling interval from how close the CPU is to trouble.
+
+    The interval tightens at once, down to `min_interval`, as the
+    temperature (or the forecast for it) comes within `approach_margin` °C
+    of the warning threshold, or when the measured slope would reach the
+    threshold in fewer than `samples_to_warning` samples at the base
+    interval. It loosens gradually, by `growth` per sample, and only goes
+    past `base_interval` (up to `max_interval`) while the machine runs on
+    battery and the temperature has held within `stable_slope` °C/s for
+    `stable_time` seconds, well below the threshold. On mains power a calm
+    machine samples at the base interval.
+    """
+
+    def __init__(self, base_interval=1.0, min_interval=0.2, max_interval=10.0, approach_margin=5.0,
+                 stable_slope=0.02, stable_time=30.0, samples_to_warning=20, growth=1.5, smoothing=0.3):
+        if not 0 < min_interval <= base_interval <= max_interval:
+            raise ValueError("Sampling intervals must satisfy 0 < min <= base <= max")
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.approach_margin = approach_margin  # °C below the warning threshold where sampling tightens
+        self.stable_slope = stable_slope  # °C/s counted as flat
+        self.stable_time = stable_time  # Seconds the temperature must stay flat before slowing down
+        self.samples_to_warning = samples_to_warning
+        self.growth = growth  # Largest factor the interval grows by per sample
+        self.smoothing = smoothing  # EWMA weight of the newest slope
+        self.reset()
+
+    def reset(self):
+        self.interval = self.base_interval
+        self.slope = 0.0  # Smoothed dT/dt, °C/s
+        self._last = None  # (timestamp, temperature)
+        self._stable_since = None
+
+    def update(self, timestamp, temp, warning_threshold, predicted=None, on_battery=False):
+        """Feed one sample and return the interval until the next one.
+
+        `predicted` is a forecast temperature (any horizon a few seconds
+        ahead), used to tighten before the slope shows the rise.
+        """
+        last, self._last = self._last, (timestamp, temp)
+        if last is not None and timestamp > last[0]:
+            rate = (temp - last[1]) / (timestamp - last[0])
+            self.slope += self.smoothing * (rate - self.slope)
+
+        headroom = warning_threshold - max(temp, temp if predicted is None else predicted)
+        if headroom <= self.approach_margin:
+            self._stable_since = None
+            self.interval = self.min_interval
+            return self.interval
+
+        target = self.base_interval
+        if self.slope > 0:
+            # Enough samples to see the rise before it crosses the threshold
+            target = min(target, headroom / self.slope / self.samples_to_warning)
+        if abs(self.slope) > self.stable_slope:
+            self._stable_since = None
+        elif self._stable_since is None:
+            self._stable_since = timestamp
+        elif (on_battery and timestamp - self._stable_since >= self.stable_time
+              and headroom > 2 * self.approach_margin):
+            target = self.max_interval
+
+        target = min(self.max_interval, max(self.min_interval, target))
+        # Tighten at once, relax step by step so one calm reading does not stretch the gap
+        self.interval = target if target <= self.interval else min(target, self.interval * self.growth)
+        return self.interval
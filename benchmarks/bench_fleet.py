@@ -0,0 +1,180 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+"""Load benchmark for the fleet collector over loopback.
+
+Starts a FleetCollector in this process and load-generator processes that
+impersonate `--hosts` agents, each sending `--rate` samples per second in
+batches of `--batch` over UDP or TCP. While the load runs, the main thread
+times hottest() and history() queries against the live collector.
+
+Reports the offered and ingested sample rates, packets lost, and
+p50/p99/max query latency.
+
+Run from the repository root:
+    python benchmarks/bench_fleet.py --hosts 500 --rate 10 --batch 10 --duration 10 --transport udp
+
+Exits with status 1 when more than --max-loss of the offered samples were
+not ingested, so it can gate CI.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fleet_telemetry import _FRAME, FLEET_DTYPE, FleetCollector, encode_packet  # noqa: E402
+
+
+def synthetic_records(batch, seed):
+    rng = np.random.default_rng(seed)
+    records = np.zeros(batch, dtype=FLEET_DTYPE)
+    records["temperature"] = 40 + rng.normal(0, 8)
+    records["usage"] = rng.uniform(0, 100, batch)
+    records["power"] = records["usage"] * 0.5
+    records["fan_speed"] = 50
+    records["health"] = 90
+    return records
+
+
+def generate_load(port, transport, hosts, rate, batch, duration, sent):
+    """Send `rate` samples/s for each host id in `hosts` until `duration` seconds have passed."""
+    if transport == "udp":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.connect(("127.0.0.1", port))
+        send = sock.send
+    else:
+        sock = socket.create_connection(("127.0.0.1", port))
+        send = sock.sendall
+    records = {host: synthetic_records(batch, i) for i, host in enumerate(hosts)}
+    period = batch / rate  # Each host sends one batch per period
+    start = time.monotonic()
+    seq = 0
+    count = 0
+    round_index = 0
+    while time.monotonic() - start < duration:
+        now = time.time()
+        packets = []
+        for host in hosts:
+            host_records = records[host]
+            host_records["timestamp"] = now + np.arange(batch) * (1.0 / rate)
+            packet = encode_packet(host, seq, host_records)
+            packets.append(packet if transport == "udp" else _FRAME.pack(len(packet)) + packet)
+        if transport == "udp":
+            for packet in packets:
+                send(packet)
+        else:
+            send(b"".join(packets))
+        count += len(hosts) * batch
+        seq += 1
+        round_index += 1
+        delay = start + round_index * period - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    sock.close()
+    with sent.get_lock():
+        sent.value += count
+
+
+def percentiles(times_ns):
+    us = np.asarray(times_ns, dtype=np.float64) / 1000.0
+    if not len(us):
+        return {"calls": 0}
+    return {
+        "calls": len(us),
+        "p50_us": float(np.percentile(us, 50)),
+        "p99_us": float(np.percentile(us, 99)),
+        "max_us": float(us.max()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fleet collector load benchmark")
+    parser.add_argument("--hosts", type=int, default=500, help="Simulated agents")
+    parser.add_argument("--rate", type=float, default=10.0, help="Samples per second per host")
+    parser.add_argument("--batch", type=int, default=10, help="Samples per packet")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--senders", type=int, default=4, help="Load generator processes")
+    parser.add_argument("--transport", choices=["udp", "tcp"], default="udp")
+    parser.add_argument("--capacity", type=int, default=3600, help="Samples kept per host")
+    parser.add_argument("--max-loss", type=float, default=0.01, help="Largest lost fraction that passes")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    collector = FleetCollector("127.0.0.1", 0, capacity=args.capacity, max_hosts=args.hosts,
+                               udp=args.transport == "udp", tcp=args.transport == "tcp")
+    collector.start()
+    hosts = [f"host-{i:05d}" for i in range(args.hosts)]
+    sent = multiprocessing.Value("q", 0)
+    senders = [multiprocessing.Process(target=generate_load,
+                                       args=(collector.port, args.transport, hosts[i::args.senders], args.rate,
+                                             args.batch, args.duration, sent))
+               for i in range(args.senders)]
+    start = time.perf_counter()
+    for sender in senders:
+        sender.start()
+
+    hottest_ns, history_ns = [], []
+    clock = time.perf_counter_ns
+    deadline = time.monotonic() + args.duration
+    i = 0
+    while time.monotonic() < deadline:
+        t0 = clock()
+        collector.hottest(10)
+        t1 = clock()
+        if collector.host_ids():
+            collector.history(hosts[i % len(hosts)], 600)
+            history_ns.append(clock() - t1)
+        hottest_ns.append(t1 - t0)
+        i += 1
+        time.sleep(0.01)
+    for sender in senders:
+        sender.join()
+    time.sleep(0.5)  # Let the collector drain its socket buffers
+    elapsed = time.perf_counter() - start
+    collector.stop()
+
+    stats = collector.stats()
+    offered = sent.value
+    lost = max(0, offered - stats["samples"])
+    results = {
+        "transport": args.transport,
+        "hosts": stats["hosts"],
+        "offered_samples": offered,
+        "ingested_samples": stats["samples"],
+        "offered_per_second": offered / args.duration,
+        "ingested_per_second": stats["samples"] / args.duration,
+        "lost_fraction": lost / offered if offered else 0.0,
+        "lost_packets": stats["lost_packets"],
+        "elapsed_s": elapsed,
+        "hottest": percentiles(hottest_ns),
+        "history": percentiles(history_ns),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.transport}: {results['hosts']} hosts, offered {results['offered_per_second']:.0f} samples/s, "
+              f"ingested {results['ingested_per_second']:.0f} samples/s, "
+              f"lost {results['lost_fraction'] * 100:.2f}% ({results['lost_packets']} packets)")
+        for query in ("hottest", "history"):
+            stats = results[query]
+            if stats["calls"]:
+                print(f"  {query:8s} p50 {stats['p50_us']:8.1f} us  p99 {stats['p99_us']:8.1f} us  "
+                      f"max {stats['max_us']:8.1f} us  ({stats['calls']} calls)")
+    if results["lost_fraction"] > args.max_loss:
+        print(f"FAIL: lost {results['lost_fraction'] * 100:.2f}% of samples, budget {args.max_loss * 100:.2f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+"""Per-tick hot-path benchmark for the CPU Cooling Agent.
+
+For each history size, fills an engine with synthetic samples and times the
+stages that run on every tick or frame:
+  - sample:      engine.sample_once() with the simulated sensor (psutil reads included)
+  - tick:        engine.process_reading() with a synthetic sensor and auto fan control
+  - predict:     trend predictor update + predict
+  - health:      calculate_health() for one reading
+  - health_bulk: recompute_health() over the whole history (threshold change)
+  - fan:         apply_fan_speed() through a mock actuator
+  - fan_worker:  FanWorker.set_speed() in front of a mock fan that takes 20 ms per write
+  - feed:        SharedFeedWriter.write() of the latest sample into the shared-memory ring
+  - graph:       GraphRenderer.render() on an offscreen Agg canvas, span = whole history
+  - export:      CSV export of the whole history
+
+Reports p50/p90/p99/max latency per stage, bytes allocated per call
+(tracemalloc, measured in a separate pass so it does not skew the timings)
+and the tick rate the engine could sustain.
+
+Run from the repository root:
+    python benchmarks/bench_hot_path.py --sizes 60,3600,86400,1000000 --ticks 2000
+
+Exits with status 1 when a budget is exceeded so it can gate CI.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from cooling_engine import CoolingEngine  # noqa: E402
+from fan_actuators import FanWorker, MockFanActuator  # noqa: E402
+from log_writer import export_history  # noqa: E402
+from replay_engine import ThermalPlant, synthetic_workload  # noqa: E402
+from sensor_backends import SimulatedBackend  # noqa: E402
+from shared_feed import SharedFeedWriter  # noqa: E402
+
+DEFAULT_SIZES = (60, 3600, 86400, 1000000)
+STAGES = ("sample", "tick", "predict", "health", "health_bulk", "fan", "fan_worker", "feed", "graph", "export")
+
+# Default regression budgets: p99 latency in microseconds, checked at every history size
+STAGE_BUDGETS_US = {
+    "tick": 1000,
+    "predict": 200,
+    "health": 200,
+    "fan": 100,
+    "fan_worker": 100,  # The caller must never wait for the hardware
+    "feed": 50,  # Runs on the sampling thread for every sample
+    "graph": 250000,  # One frame at the GUI's 4 fps cap
+}
+
+# Stages whose cost grows with the history size; tracemalloc makes them much slower, so sample them less
+WHOLE_HISTORY_STAGES = ("health_bulk", "graph", "export")
+
+
+class SyntheticSensor:
+    """Endless (temperature, usage, frequency) readings from a mixed workload and a thermal model."""
+
+    def __init__(self, actuator, seed=0, length=4096):
+        self.actuator = actuator
+        self.usage = synthetic_workload(length, 1.0, "mixed", seed)
+        self.plant = ThermalPlant()
+        self.i = 0
+
+    def read(self):
+        usage = float(self.usage[self.i % len(self.usage)])
+        self.i += 1
+        temp = self.plant.step(1.0, usage, self.actuator.speed or 50)
+        return temp, usage, 2400 + usage * 12
+
+
+def prefill(engine, size, interval=1.0, seed=0):
+    """Fill the raw history and every rollup tier with `size` seconds of synthetic samples."""
+    rng = np.random.default_rng(seed)
+    # Align the start to the coarsest bucket so the rollup blocks line up with the raw rows
+    coarsest = max(tier.bucket_seconds for tier in engine.rollups.tiers)
+    end = (time.time() // coarsest) * coarsest
+    timestamps = end - (np.arange(size, 0, -1)) * interval
+    usage = np.clip(40 + 30 * np.sin(timestamps / 600) + rng.normal(0, 5, size), 0, 100)
+    temperature = 30 + usage * 0.3 + rng.normal(0, 0.5, size)
+    frequency = 2400 + usage * 12
+    power = frequency * usage / 100 * 0.1 + temperature * 0.05
+    fan_speed = np.maximum(30, usage // 2)
+    health = engine.calculate_health(temperature)
+    columns = {"timestamp": timestamps, "temperature": temperature, "usage": usage, "frequency": frequency,
+               "power": power, "fan_speed": fan_speed, "health": health, "throttle": np.zeros(size)}
+    engine.history.extend([columns[name] for name in engine.history.fields])
+
+    for tier in engine.rollups.tiers:
+        per_bucket = int(tier.bucket_seconds / interval)
+        buckets = min(size // per_bucket, tier.capacity)
+        if not buckets:
+            continue
+        used = buckets * per_bucket
+        block = [timestamps[size - used::per_bucket]]
+        for field in tier.fields:
+            values = columns[field][size - used:].reshape(buckets, per_bucket)
+            block.extend((values.min(axis=1), values.mean(axis=1), values.max(axis=1)))
+        # Tier columns are field_min, field_mean, field_max per field, in ROLLUP_STATS order
+        tier.history.extend(np.vstack(block))
+
+
+def percentiles(times_ns):
+    us = np.asarray(times_ns, dtype=np.float64) / 1000.0
+    return {
+        "calls": len(us),
+        "p50_us": float(np.percentile(us, 50)),
+        "p90_us": float(np.percentile(us, 90)),
+        "p99_us": float(np.percentile(us, 99)),
+        "max_us": float(us.max()),
+        "mean_us": float(us.mean()),
+    }
+
+
+def time_calls(fn, calls):
+    clock = time.perf_counter_ns
+    times = np.empty(calls, dtype=np.int64)
+    for i in range(calls):
+        start = clock()
+        fn()
+        times[i] = clock() - start
+    return times
+
+
+def allocated_per_call(fn, calls):
+    """Mean peak bytes allocated by one call, with tracemalloc on."""
+    calls = max(1, min(calls, 200))
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return float(np.mean(peaks))
+
+
+def build_stages(engine, renderer, sensor, fan_worker, feed, feed_sample, export_path):
+    counter = {"fan": 0}
+
+    def tick():
+        temp, usage, freq = sensor.read()
+        engine.process_reading(time.time(), temp, usage, freq)
+
+    def predict():
+        engine.predictor.update(sensor.plant.temperature)
+        engine.predictor.predict()
+
+    def health():
+        engine.calculate_health(sensor.plant.temperature)
+
+    def fan():
+        # Alternate so every call reaches the actuator
+        counter["fan"] += 1
+        engine.apply_fan_speed(50 + counter["fan"] % 2)
+
+    def fan_worker_call():
+        counter["fan"] += 1
+        fan_worker.set_speed(counter["fan"] % 101)
+
+    def graph():
+        renderer.mark_dirty()
+        renderer.render()
+
+    return {
+        "sample": engine.sample_once,
+        "tick": tick,
+        "predict": predict,
+        "health": health,
+        "health_bulk": engine.recompute_health,
+        "fan": fan,
+        "fan_worker": fan_worker_call,
+        "feed": lambda: feed.write(feed_sample),
+        "graph": graph,
+        "export": lambda: export_history(engine.history, export_path),
+    }
+
+
+def bench_size(size, ticks, frames, exports, stages, seed=0):
+    from graph_renderer import GraphRenderer
+
+    actuator = MockFanActuator()
+    engine = CoolingEngine(history_capacity=size, fan_actuator=actuator)
+    engine.sensor_backend = SimulatedBackend()
+    engine.auto_optimize = True
+    prefill(engine, size, seed=seed)
+    sensor = SyntheticSensor(actuator, seed)
+
+    renderer = GraphRenderer(engine.history, rollups=engine.rollups, span=size * engine.interval,
+                             critical_threshold=engine.critical_threshold, max_fps=1e9)
+    renderer.render()  # First frame is the full redraw that caches the background
+
+    calls = {"graph": frames, "export": exports, "health_bulk": max(1, min(ticks, 20000000 // size))}
+    fan_worker = FanWorker(lambda: MockFanActuator(write_delay=0.02))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = SharedFeedWriter(os.path.join(tmp, "feed"))
+        temp, usage, freq = sensor.read()
+        feed_sample = engine.process_reading(time.time(), temp, usage, freq)
+        functions = build_stages(engine, renderer, sensor, fan_worker, feed, feed_sample,
+                                 os.path.join(tmp, "export.csv"))
+        for stage in stages:
+            fn = functions[stage]
+            n = calls.get(stage, ticks)
+            gc.collect()
+            stats = percentiles(time_calls(fn, n))
+            stats["alloc_bytes"] = allocated_per_call(fn, 3 if stage in WHOLE_HISTORY_STAGES else n)
+            results[stage] = stats
+        feed.close()
+    fan_worker.close()
+    if "tick" in results:
+        results["ticks_per_second"] = 1e6 / results["tick"]["mean_us"]
+    results["history_mb"] = (engine.history.nbytes + engine.rollups.nbytes) / 1e6
+    results["graph_source"] = renderer.source
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU Cooling Agent hot-path benchmark")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated history sizes in samples")
+    parser.add_argument("--ticks", type=int, default=2000, help="Calls per per-tick stage")
+    parser.add_argument("--frames", type=int, default=100, help="Graph frames per size")
+    parser.add_argument("--exports", type=int, default=3, help="Log exports per size")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to run")
+    parser.add_argument("--no-budget", action="store_true", help="Report only, never fail")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = {"sizes": {}, "failures": []}
+    for size in sizes:
+        result = bench_size(size, args.ticks, args.frames, args.exports, stages)
+        results["sizes"][size] = result
+        for stage, budget in STAGE_BUDGETS_US.items():
+            if stage in result and result[stage]["p99_us"] > budget and not args.no_budget:
+                results["failures"].append(
+                    f"{stage} at {size} samples: p99 {result[stage]['p99_us']:.0f} us > {budget} us")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for size, result in results["sizes"].items():
+            rate = result.get("ticks_per_second")
+            print(f"\nHistory {size:,} samples ({result['history_mb']:.1f} MB, graph from {result['graph_source']})"
+                  + (f", {rate:,.0f} ticks/s" if rate else ""))
+            print(f"  {'stage':<12}{'p50 us':>11}{'p90 us':>11}{'p99 us':>11}{'max us':>11}{'alloc KB':>11}")
+            for stage in stages:
+                s = result[stage]
+                print(f"  {stage:<12}{s['p50_us']:>11.1f}{s['p90_us']:>11.1f}{s['p99_us']:>11.1f}"
+                      f"{s['max_us']:>11.1f}{s['alloc_bytes'] / 1024:>11.1f}")
+        for failure in results["failures"]:
+            print(f"BUDGET EXCEEDED: {failure}")
+    return 1 if results["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+"""Cold start benchmark for the CPU Cooling Agent.
+
+Measures, each in a fresh interpreter:
+  - cumulative import time of every module the agent may load
+  - time from process launch to the first published sample in headless mode
+  - which heavy modules the headless entry point pulls in
+
+Run from the repository root:
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 1500
+
+Exits with status 1 when a budget is exceeded so it can gate CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "psutil",
+    "numpy",
+    "tkinter",
+    "sensor_backends",
+    "history_store",
+    "trend_predictor",
+    "cooling_engine",
+    "cpu_cooling_agent",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_tkagg",
+]
+
+# Modules that must never be loaded by the headless entry point
+HEADLESS_FORBIDDEN = ["matplotlib", "sklearn", "wmi", "win32com", "comtypes"]
+
+# Default regression budgets in milliseconds (cumulative import time)
+IMPORT_BUDGETS_MS = {
+    "cooling_engine": 400,
+    "cpu_cooling_agent": 450,
+}
+
+
+def measure_import(module):
+    """Return the cumulative import time of `module` in ms, or None if it cannot be imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    for line in reversed(result.stderr.splitlines()):
+        # "import time: self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000.0
+    return None
+
+
+def measure_first_sample(timeout=30):
+    """Launch the headless agent and return ms until it reports its first sample."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "startup.csv")
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-u", "cpu_cooling_agent.py", "--headless", "--monitor-only",
+             "--interval", "0.1", "--log", log_path],
+            cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        try:
+            deadline = start + timeout
+            for line in proc.stdout:
+                # The headless reporter prints the status of the very first sample
+                if any(status in line for status in ("NORMAL:", "WARNING:", "CRITICAL:")):
+                    return (time.perf_counter() - start) * 1000.0
+                if time.perf_counter() > deadline:
+                    break
+            return None
+        finally:
+            proc.kill()
+            proc.wait()
+
+
+def headless_loaded_modules():
+    code = ("import sys, cpu_cooling_agent, cooling_engine; "
+            f"print(','.join(m for m in {HEADLESS_FORBIDDEN!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    loaded = result.stdout.strip()
+    return loaded.split(",") if loaded else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU Cooling Agent startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--budget-ms", type=float, default=1500,
+                        help="Budget for launch to first sample (median)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {"imports_ms": {}, "first_sample_ms": None, "headless_heavy_modules": []}
+    failures = []
+
+    for module in MODULES:
+        times = [t for t in (measure_import(module) for _ in range(args.runs)) if t is not None]
+        median = statistics.median(times) if times else None
+        results["imports_ms"][module] = median
+        budget = IMPORT_BUDGETS_MS.get(module)
+        if budget is not None and median is not None and median > budget:
+            failures.append(f"import {module}: {median:.1f} ms > {budget} ms")
+
+    samples = [t for t in (measure_first_sample() for _ in range(args.runs)) if t is not None]
+    if samples:
+        results["first_sample_ms"] = statistics.median(samples)
+        if results["first_sample_ms"] > args.budget_ms:
+            failures.append(f"first sample: {results['first_sample_ms']:.1f} ms > {args.budget_ms} ms")
+    else:
+        failures.append("first sample: agent never reported a sample")
+
+    results["headless_heavy_modules"] = headless_loaded_modules()
+    for module in results["headless_heavy_modules"]:
+        failures.append(f"headless entry point imports {module}")
+
+    results["failures"] = failures
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'module':<40}{'import (ms)':>12}")
+        for module, ms in results["imports_ms"].items():
+            print(f"{module:<40}{'n/a' if ms is None else f'{ms:.1f}':>12}")
+        first = results["first_sample_ms"]
+        print(f"\nLaunch to first sample: {'n/a' if first is None else f'{first:.1f} ms'} "
+              f"(budget {args.budget_ms:.0f} ms)")
+        print(f"Heavy modules loaded headless: {', '.join(results['headless_heavy_modules']) or 'none'}")
+        for failure in failures:
+            print(f"BUDGET EXCEEDED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
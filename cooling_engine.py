@@ -0,0 +1,522 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import os
+import threading
+import time
+from collections import namedtuple
+from functools import partial
+
+import psutil
+
+from sensor_backends import select_sensor_backend, SimulatedBackend
+from fan_actuators import FanWorker, select_fan_actuator
+from fan_controller import FAN_MODES, PidFanController
+from fan_curves import DEFAULT_PROFILES, DEFAULT_PROFILES_PATH, ProfileFile, compile_profiles
+from sampling_scheduler import Probe, SamplingScheduler
+from history_store import SampleHistory
+from rollup_history import RollupHistory
+from trend_predictor import OnlineTrendPredictor
+from thermal_model import FORECAST_HORIZONS, RcThermalModel, prediction_from, value_at
+import thermal_health
+from log_writer import StreamingLogWriter
+from instrumentation import Instrumentation
+import telemetry_format
+
+# One immutable record per sampling tick, shared by the GUI, the logger and any other subscriber
+Sample = namedtuple("Sample", [
+    "timestamp",    # seconds since the epoch
+    "temperature",  # °C
+    "usage",        # CPU usage %
+    "frequency",    # MHz
+    "power",        # estimated W
+    "fan_speed",    # fan speed % at the time of the sample
+    "health",       # system health %
+    "status",       # "normal", "warning" or "critical"
+    "prediction",   # trend_predictor.Prediction, or None until enough samples exist
+    "throttle",     # frequency drop below baseline while thermally throttled (0.25 = 25 %), else 0
+    "forecast",     # thermal_model.Forecast at several horizons, or None until the model is fitted
+], defaults=(None, 0.0, None))
+
+# Profiles in effect after the profile file was reloaded, handed to subscribe_profiles() callbacks
+ProfileSnapshot = namedtuple("ProfileSnapshot", [
+    "profiles",            # {name: compiled profile}
+    "current_profile",
+    "warning_threshold",   # °C
+    "critical_threshold",  # °C
+])
+
+# Probes read on every sampling tick; their period is the sampling interval
+TICK_PROBES = ("usage", "temperature", "frequency")
+
+# Built-in cooling profiles, used when no profile file exists or it cannot be loaded (see fan_curves.py).
+# "fan_curve" drives the curve mode; "controller" tunes the PID mode, which holds the temperature
+# "target_margin" °C below the warning threshold
+COOLING_PROFILES = compile_profiles(DEFAULT_PROFILES)
+
+class CoolingEngine:
+    """GUI-free sampler, fan controller and logger.
+
+    Frontends register with subscribe() and receive every Sample on the
+    sampling thread; they must hand it over to their own thread themselves.
+    """
+
+    def __init__(self, interval=1.0, warning_threshold=40, critical_threshold=55,
+                 log_path=None, sensor=None, history_capacity=3600,
+                 log_max_bytes=None, log_rotate_interval=None, log_compress=False, log_backup_count=None,
+                 fan_actuator=None, fan_backend=None, fan_channels=None, fan_mode="pid", instrument=False,
+                 prediction_horizon=10, prediction_samples=10, prediction_mode="window",
+                 prediction_model="rc", forecast_horizons=FORECAST_HORIZONS, control_horizon=30,
+                 battery_period=30.0, fan_rpm_period=5.0, adaptive_sampling=False, min_interval=0.2,
+                 max_interval=10.0, profiles_path=None, profile_poll_period=2.0):
+        self.interval = interval  # Configured interval; the base of the adaptive range
+        self.sample_interval = interval  # Interval in use now
+        self.warning_threshold = warning_threshold
+        self.critical_threshold = critical_threshold
+        self.optimal_temp_min = 20  # Adjusted to be more realistic
+        self.optimal_temp_max = 40  # Set to match warning threshold
+        self.fan_control_enabled = True
+        self.auto_optimize = False
+        self.current_fan_speed = 80
+        self._applied_fan_speed = None  # Last speed successfully written to the fans
+        self.current_profile = "balanced"  # Current cooling profile
+        self.profile_file = None  # fan_curves.ProfileFile, polled for changes while sampling
+        self.profile_poll_period = profile_poll_period
+        if profiles_path is None and os.path.exists(DEFAULT_PROFILES_PATH):
+            profiles_path = DEFAULT_PROFILES_PATH
+        if profiles_path is not None:
+            # An unreadable or invalid file is reported and the built-in profiles run until it is fixed
+            self.profile_file = ProfileFile(profiles_path, fallback=COOLING_PROFILES)
+            self.cooling_profiles = self.profile_file.profiles
+        else:
+            self.cooling_profiles = COOLING_PROFILES
+        if self.current_profile not in self.cooling_profiles:
+            self.current_profile = next(iter(self.cooling_profiles))
+        self._loaded_profiles = self.cooling_profiles  # Last set handed over by the profile file
+        if fan_mode not in FAN_MODES:
+            raise ValueError(f"Unknown fan mode: {fan_mode}")
+        # "pid" closed loop, "step" for the original threshold steps, "curve" for the profile's fan curve
+        self.fan_mode = fan_mode
+        self.fan_controller = PidFanController(**self.cooling_profiles[self.current_profile]["controller"])
+
+        # Initialize data storage (one row per sample, all columns aligned)
+        self.history = SampleHistory(history_capacity)
+        self.rollups = RollupHistory()  # 10 s and 1 min min/mean/max buckets for long zoom levels
+        self._lock = threading.Lock()  # Serialises history writes with bulk recomputes
+
+        # Trend fitted once per sample and shared by every consumer
+        self.prediction_enabled = True
+        self.prediction_horizon = prediction_horizon  # Seconds ahead
+        self.predictor = OnlineTrendPredictor(window=prediction_samples,
+                                              horizon=max(1, round(prediction_horizon / interval)),
+                                              mode=prediction_mode)
+        if prediction_model not in ("rc", "trend"):
+            raise ValueError(f"Unknown prediction model: {prediction_model}")
+        # "rc" forecasts from the fitted thermal model once it is ready, the trend line until then
+        self.prediction_model = prediction_model
+        self.thermal_model = RcThermalModel(horizons=set(forecast_horizons) | {prediction_horizon})
+        self.control_horizon = control_horizon  # Seconds ahead the fan controller's feed-forward looks
+
+        self.preferred_sensor = sensor
+        self.sensor_backend = None  # Selected once by the sampling thread
+        self.fallback_backend = SimulatedBackend()
+        self.core_monitor = None  # core_monitor.CoreMonitor while per-core monitoring is on
+        self.throttle_detector = None  # throttle_detector.ThrottleDetector while detection is on
+        self._cores_lock = threading.Lock()  # Keeps the GUI from closing the per-core files mid-read
+        self.logger = None
+        if log_path:
+            # Samples are only queued here; a dedicated thread batches the disk writes
+            log_options = dict(max_bytes=log_max_bytes, rotate_interval=log_rotate_interval,
+                               compress=log_compress, backup_count=log_backup_count)
+            if telemetry_format.is_telemetry_path(log_path):
+                # Fixed-width binary records instead of CSV text
+                telemetry_format.check_appendable(log_path)
+                log_options.update(header=telemetry_format.build_header(), binary=True,
+                                   batch_formatter=telemetry_format.encode_samples)
+            self.logger = StreamingLogWriter(log_path, **log_options)
+
+        # Object with set_speed(percent) -> bool; None opens a FanWorker on the first fan command
+        self.fan_actuator = fan_actuator
+        self.preferred_fan = fan_backend
+        self.fan_channels = fan_channels  # hwmon pwm channels the agent may drive; None for the CPU fan only
+        self._owns_fan_actuator = False
+        self._fan_lock = threading.Lock()
+
+        # Multi-rate sampling: temperature, usage and frequency every interval, slow signals less often
+        self.scheduler = None  # SamplingScheduler, created by run_forever
+        self.adaptive_interval = None  # adaptive_sampling.AdaptiveInterval while adaptive sampling is on
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.battery_period = battery_period
+        self.fan_rpm_period = fan_rpm_period
+        self.battery = None  # Latest psutil.sensors_battery() result, None without a battery
+        self.fan_rpm = None  # {fan label: RPM} where the platform reports fan speeds
+
+        if adaptive_sampling:
+            self.set_adaptive_sampling(True)
+
+        self.subscribers = []
+        self.profile_subscribers = []
+        self.last_sample_seconds = 0.0  # Wall time of the latest sample, sensor reads included
+        self.running = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Per-stage latency histograms; frontends register their own stages on the same object
+        self.instruments = Instrumentation()
+        for method, stage in (("sample_once", "sample"), ("read_temperature", "sensor"),
+                              ("read_frequency", "cpu_freq"), ("process_reading", "process"),
+                              ("set_fan_speed", "control"), ("apply_fan_speed", "fan_apply")):
+            self.instruments.instrument(self, method, stage)
+        self.instruments.instrument(self.predictor, "update", "predict_update")
+        self.instruments.instrument(self.predictor, "predict", "predict")
+        self.instruments.instrument(self.thermal_model, "update", "model_update")
+        self.instruments.instrument(self.thermal_model, "forecast", "forecast")
+        self.instruments.set_enabled(instrument)
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def subscribe_profiles(self, callback):
+        """Call `callback` with a ProfileSnapshot, on the sampling thread, whenever reloaded profiles take effect."""
+        self.profile_subscribers.append(callback)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self._stop_event.set()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        if self.logger:
+            self.logger.close()
+            self.logger = None
+        self.set_core_monitoring(False)
+        if self._owns_fan_actuator:
+            self.fan_actuator.close()
+            self.fan_actuator = None
+            self._owns_fan_actuator = False
+
+    def run_forever(self):
+        # Selected in this thread so that COM-based backends stay in their apartment
+        self.sensor_backend = select_sensor_backend(self.preferred_sensor)
+        self.running = True
+        self.scheduler = SamplingScheduler(self.build_probes(), "temperature", self._on_merged_sample,
+                                           histograms=self.instruments.histograms)
+        if not self._stop_event.is_set():
+            self.scheduler.run()
+        self.sensor_backend.close()
+
+    def build_probes(self):
+        """Probes for the scheduler: each signal at its own rate, slow ones off the sampling thread."""
+        probes = [
+            # Usage is read first so that the usage-based fallback sensor sees this tick's value
+            Probe("usage", self._read_usage, self.sample_interval),
+            Probe("temperature", lambda: self.read_temperature(self.scheduler["usage"].value[0]),
+                  self.sample_interval),
+            # psutil.cpu_freq() can take tens of ms (Windows, many-core Linux)
+            Probe("frequency", self._read_frequency_probe, self.sample_interval, blocking=True),
+            Probe("battery", psutil.sensors_battery, self.battery_period, blocking=True),
+        ]
+        if hasattr(psutil, "sensors_fans"):
+            probes.append(Probe("fan_rpm", read_fan_rpm, self.fan_rpm_period, blocking=True))
+        if self.profile_file is not None:
+            # One stat() per poll; the file is only parsed and compiled after it changes
+            probes.append(Probe("profiles", self.profile_file.poll, self.profile_poll_period, blocking=True))
+        return probes
+
+    def _read_usage(self):
+        """Return (usage %, per-core mean frequency or None)."""
+        cores = self.core_monitor
+        if cores is None:
+            return psutil.cpu_percent(), None
+        # One batched per-core read stands in for the aggregate psutil calls
+        with self._cores_lock:
+            return cores.sample(time.time())
+
+    def _read_frequency_probe(self):
+        if self.core_monitor is not None and self.core_monitor.has_frequency:
+            return None  # The per-core read already carries the frequency
+        return self.read_frequency()
+
+    def _on_merged_sample(self, timestamp, values):
+        usage, core_freq = values["usage"]
+        cpu_freq = core_freq if core_freq is not None else values["frequency"] or 0.0
+        self.battery = values["battery"]
+        self.fan_rpm = values.get("fan_rpm")
+        profiles = values.get("profiles")
+        if profiles is not None and profiles is not self._loaded_profiles:
+            self._loaded_profiles = profiles
+            self.apply_profiles(profiles)
+        sample = self.process_reading(timestamp, values["temperature"], usage, cpu_freq)
+        adaptive = self.adaptive_interval
+        if adaptive is not None:
+            battery = self.battery
+            prediction = sample.prediction
+            interval = adaptive.update(timestamp, sample.temperature, self.warning_threshold,
+                                       prediction.value if prediction is not None else None,
+                                       battery is not None and not battery.power_plugged)
+            if interval != self.sample_interval:
+                self.set_sample_interval(interval)
+        self.last_sample_seconds = self.scheduler.last_tick_seconds
+
+    def set_sample_interval(self, interval):
+        """Change the per-tick sampling interval while running; slow probes keep their own periods."""
+        self.sample_interval = interval
+        # The trend line counts in samples, so its horizon follows the interval
+        self.predictor.horizon = max(1, round(self.prediction_horizon / interval))
+        scheduler = self.scheduler
+        if scheduler is not None:
+            for name in TICK_PROBES:
+                scheduler.set_period(name, interval)
+
+    def set_adaptive_sampling(self, enabled):
+        """Let the sampling interval follow thermal headroom and power source, or go back to `interval`."""
+        if not enabled:
+            self.adaptive_interval = None
+            if self.sample_interval != self.interval:
+                self.set_sample_interval(self.interval)
+        elif self.adaptive_interval is None:
+            from adaptive_sampling import AdaptiveInterval
+            self.adaptive_interval = AdaptiveInterval(self.interval, min(self.min_interval, self.interval),
+                                                      max(self.max_interval, self.interval))
+
+    def sample_once(self):
+        """Read every per-tick signal synchronously and process it (benchmarks, one-off reads)."""
+        cpu_usage, cpu_freq = self._read_usage()
+        cpu_temp = self.read_temperature(cpu_usage)
+        if cpu_freq is None:
+            cpu_freq = self.read_frequency()
+        return self.process_reading(time.time(), cpu_temp, cpu_usage, cpu_freq)
+
+    def set_throttle_detection(self, enabled):
+        if not enabled:
+            self.throttle_detector = None
+        elif self.throttle_detector is None:
+            from throttle_detector import ThrottleDetector
+            self.throttle_detector = ThrottleDetector()
+
+    def set_core_monitoring(self, enabled, capacity=600):
+        """Start or stop per-core sampling. Returns False if no per-core source is available."""
+        if not enabled:
+            with self._cores_lock:
+                cores, self.core_monitor = self.core_monitor, None
+                if cores is not None:
+                    cores.close()
+            return True
+        if self.core_monitor is None:
+            from core_monitor import CoreMonitor
+            try:
+                self.core_monitor = CoreMonitor(capacity=capacity)
+            except Exception as e:
+                print(f"Per-core monitoring unavailable: {str(e)}")
+                return False
+        return True
+
+    def read_temperature(self, cpu_usage):
+        cpu_temp = None
+        try:
+            cpu_temp = self.sensor_backend.read_temperature(cpu_usage)
+        except Exception as e:
+            print(f"{self.sensor_backend.name} sensor error: {str(e)}")
+
+        # Simulated temperature as final fallback
+        if cpu_temp is None:
+            cpu_temp = self.fallback_backend.read_temperature(cpu_usage)
+        return cpu_temp
+
+    def read_frequency(self):
+        freq = psutil.cpu_freq()
+        return freq.current if freq else 0.0
+
+    def process_reading(self, timestamp, temp, usage, cpu_freq):
+        """Run one raw reading through history, control, logging and subscribers."""
+        power = (cpu_freq * usage / 100 * 0.1) + (temp * 0.05)  # Consider temperature impact
+
+        prediction = forecast = None
+        if self.prediction_enabled:
+            self.predictor.update(temp)
+            # The fan speed recorded so far is the one that ran during the interval that just ended
+            self.thermal_model.update(timestamp, temp, power, self.current_fan_speed)
+            if self.prediction_model == "rc":
+                forecast = self.thermal_model.forecast(self.current_fan_speed)
+            if forecast is not None:
+                prediction = prediction_from(forecast, temp, self.prediction_horizon, self.sample_interval)
+            else:
+                prediction = self.predictor.predict()
+
+        # Adjust fan speed if auto-optimization is enabled
+        if self.auto_optimize and self.fan_control_enabled:
+            # Feed-forward looks further ahead with the thermal model, so cooling ramps before the heat arrives
+            predicted = (value_at(forecast, self.control_horizon)[0] if forecast is not None
+                         else prediction.value if prediction is not None else None)
+            self.set_fan_speed(self.auto_fan_speed(temp, usage, timestamp, predicted))
+
+        throttle = 0.0
+        detector = self.throttle_detector
+        if detector is not None:
+            cores = self.core_monitor
+            if cores is not None and cores.has_frequency:
+                # Per-core frequencies catch a single throttled core the average would hide
+                throttle = detector.update(timestamp, temp, cores.usage(1)[:, 0], cores.frequency(1)[:, 0],
+                                           self.warning_threshold)
+            else:
+                throttle = detector.update(timestamp, temp, usage, cpu_freq, self.warning_threshold)
+
+        with self._lock:
+            # Health is stored with the sample so the graphs and exports never recompute it
+            sample = Sample(timestamp, temp, usage, cpu_freq, power, self.current_fan_speed,
+                            thermal_health.health_score(temp, self.warning_threshold, self.critical_threshold,
+                                                        self.optimal_temp_min),
+                            self.temperature_status(temp), prediction, throttle,
+                            forecast)
+            self.history.append(sample)
+            self.rollups.add(sample)
+        if self.logger:
+            self.logger.write(sample)
+        for callback in self.subscribers:
+            try:
+                callback(sample)
+            except Exception as e:
+                print(f"Subscriber error: {str(e)}")
+        return sample
+
+    def temperature_status(self, temp):
+        if temp >= self.critical_threshold:
+            return "critical"
+        elif temp >= self.warning_threshold:
+            return "warning"
+        return "normal"
+
+    def calculate_health(self, temps):
+        # Works on a single temperature or a whole array at once; arrays are scored in one vectorized pass
+        return thermal_health.calculate_health(temps, self.warning_threshold, self.critical_threshold,
+                                               self.optimal_temp_min)
+
+    def set_thresholds(self, warning_threshold, critical_threshold):
+        if critical_threshold <= warning_threshold:
+            raise ValueError("Critical threshold must be above the warning threshold")
+        with self._lock:
+            self.warning_threshold = warning_threshold
+            self.critical_threshold = critical_threshold
+            self.recompute_health()
+
+    def recompute_health(self):
+        # Stored health depends on the thresholds, so refresh the whole history in one pass
+        if len(self.history):
+            self.history.set_column("health", self.calculate_health(self.history.column("temperature")))
+
+    def auto_fan_speed(self, temp, usage, timestamp=None, predicted=None):
+        """Speed for the automatic mode; `predicted` is the temperature expected ahead, if known."""
+        if self.fan_mode == "pid":
+            return self.fan_controller.update(time.time() if timestamp is None else timestamp, temp,
+                                              self.fan_setpoint(), predicted,
+                                              self.current_fan_speed, self.critical_threshold)
+        if self.fan_mode == "curve":
+            if temp >= self.critical_threshold:
+                return 100
+            return self.cooling_profiles[self.current_profile]["fan_curve"].speed(temp, self.current_fan_speed)
+        if temp >= self.critical_threshold:
+            return 100
+        elif temp >= self.warning_threshold:
+            return min(int(70 + (temp - self.warning_threshold) * 2), 100)
+        return max(30, int(usage / 2))
+
+    def fan_setpoint(self):
+        """Temperature the PID mode holds, in °C."""
+        return self.warning_threshold - self.cooling_profiles[self.current_profile]["target_margin"]
+
+    def set_profile(self, profile):
+        """Switch cooling profile and return the fan speed its curve asks for, if known.
+
+        In PID mode the controller is retuned instead and None is returned.
+        """
+        profiles = self.cooling_profiles
+        if profile not in profiles:
+            raise ValueError(f"Invalid cooling profile: {profile}")
+
+        self.current_profile = profile
+        profile_settings = profiles[profile]
+        self.fan_controller.configure(**profile_settings['controller'])
+
+        # Update thresholds based on profile
+        self.set_thresholds(profile_settings['warning_threshold'], profile_settings['critical_threshold'])
+
+        current_temp = self.history.latest("temperature")
+        if current_temp is not None and self.fan_mode != "pid":
+            return profile_settings['fan_curve'](current_temp)
+        return None
+
+    def apply_profiles(self, profiles):
+        """Switch to a newly loaded set of profiles, retuning the active one in place.
+
+        Thresholds are only touched if the active profile's thresholds changed,
+        so a reload never undoes thresholds set by hand for unrelated edits.
+        """
+        old = self.cooling_profiles.get(self.current_profile)
+        new = profiles.get(self.current_profile)
+        if new is None:
+            print(f"Cooling profile {self.current_profile} was removed from the file; keeping its settings")
+            profiles = dict(profiles)
+            profiles[self.current_profile] = new = old
+        self.cooling_profiles = profiles
+        self.fan_controller.configure(**new["controller"])
+        thresholds = (new["warning_threshold"], new["critical_threshold"])
+        if thresholds != (old["warning_threshold"], old["critical_threshold"]):
+            self.set_thresholds(*thresholds)
+        snapshot = ProfileSnapshot(profiles, self.current_profile, self.warning_threshold, self.critical_threshold)
+        for callback in self.profile_subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Profile subscriber error: {str(e)}")
+
+    def set_fan_speed(self, speed):
+        """Record the requested speed and push it to the hardware when fan control is on."""
+        speed = int(speed)
+        if not 0 <= speed <= 100:
+            print(f"Invalid fan speed value: {speed}")
+            return False
+        self.current_fan_speed = speed
+        if not self.fan_control_enabled or speed == self._applied_fan_speed:
+            return True
+        if self.apply_fan_speed(speed):
+            self._applied_fan_speed = speed
+            return True
+        return False
+
+    def apply_fan_speed(self, speed):
+        actuator = self.fan_actuator
+        if actuator is None:
+            with self._fan_lock:
+                if self.fan_actuator is None:
+                    # Discover the fans once, on a worker that also keeps slow writes off the caller's thread
+                    self.fan_actuator = FanWorker(partial(select_fan_actuator, self.preferred_fan,
+                                                          self.fan_channels))
+                    self._owns_fan_actuator = True
+                    self.instruments.instrument(self.fan_actuator, "_write", "fan_write")
+                actuator = self.fan_actuator
+        if actuator.set_speed(speed):
+            return True
+        if self._owns_fan_actuator:
+            self.fan_control_enabled = False
+        return False
+
+
+def read_fan_rpm():
+    """{fan label: RPM} from psutil, or None when no fan reports its speed."""
+    fans = psutil.sensors_fans()
+    if not fans:
+        return None
+    return {f"{chip}/{entry.label or i}": entry.current
+            for chip, entries in fans.items() for i, entry in enumerate(entries)}
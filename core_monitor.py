@@ -0,0 +1,338 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import glob
+import os
+import re
+import sys
+
+import numpy as np
+import psutil
+
+from history_store import SampleHistory
+
+# /proc/stat columns summed for total time; guest time is already part of user/nice
+_STAT_TOTAL_COLUMNS = 8
+_STAT_IDLE_COLUMNS = (3, 4)  # idle, iowait
+
+
+class LinuxCoreReader:
+    """Per-CPU usage, frequency and temperature straight from procfs/sysfs.
+
+    Every file is opened once and re-read with pread. /proc/stat is read only
+    up to the end of the per-CPU lines, so a tick costs one short read for
+    usage plus one small read per frequency and temperature attribute; the
+    aggregate psutil.cpu_freq() path already reads the same frequency files.
+    """
+
+    name = "Linux procfs/sysfs"
+
+    def __init__(self, proc_root="/proc", sys_root="/sys"):
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.cpu_count = 0
+        self.cpu_ids = []  # Kernel CPU number of each row; offline CPUs leave gaps
+        self.package_of = None  # Package index of every logical CPU
+        self.package_count = 0
+        self._cpu_names = []  # b"cpuN" labels expected at the start of the per-CPU /proc/stat lines
+        self._stat_fd = None
+        self._stat_size = 0
+        self._prev_busy = None
+        self._prev_total = None
+        self._freq_fds = []  # One per CPU, None where cpufreq is missing
+        self._temp_fds = []  # Distinct temperature inputs
+        self._temp_index = None  # Per CPU: index into _temp_fds, or -1
+        self._package_temp_index = None  # Per package: index into _temp_fds, or -1
+
+    def open(self):
+        if not sys.platform.startswith("linux") and self.proc_root == "/proc":
+            return False
+        try:
+            self._stat_fd = os.open(os.path.join(self.proc_root, "stat"), os.O_RDONLY)
+            text = os.pread(self._stat_fd, 1 << 20, 0).decode("ascii", "replace")
+        except OSError:
+            self.close()
+            return False
+        cpu_lines = re.findall(r"^cpu\d+ .*$", text, re.MULTILINE)
+        if not cpu_lines:
+            self.close()
+            return False
+        self.cpu_ids = [int(line.split(None, 1)[0][3:]) for line in cpu_lines]
+        self.cpu_count = len(self.cpu_ids)
+        self._cpu_names = [f"cpu{cpu}".encode() for cpu in self.cpu_ids]
+        # Read a little past the per-CPU lines so growing counters still fit
+        end = text.index(cpu_lines[-1]) + len(cpu_lines[-1])
+        self._stat_size = end * 2 + 256
+
+        cpu_dir = os.path.join(self.sys_root, "devices", "system", "cpu")
+        packages, cores = [], []
+        for cpu in self.cpu_ids:
+            topology = os.path.join(cpu_dir, f"cpu{cpu}", "topology")
+            packages.append(_read_int(os.path.join(topology, "physical_package_id"), 0))
+            cores.append(_read_int(os.path.join(topology, "core_id"), cpu))
+            self._freq_fds.append(_open_fd(os.path.join(cpu_dir, f"cpu{cpu}", "cpufreq", "scaling_cur_freq")))
+        package_ids = sorted(set(packages))
+        self.package_count = len(package_ids)
+        self.package_of = np.array([package_ids.index(p) for p in packages])
+
+        core_inputs, package_inputs = self._find_temperature_inputs()
+        paths = sorted(set(core_inputs.values()) | set(package_inputs.values()))
+        self._temp_fds = [_open_fd(path) for path in paths]
+        slot = {path: i for i, path in enumerate(paths)}
+        self._package_temp_index = np.array(
+            [slot.get(package_inputs.get(p), -1) for p in package_ids], dtype=np.intp)
+        # A CPU uses its own core sensor when there is one, else its package sensor
+        self._temp_index = np.array([
+            slot[core_inputs[(packages[cpu], cores[cpu])]] if (packages[cpu], cores[cpu]) in core_inputs
+            else self._package_temp_index[self.package_of[cpu]]
+            for cpu in range(self.cpu_count)], dtype=np.intp)
+
+        self.read()  # Prime the usage counters
+        return True
+
+    def _find_temperature_inputs(self):
+        """Map (package, core) and package ids to hwmon temperature input paths."""
+        core_inputs, package_inputs = {}, {}
+        chips = sorted(glob.glob(os.path.join(self.sys_root, "class", "hwmon", "hwmon*")))
+        amd_package = 0
+        for chip in chips:
+            try:
+                with open(os.path.join(chip, "name")) as f:
+                    name = f.read().strip()
+            except OSError:
+                continue
+            labels = {}
+            for input_path in sorted(glob.glob(os.path.join(chip, "temp*_input"))):
+                try:
+                    with open(input_path[:-len("_input")] + "_label") as f:
+                        labels[f.read().strip()] = input_path
+                except OSError:
+                    continue
+            if name == "coretemp":
+                # One coretemp chip per package: "Package id P" plus "Core C" for each physical core
+                package = None
+                for label, path in labels.items():
+                    match = re.match(r"Package id (\d+)$", label)
+                    if match:
+                        package = int(match.group(1))
+                        package_inputs[package] = path
+                if package is None:
+                    package = 0
+                for label, path in labels.items():
+                    match = re.match(r"Core (\d+)$", label)
+                    if match:
+                        core_inputs[(package, int(match.group(1)))] = path
+            elif name in ("k10temp", "zenpower"):
+                # AMD reports per-CCD, not per-core, temperatures; use the control temperature per package
+                for preferred in ("Tdie", "Tctl"):
+                    if preferred in labels:
+                        package_inputs.setdefault(amd_package, labels[preferred])
+                        break
+                amd_package += 1
+        return core_inputs, package_inputs
+
+    def read(self):
+        """Return (usage %, frequency MHz, temperature °C) arrays, one value per logical CPU."""
+        data = os.pread(self._stat_fd, self._stat_size, 0)
+        lines = data.split(b"\n", self.cpu_count + 1)
+        if len(lines) < self.cpu_count + 2:
+            # Counters outgrew the buffer: the last per-CPU line was cut off
+            data = os.pread(self._stat_fd, 1 << 20, 0)
+            self._stat_size = len(data)
+            lines = data.split(b"\n", self.cpu_count + 1)
+        fields = [line.split(None, 1) for line in lines[1:self.cpu_count + 1]]
+        if [f[0] for f in fields] != self._cpu_names or lines[-1].startswith(b"cpu"):
+            # A CPU went offline or came online: rebuild the CPU list and every per-CPU file
+            print(f"Per-CPU layout changed, re-opening {self.name} reader")
+            self.close()
+            if not self.open():
+                raise OSError(f"Cannot re-open {self.proc_root}/stat after a CPU hotplug")
+            return self.read()
+        counters = np.array(b" ".join(f[1] for f in fields).split(), dtype=np.int64).reshape(self.cpu_count, -1)
+        total = counters[:, :_STAT_TOTAL_COLUMNS].sum(axis=1)
+        busy = total - counters[:, _STAT_IDLE_COLUMNS].sum(axis=1)
+        if self._prev_total is None:
+            usage = np.zeros(self.cpu_count)
+        else:
+            elapsed = total - self._prev_total
+            with np.errstate(divide="ignore", invalid="ignore"):
+                usage = np.where(elapsed > 0, (busy - self._prev_busy) * 100.0 / elapsed, 0.0)
+            np.clip(usage, 0.0, 100.0, out=usage)
+        self._prev_total, self._prev_busy = total, busy
+
+        frequency = np.array([_pread_number(fd) for fd in self._freq_fds]) / 1000.0  # kHz -> MHz
+        sensors = np.array([_pread_number(fd) for fd in self._temp_fds] + [np.nan]) / 1000.0  # m°C -> °C
+        # Index -1 picks the trailing NaN for CPUs without any sensor
+        return usage, frequency, sensors[self._temp_index]
+
+    def package_temperatures(self):
+        sensors = np.array([_pread_number(fd) for fd in self._temp_fds] + [np.nan]) / 1000.0
+        return sensors[self._package_temp_index]
+
+    def close(self):
+        for fd in [self._stat_fd] + self._freq_fds + self._temp_fds:
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._stat_fd = None
+        self._freq_fds = []
+        self._temp_fds = []
+        self._prev_busy = self._prev_total = None
+
+
+class PsutilCoreReader:
+    """Portable per-CPU reader on top of psutil (Windows, macOS).
+
+    Frequencies and temperatures are broadcast to every CPU when the
+    platform only reports one value.
+    """
+
+    name = "psutil"
+
+    def __init__(self):
+        self.cpu_count = 0
+        self.cpu_ids = []
+        self.package_count = 1
+        self.package_of = None
+
+    def open(self):
+        usage = psutil.cpu_percent(percpu=True)  # Also primes psutil's per-CPU counters
+        self.cpu_count = len(usage)
+        self.cpu_ids = list(range(self.cpu_count))
+        self.package_of = np.zeros(self.cpu_count, dtype=np.intp)
+        return self.cpu_count > 0
+
+    def read(self):
+        usage = np.array(psutil.cpu_percent(percpu=True), dtype=np.float64)
+        if len(usage) != self.cpu_count:  # CPU hotplug
+            self.cpu_count = len(usage)
+            self.cpu_ids = list(range(self.cpu_count))
+            self.package_of = np.zeros(self.cpu_count, dtype=np.intp)
+        frequency = np.full(self.cpu_count, np.nan)
+        freqs = psutil.cpu_freq(percpu=True) or []
+        if len(freqs) == self.cpu_count:
+            frequency[:] = [f.current for f in freqs]
+        elif freqs:
+            frequency[:] = freqs[0].current
+        temperature = np.full(self.cpu_count, self.package_temperatures()[0])
+        return usage, frequency, temperature
+
+    def package_temperatures(self):
+        try:
+            temps = psutil.sensors_temperatures()
+        except (AttributeError, OSError):
+            return np.array([np.nan])
+        for key in ("coretemp", "k10temp", "zenpower", "cpu_thermal"):
+            if temps.get(key):
+                return np.array([temps[key][0].current])
+        return np.array([np.nan])
+
+    def close(self):
+        pass
+
+
+def select_core_reader():
+    for reader in (LinuxCoreReader(), PsutilCoreReader()):
+        try:
+            if reader.open():
+                return reader
+        except Exception as e:
+            print(f"{reader.name} per-core reader unavailable: {str(e)}")
+    return None
+
+
+class CoreMonitor:
+    """Ring buffer of per-CPU usage, frequency and temperature, one row per tick.
+
+    All three metrics for every CPU are stored in one SampleHistory row, so a
+    (cpus x n) block of any metric is a zero-copy view for the heatmap.
+    """
+
+    def __init__(self, reader=None, capacity=600):
+        self.reader = reader or select_core_reader()
+        if self.reader is None:
+            raise RuntimeError("No per-core data source available")
+        self.capacity = capacity
+        self._reset()
+        self.has_frequency = False
+        self.has_temperature = False
+
+    def _reset(self):
+        # Rows hold one column per CPU, so a change in the CPU set starts a new history
+        n = self.reader.cpu_count
+        fields = (["timestamp"] + [f"usage_{i}" for i in range(n)] + [f"frequency_{i}" for i in range(n)]
+                  + [f"temperature_{i}" for i in range(n)])
+        self.history = SampleHistory(self.capacity, fields=fields)
+        self._row = np.empty(len(fields))
+        self.cpu_ids = list(self.reader.cpu_ids)
+        self.cpu_count = n
+
+    def sample(self, timestamp):
+        """Take one batched reading. Returns (mean usage %, mean frequency MHz or None)."""
+        usage, frequency, temperature = self.reader.read()
+        if list(self.reader.cpu_ids) != self.cpu_ids:
+            self._reset()
+        n = self.cpu_count
+        row = self._row
+        row[0] = timestamp
+        row[1:n + 1] = usage
+        row[n + 1:2 * n + 1] = frequency
+        row[2 * n + 1:] = temperature
+        self.history.append_row(row)
+        self.has_frequency = bool(np.isfinite(frequency).any())
+        self.has_temperature = bool(np.isfinite(temperature).any())
+        mean_freq = float(np.nanmean(frequency)) if self.has_frequency else None
+        return round(float(usage.mean()), 1), mean_freq
+
+    def _block(self, metric, n=None):
+        window = self.history.window(n)
+        offset = {"usage": 1, "frequency": 1 + self.cpu_count, "temperature": 1 + 2 * self.cpu_count}[metric]
+        return window[offset:offset + self.cpu_count]
+
+    def usage(self, n=None):
+        """(cpus x n) view of per-CPU usage %, oldest sample first."""
+        return self._block("usage", n)
+
+    def frequency(self, n=None):
+        return self._block("frequency", n)
+
+    def temperature(self, n=None):
+        return self._block("temperature", n)
+
+    def hottest(self, k=3):
+        """[(cpu id, value)] for the k hottest CPUs in the latest sample: °C, or usage % without sensors."""
+        if not len(self.history):
+            return []
+        latest = self.temperature(1)[:, 0] if self.has_temperature else self.usage(1)[:, 0]
+        order = np.argsort(np.nan_to_num(latest, nan=-np.inf))[::-1][:k]
+        return [(self.cpu_ids[cpu], float(latest[cpu])) for cpu in order]
+
+    def close(self):
+        self.reader.close()
+
+
+def _open_fd(path):
+    try:
+        return os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+
+
+def _read_int(path, default):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return default
+
+
+def _pread_number(fd):
+    if fd is None:
+        return np.nan
+    try:
+        return float(os.pread(fd, 32, 0))
+    except (OSError, ValueError):
+        return np.nan
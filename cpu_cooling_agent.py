@@ -4,66 +4,55 @@
 
 import tkinter as tk
 from tkinter import ttk
-import psutil
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
 from datetime import datetime
-import threading
+import argparse
+import random
+import signal
 import time
-from sklearn.linear_model import LinearRegression
-from collections import deque
-import wmi
-import win32com.client
-import comtypes.client
+from cooling_engine import CoolingEngine
+from log_writer import export_history
+from snapshot_channel import SnapshotChannel
+from rollup_history import ZOOM_LEVELS
 
 class CPUCoolingAgent:
-    def __init__(self):
+    def __init__(self, engine=None):
+        self.engine = engine or CoolingEngine()
         self.root = tk.Tk()
         self.root.title("CPU Cooling Agent")
         self.root.state('zoomed')  # This will maximize the window properly
         self.root.configure(bg='#f0f0f0')
 
-        # Initialize data storage
-        self.temp_history = []
-        self.time_history = []
-        self.power_history = deque(maxlen=60)  # Power consumption history
-        self.max_history_points = 60
-        self.warning_threshold = 40
-        self.critical_threshold = 55
-        self.optimal_temp_min = 20  # Adjusted to be more realistic
-        self.optimal_temp_max = 40  # Set to match warning threshold
-        self.fan_control_enabled = True
-        self.current_fan_speed = 80
         self.system_health = 100  # System health percentage
-        self.current_profile = "balanced"  # Current cooling profile
-        self.prediction_window = 10  # Predict temperature 10 seconds ahead
-        self.temp_predictor = LinearRegression()
-        self.prediction_enabled = True
-        self.running = True  # Flag for controlling the update thread
-
-        self.cooling_profiles = {
-            "silent": {
-                "max_fan_speed": 100,
-                "temp_threshold": 18,
-                "fan_curve": lambda t: min(100, max(80, 7 * (t - 15)))
-            },
-            "balanced": {
-                "max_fan_speed": 100,
-                "temp_threshold": 20,
-                "fan_curve": lambda t: min(100, max(90, 8 * (t - 18)))
-            },
-            "performance": {
-                "max_fan_speed": 100,
-                "temp_threshold": 22,
-                "fan_curve": lambda t: min(100, max(100, 10 * (t - 20)))
-            }
-        }
+        self.latest_prediction = None
+        self.latest_forecast = None
+        self.max_graph_fps = 4  # Upper bound on graph redraws per second
+        self.frame_ms = 50  # How often the Tk thread checks for a new sample
+
+        self.diagnostics_window = None
+        self.core_heatmap = None  # Created the first time per-core monitoring is switched on
 
         self.setup_ui()
         self.setup_graphs()
-        self.update_thread = threading.Thread(target=self.update_data, daemon=True)
-        self.update_thread.start()
+        self.instrument_stages()
+        # Samples arrive on the engine thread; Tk picks up only the newest one per frame
+        self.sample_channel = SnapshotChannel()
+        self.engine.subscribe(self.sample_channel.publish)
+        # Reloads of the profile file arrive the same way
+        self.profile_channel = SnapshotChannel()
+        self.engine.subscribe_profiles(self.profile_channel.publish)
+        self.root.after(self.frame_ms, self.process_frame)
+
+    @property
+    def history(self):
+        return self.engine.history
+
+    @property
+    def warning_threshold(self):
+        return self.engine.warning_threshold
+
+    @property
+    def critical_threshold(self):
+        return self.engine.critical_threshold
 
     def setup_ui(self):
         # Here I am creating the Main frame of the software with scrollbar
@@ -125,29 +114,42 @@ class CPUCoolingAgent:
         self.critical_threshold_var = tk.StringVar(value=str(self.critical_threshold))
         critical_entry = ttk.Entry(threshold_frame, textvariable=self.critical_threshold_var, width=5)
         critical_entry.grid(row=0, column=3)
+        ttk.Button(threshold_frame, text="Apply", command=self.apply_thresholds).grid(row=0, column=4, padx=5)
+        warning_entry.bind("<Return>", lambda e: self.apply_thresholds())
+        critical_entry.bind("<Return>", lambda e: self.apply_thresholds())
 
         # Auto-Optimization Toggle
-        self.auto_optimize_var = tk.BooleanVar(value=False)
+        self.auto_optimize_var = tk.BooleanVar(value=self.engine.auto_optimize)
         ttk.Checkbutton(advanced_frame, text="Enable Auto-Optimization", 
-                       variable=self.auto_optimize_var).grid(row=1, column=0, padx=5, pady=2)
+                       variable=self.auto_optimize_var,
+                       command=self.toggle_auto_optimize).grid(row=1, column=0, padx=5, pady=2)
 
         # Core-Specific Monitoring Toggle
         self.core_monitoring_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(advanced_frame, text="Enable Core-Specific Monitoring", 
-                       variable=self.core_monitoring_var).grid(row=2, column=0, padx=5, pady=2)
+                       variable=self.core_monitoring_var,
+                       command=self.toggle_core_monitoring).grid(row=2, column=0, padx=5, pady=2)
 
         # Thermal Throttling Detection
         self.throttle_detection_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(advanced_frame, text="Enable Thermal Throttling Detection", 
-                       variable=self.throttle_detection_var).grid(row=3, column=0, padx=5, pady=2)
+                       variable=self.throttle_detection_var,
+                       command=self.toggle_throttle_detection).grid(row=3, column=0, padx=5, pady=2)
+
+        # Adaptive Sampling Rate
+        self.adaptive_sampling_var = tk.BooleanVar(value=self.engine.adaptive_interval is not None)
+        ttk.Checkbutton(advanced_frame, text="Enable Adaptive Sampling Rate",
+                       variable=self.adaptive_sampling_var,
+                       command=self.toggle_adaptive_sampling).grid(row=4, column=0, padx=5, pady=2)
 
         # Performance Logging
         log_frame = ttk.Frame(advanced_frame)
-        log_frame.grid(row=4, column=0, padx=5, pady=2, sticky='ew')
+        log_frame.grid(row=5, column=0, padx=5, pady=2, sticky='ew')
         ttk.Label(log_frame, text="Performance Log Interval (s):").grid(row=0, column=0)
         self.log_interval_var = tk.StringVar(value="60")
         ttk.Entry(log_frame, textvariable=self.log_interval_var, width=5).grid(row=0, column=1, padx=5)
         ttk.Button(log_frame, text="Export Logs", command=self.export_logs).grid(row=0, column=2)
+        ttk.Button(log_frame, text="Diagnostics", command=self.open_diagnostics).grid(row=0, column=3, padx=5)
 
         # Creating the Battery Status Frame
         battery_frame = ttk.Frame(main_frame)
@@ -190,6 +192,10 @@ class CPUCoolingAgent:
         self.prediction_label = ttk.Label(status_frame, text="Predicted Temperature: -- °C", font=("Arial", 14))
         self.prediction_label.grid(row=3, column=0, pady=2)
 
+        # Thermal Throttling Display, filled in while detection is enabled
+        self.throttle_label = ttk.Label(status_frame, text="", font=("Arial", 14))
+        self.throttle_label.grid(row=4, column=0, pady=2)
+
         # Fan Control Frame
         fan_frame = ttk.LabelFrame(main_frame, text="Fan Control")
         fan_frame.grid(row=5, column=0, pady=5, sticky='ew')
@@ -198,11 +204,12 @@ class CPUCoolingAgent:
         profile_frame = ttk.Frame(fan_frame)
         profile_frame.grid(row=0, column=0, padx=5, pady=2, sticky='ew')
         ttk.Label(profile_frame, text="Cooling Profile:").grid(row=0, column=0, sticky='w')
-        self.profile_var = tk.StringVar(value="balanced")
-        profile_menu = ttk.OptionMenu(profile_frame, self.profile_var, "balanced", 
-                                    "silent", "balanced", "performance",
-                                    command=self.change_cooling_profile)
-        profile_menu.grid(row=0, column=1, sticky='e')
+        # Profiles come from the profile file; the menu is rebuilt when it is reloaded
+        self.profile_var = tk.StringVar(value=self.engine.current_profile)
+        self.profile_menu = ttk.OptionMenu(profile_frame, self.profile_var, self.engine.current_profile,
+                                           *self.engine.cooling_profiles,
+                                           command=self.change_cooling_profile)
+        self.profile_menu.grid(row=0, column=1, sticky='e')
 
         # Fan Control Enable Switch
         self.fan_control_var = tk.BooleanVar(value=False)
@@ -232,223 +239,205 @@ class CPUCoolingAgent:
         self.graph_frame = ttk.Frame(main_frame)
         self.graph_frame.grid(row=6, column=0, pady=5, sticky='nsew')
         self.graph_frame.grid_columnconfigure(0, weight=1)
-        self.graph_frame.grid_rowconfigure(0, weight=1)
+        self.graph_frame.grid_rowconfigure(1, weight=1)
+
+        # Zoom level for the history panels
+        zoom_frame = ttk.Frame(self.graph_frame)
+        zoom_frame.grid(row=0, column=0, sticky='w', padx=5)
+        ttk.Label(zoom_frame, text="Graph Zoom:").grid(row=0, column=0, sticky='w')
+        self.zoom_var = tk.StringVar(value="1 min")
+        zoom_menu = ttk.OptionMenu(zoom_frame, self.zoom_var, "1 min", *ZOOM_LEVELS,
+                                   command=self.change_zoom)
+        zoom_menu.grid(row=0, column=1, sticky='e')
 
     def setup_graphs(self):
-        # Create figure with optimized size and spacing
-        self.fig = plt.figure(figsize=(16, 8))  # Increased height for more detail
-        
-        # Create subplots with adjusted spacing for 2x2 layout
-        gs = self.fig.add_gridspec(2, 2, width_ratios=[1, 1], height_ratios=[1, 1], wspace=0.3, hspace=0.3)
-        
-        # Position temperature graph
-        self.ax = self.fig.add_subplot(gs[0, 0])
-        
-        # Position health graph
-        self.health_ax = self.fig.add_subplot(gs[0, 1])
-        
-        # Position power consumption graph
-        self.power_ax = self.fig.add_subplot(gs[1, 0])
-        
-        # Position prediction graph
-        self.prediction_ax = self.fig.add_subplot(gs[1, 1])
-        
-        # Configure canvas and widget placement
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.graph_frame)
-        self.canvas.get_tk_widget().grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
-
-        # Setup temperature graph with enhanced styling
-        self.ax.set_title('CPU Temperature History', pad=12, fontsize=12, weight='bold')
-        self.ax.set_xlabel('Time', fontsize=11)
-        self.ax.set_ylabel('Temperature (°C)', fontsize=11)
-        self.line, = self.ax.plot([], [], linewidth=2.5, color='#FF6B6B')
-        self.ax.grid(True, linestyle='--', alpha=0.7)
-        self.ax.set_xlim(0, 60)
-        self.ax.set_ylim(0, max(80, self.critical_threshold + 20))
-        self.ax.tick_params(axis='both', which='major', labelsize=10)
-        self.ax.set_facecolor('#F8F9FA')
-
-        # Setup health graph with enhanced styling
-        self.health_ax.set_title('System Health Report', pad=12, fontsize=12, weight='bold')
-        self.health_ax.set_ylim(0, 100)
-        self.health_ax.set_xlim(0, 60)
-        self.health_line, = self.health_ax.plot([], [], color='#4BC0C0', linewidth=2.5)
-        self.health_ax.set_ylabel('Health %', fontsize=11)
-        self.health_ax.set_xlabel('Time', fontsize=11)
-        self.health_ax.grid(True, linestyle='--', alpha=0.7)
-        self.health_ax.tick_params(axis='both', which='major', labelsize=10)
-        self.health_ax.set_facecolor('#F8F9FA')
-
-        # Setup power consumption graph
-        self.power_ax.set_title('Power Consumption', pad=12, fontsize=12, weight='bold')
-        self.power_ax.set_xlabel('Time', fontsize=11)
-        self.power_ax.set_ylabel('Power (W)', fontsize=11)
-        self.power_line, = self.power_ax.plot([], [], color='#36A2EB', linewidth=2.5)
-        self.power_ax.grid(True, linestyle='--', alpha=0.7)
-        self.power_ax.set_xlim(0, 60)
-        self.power_ax.set_ylim(0, 100)
-        self.power_ax.tick_params(axis='both', which='major', labelsize=10)
-        self.power_ax.set_facecolor('#F8F9FA')
-
-        # Setup prediction graph
-        self.prediction_ax.set_title('Temperature Prediction', pad=12, fontsize=12, weight='bold')
-        self.prediction_ax.set_xlabel('Time (Future)', fontsize=11)
-        self.prediction_ax.set_ylabel('Temperature (°C)', fontsize=11)
-        self.prediction_line, = self.prediction_ax.plot([], [], color='#FF9F40', linewidth=2.5)
-        self.prediction_ax.grid(True, linestyle='--', alpha=0.7)
-        self.prediction_ax.set_xlim(0, 10)
-        self.prediction_ax.set_ylim(0, max(80, self.critical_threshold + 20))
-        self.prediction_ax.tick_params(axis='both', which='major', labelsize=10)
-        self.prediction_ax.set_facecolor('#F8F9FA')
-
-        # Enable responsive layout
-        self.fig.canvas.mpl_connect('resize_event', self.on_resize)
-
-    def on_resize(self, event):
-        # Update layout on window resize
-        self.fig.tight_layout(pad=2.0)
-        self.canvas.draw()
+        # matplotlib is by far the slowest import, so it is only loaded once the window is built
+        from graph_renderer import GraphRenderer
+
+        self.renderer = GraphRenderer(self.history, master=self.graph_frame,
+                                      rollups=self.engine.rollups,
+                                      span=ZOOM_LEVELS[self.zoom_var.get()],
+                                      horizon=self.engine.thermal_model.horizons[-1],
+                                      prediction_horizon=self.engine.prediction_horizon,
+                                      critical_threshold=self.critical_threshold,
+                                      max_fps=self.max_graph_fps)
+        self.fig = self.renderer.fig
+        self.canvas = self.renderer.canvas
+        self.canvas.get_tk_widget().grid(row=1, column=0, sticky='nsew', padx=5, pady=5)
+
+    def instrument_stages(self):
+        # Tk-side stages share the engine's histograms so one panel shows the whole pipeline
+        instruments = self.engine.instruments
+        instruments.instrument(self, "on_sample", "ui")
+        instruments.instrument(self, "update_battery", "battery")
+        instruments.instrument(self.renderer, "render", "render")
+        instruments.instrument(self.canvas, "draw", "canvas_draw")
+
+    def change_zoom(self, zoom):
+        # Switching tiers is just a different view of data that is already maintained
+        self.renderer.set_span(ZOOM_LEVELS[zoom])
 
     def update_graph(self):
-        try:
-            if not self.temp_history or not self.time_history:
-                return
-
-            current_times = [t.strftime('%H:%M:%S') for t in self.time_history]
-            x_range = range(len(self.temp_history))
-
-            # Update temperature graph with validation
-            if len(self.temp_history) > 0:
-                self.line.set_data(x_range, self.temp_history)
-                self.ax.set_xticks(x_range[::max(1, len(x_range)//5)])
-                self.ax.set_xticklabels(current_times[::max(1, len(current_times)//5)], rotation=45)
-                self.ax.set_xlim(0, max(60, len(x_range)))
-                self.ax.relim()
-                self.ax.autoscale_view()
-
-            # Update health graph with validation
-            if len(self.temp_history) > 0:
-                health_data = [self.calculate_health(temp) for temp in self.temp_history]
-                self.health_line.set_data(x_range, health_data)
-                self.health_ax.set_xticks(x_range[::max(1, len(x_range)//5)])
-                self.health_ax.set_xticklabels(current_times[::max(1, len(current_times)//5)], rotation=45)
-                self.health_ax.set_xlim(0, max(60, len(x_range)))
-
-            # Update power consumption graph with validation
-            power_data = list(self.power_history)
-            if power_data:
-                power_x_range = range(len(power_data))
-                self.power_line.set_data(power_x_range, power_data)
-                power_times = current_times[-len(power_data):] if len(current_times) >= len(power_data) else current_times
-                self.power_ax.set_xticks(power_x_range[::max(1, len(power_x_range)//5)])
-                self.power_ax.set_xticklabels(power_times[::max(1, len(power_times)//5)], rotation=45)
-                self.power_ax.set_xlim(0, max(60, len(power_x_range)))
-                self.power_ax.relim()
-                self.power_ax.autoscale_view()
-
-            # Update prediction graph with validation
-            if len(self.temp_history) >= 10 and self.prediction_enabled:
-                try:
-                    X_future = np.array(range(11)).reshape(-1, 1)
-                    self.temp_predictor.fit(np.array(range(len(self.temp_history[-10:]))).reshape(-1, 1),
-                                          np.array(self.temp_history[-10:]))
-                    predicted_temps = self.temp_predictor.predict(X_future)
-                    self.prediction_line.set_data(X_future.flatten(), predicted_temps)
-                    self.prediction_ax.relim()
-                    self.prediction_ax.autoscale_view()
-                except Exception as pred_e:
-                    print(f"Prediction update error: {str(pred_e)}")
-
-            # Apply tight layout and draw
-            self.fig.tight_layout(pad=2.0)
-            self.canvas.draw()
+        # New data only marks the graphs stale; render_graphs draws at most max_graph_fps
+        self.renderer.set_prediction(self.latest_prediction, self.latest_forecast)
 
+    def render_graphs(self):
+        try:
+            if self.renderer.frame_due():
+                self.renderer.render()
         except Exception as e:
             print(f"Graph update error: {str(e)}")
-            # Reset all plots on error
-            self.line.set_data([], [])
-            self.health_line.set_data([], [])
-            self.power_line.set_data([], [])
-            self.prediction_line.set_data([], [])
+            self.renderer.invalidate()
+        heatmap = self.core_heatmap
+        if heatmap is not None and self.engine.core_monitor is not None and heatmap.frame_due():
             try:
-                self.canvas.draw()
-            except Exception:
-                pass
+                heatmap.render()
+            except Exception as e:
+                print(f"Core heatmap error: {str(e)}")
+                heatmap.invalidate()
+
+    def toggle_core_monitoring(self):
+        enabled = self.core_monitoring_var.get()
+        if not self.engine.set_core_monitoring(enabled):
+            self.core_monitoring_var.set(False)
+            enabled = False
+        if not enabled:
+            if self.core_heatmap is not None:
+                self.core_frame.grid_remove()
+            return
 
-    def update_ui(self, temp, usage):
+        if self.core_heatmap is None or self.core_heatmap.core_monitor is not self.engine.core_monitor:
+            from graph_renderer import CoreHeatmap
+            if self.core_heatmap is None:
+                self.core_frame = ttk.Frame(self.graph_frame)
+                self.core_frame.grid_columnconfigure(0, weight=1)
+                self.hottest_cores_label = ttk.Label(self.core_frame, text="Hottest cores: --", font=("Arial", 11))
+                self.hottest_cores_label.grid(row=0, column=0, sticky='w', padx=5)
+            else:
+                self.core_heatmap.get_tk_widget().destroy()
+            self.core_heatmap = CoreHeatmap(self.engine.core_monitor, master=self.core_frame)
+            self.core_heatmap.get_tk_widget().grid(row=1, column=0, sticky='nsew', padx=5, pady=5)
+        self.core_frame.grid(row=2, column=0, sticky='nsew')
+        self.core_heatmap.invalidate()
+
+    def update_core_view(self):
+        cores = self.engine.core_monitor
+        if cores is None or self.core_heatmap is None:
+            return
+        unit = "°C" if cores.has_temperature else "%"
+        hottest = ", ".join(f"CPU {cpu}: {value:.0f}{unit}" for cpu, value in cores.hottest(3))
+        self.hottest_cores_label.config(text=f"Hottest cores: {hottest or '--'}")
+        self.core_heatmap.mark_dirty()
+
+    def process_frame(self):
+        # Single UI pump: newest sample first (older ones are dropped), then a paced redraw
+        try:
+            profiles = self.profile_channel.take()
+            if profiles is not None:
+                self.on_profiles(profiles)
+            sample = self.sample_channel.take()
+            if sample is not None:
+                self.on_sample(sample)
+            self.render_graphs()
+        finally:
+            self.root.after(self.frame_ms, self.process_frame)
+
+    def on_sample(self, sample):
+        # Runs on the Tk thread for the newest sample published by the engine
+        self.latest_prediction = sample.prediction
+        self.latest_forecast = sample.forecast
+        self.update_ui(sample)
+        self.update_graph()
+        self.update_core_view()
+        self.update_throttle_status(sample)
+        self.check_temperature_status(sample)
+        if self.engine.auto_optimize and self.engine.fan_control_enabled:
+            # Reflect the engine's automatic fan choice on the slider
+            self.fan_speed.set(sample.fan_speed)
+
+    def on_profiles(self, snapshot):
+        # Runs on the Tk thread after the engine switched to a reloaded profile file
+        menu = self.profile_menu["menu"]
+        menu.delete(0, "end")
+        for name in snapshot.profiles:
+            menu.add_command(label=name, command=tk._setit(self.profile_var, name, self.change_cooling_profile))
+        self.profile_var.set(snapshot.current_profile)
+        self.warning_threshold_var.set(str(snapshot.warning_threshold))
+        self.critical_threshold_var.set(str(snapshot.critical_threshold))
+        self.renderer.set_thresholds(snapshot.warning_threshold, snapshot.critical_threshold)
+
+    def update_ui(self, sample):
+        temp = sample.temperature
+        usage = sample.usage
         if temp is not None:
             self.temp_label.config(text=f"CPU Temperature: {temp:.1f} °C")
             self.usage_label.config(text=f"CPU Usage: {usage}%")
             
             # Update power consumption with enhanced calculation
-            cpu_freq = psutil.cpu_freq().current
-            power = (cpu_freq * usage / 100 * 0.1) + (temp * 0.05)  # Consider temperature impact
-            self.power_label.config(text=f"Power Consumption: {power:.1f} W")
-            self.power_history.append(power)
-            
-            # Enhanced battery monitoring
-            try:
-                battery = psutil.sensors_battery()
-                if battery:
-                    percent = battery.percent
-                    self.battery_label.config(text=f"Battery: {percent}% {'🔌' if battery.power_plugged else '🔋'}")
-                    
-                    # Detailed time remaining calculation
-                    if battery.secsleft != -1 and not battery.power_plugged:
-                        hours = battery.secsleft // 3600
-                        minutes = (battery.secsleft % 3600) // 60
-                        time_str = f"Time Left: {hours:02d}:{minutes:02d}"
-                        # Add estimated time based on current usage
-                        estimated_time = battery.secsleft * (1 - (usage / 200))  # Adjust for CPU load
-                        est_hours = int(estimated_time // 3600)
-                        est_minutes = int((estimated_time % 3600) // 60)
-                        time_str += f" (Est: {est_hours:02d}:{est_minutes:02d})"
-                        self.battery_time_label.config(text=time_str)
-                    else:
-                        self.battery_time_label.config(text="Time Left: Plugged In ⚡")
-                    
-                    # Enhanced battery status indicators
-                    if percent <= 10:
-                        self.battery_label.config(foreground='red', font=('Arial', 12, 'bold'))
-                        if not battery.power_plugged:
-                            self.show_low_battery_warning()
-                    elif percent <= 20:
-                        self.battery_label.config(foreground='red')
-                    elif percent <= 50:
-                        self.battery_label.config(foreground='orange')
-                    else:
-                        self.battery_label.config(foreground='green')
-            except Exception as e:
-                self.battery_label.config(text="Battery: N/A")
-                self.battery_time_label.config(text="Time Left: N/A")
+            self.power_label.config(text=f"Power Consumption: {sample.power:.1f} W")
             
+            self.update_battery(usage)
+
             # Enhanced temperature prediction
-            if self.prediction_enabled:
-                predicted_temp = self.predict_temperature()
-                if predicted_temp is not None:
-                    prediction_text = f"Predicted Temperature: {predicted_temp:.1f} °C"
-                    # Add trend indicator
-                    if len(self.temp_history) > 1:
-                        trend = predicted_temp - self.temp_history[-1]
-                        prediction_text += f" ({'↑' if trend > 0 else '↓' if trend < 0 else '→'})"
-                    self.prediction_label.config(text=prediction_text)
-                    
-                    # Enhanced warning visualization
-                    if predicted_temp > self.critical_threshold:
-                        self.prediction_label.config(foreground='red', font=('Arial', 14, 'bold'))
-                        self.show_critical_prediction_warning(predicted_temp)
-                    elif predicted_temp > self.warning_threshold:
-                        self.prediction_label.config(foreground='orange', font=('Arial', 14))
-                    else:
-                        self.prediction_label.config(foreground='green', font=('Arial', 14))
+            if sample.prediction is not None:
+                predicted_temp = sample.prediction.value
+                prediction_text = (f"Predicted Temperature: {predicted_temp:.1f} °C "
+                                   f"[{sample.prediction.low:.1f}–{sample.prediction.high:.1f}]")
+                # Add trend indicator
+                trend = sample.prediction.slope
+                prediction_text += f" ({'↑' if trend > 0 else '↓' if trend < 0 else '→'})"
+                if sample.forecast is not None:
+                    prediction_text += "  " + ", ".join(f"{_horizon_label(h)}: {v:.1f}" for h, v in
+                                                        zip(sample.forecast.horizons, sample.forecast.values))
+                self.prediction_label.config(text=prediction_text)
+                
+                # Enhanced warning visualization
+                if predicted_temp > self.critical_threshold:
+                    self.prediction_label.config(foreground='red', font=('Arial', 14, 'bold'))
+                    self.show_critical_prediction_warning(predicted_temp)
+                elif predicted_temp > self.warning_threshold:
+                    self.prediction_label.config(foreground='orange', font=('Arial', 14))
+                else:
+                    self.prediction_label.config(foreground='green', font=('Arial', 14))
 
 
 
-    def handle_no_sensor(self):
-        self.root.after(0, self.update_ui, None, psutil.cpu_percent())
-        self.temp_label.config(text="No Temperature Sensor Found", foreground='orange')
-        self.temp_status.config(foreground='orange')
-        time.sleep(2)
+    def update_battery(self, usage):
+        # Enhanced battery monitoring; the engine polls the battery off the Tk thread
+        try:
+            battery = self.engine.battery
+            if battery:
+                percent = battery.percent
+                self.battery_label.config(text=f"Battery: {percent}% {'🔌' if battery.power_plugged else '🔋'}")
+                    
+                # Detailed time remaining calculation
+                if battery.secsleft != -1 and not battery.power_plugged:
+                    hours = battery.secsleft // 3600
+                    minutes = (battery.secsleft % 3600) // 60
+                    time_str = f"Time Left: {hours:02d}:{minutes:02d}"
+                    # Add estimated time based on current usage
+                    estimated_time = battery.secsleft * (1 - (usage / 200))  # Adjust for CPU load
+                    est_hours = int(estimated_time // 3600)
+                    est_minutes = int((estimated_time % 3600) // 60)
+                    time_str += f" (Est: {est_hours:02d}:{est_minutes:02d})"
+                    self.battery_time_label.config(text=time_str)
+                else:
+                    self.battery_time_label.config(text="Time Left: Plugged In ⚡")
+                    
+                # Enhanced battery status indicators
+                if percent <= 10:
+                    self.battery_label.config(foreground='red', font=('Arial', 12, 'bold'))
+                    if not battery.power_plugged:
+                        self.show_low_battery_warning()
+                elif percent <= 20:
+                    self.battery_label.config(foreground='red')
+                elif percent <= 50:
+                    self.battery_label.config(foreground='orange')
+                else:
+                    self.battery_label.config(foreground='green')
+        except Exception as e:
+            self.battery_label.config(text="Battery: N/A")
+            self.battery_time_label.config(text="Time Left: N/A")
 
     def handle_error(self, error_msg):
         self.temp_label.config(text="Sensor Error", foreground='orange')
@@ -499,19 +488,13 @@ class CPUCoolingAgent:
         except Exception as e:
             print(f"Error showing battery warning: {str(e)}")
 
-    def calculate_health(self, temp):
-        try:
-            if temp >= self.critical_threshold:
-                return max(0, 100 - ((temp - self.critical_threshold) * 5))
-            elif temp >= self.warning_threshold:
-                return max(50, 100 - ((temp - self.warning_threshold) * 2))
-            elif self.optimal_temp_min <= temp <= self.optimal_temp_max:
-                return 100
-            else:
-                return max(80, 100 - abs(temp - self.optimal_temp_max))
-        except Exception as e:
-            print(f"Error calculating health: {str(e)}")
-            return 100  # Return default health on error
+    def check_temperature_status(self, sample):
+        if sample.status == "critical":
+            self.show_critical_warning()
+        elif sample.status == "warning":
+            self.show_warning()
+        else:
+            self.show_normal()
 
     def show_normal(self):
         self.temp_label.config(foreground='black')
@@ -525,9 +508,51 @@ class CPUCoolingAgent:
         self.temp_label.config(foreground='red')
         self.temp_status.config(foreground='red')
 
+    def apply_thresholds(self):
+        try:
+            self.engine.set_thresholds(float(self.warning_threshold_var.get()),
+                                       float(self.critical_threshold_var.get()))
+        except ValueError as e:
+            print(f"Invalid temperature thresholds: {str(e)}")
+            self.warning_threshold_var.set(str(self.warning_threshold))
+            self.critical_threshold_var.set(str(self.critical_threshold))
+            return
+        # Stored health was recomputed for the new thresholds; redraw the panels
+        self.renderer.set_thresholds(self.warning_threshold, self.critical_threshold)
+        self.renderer.mark_dirty()
+
+    def toggle_auto_optimize(self):
+        self.engine.auto_optimize = self.auto_optimize_var.get()
+
+    def toggle_throttle_detection(self):
+        enabled = self.throttle_detection_var.get()
+        self.engine.set_throttle_detection(enabled)
+        self.throttle_label.config(text="Thermal Throttling: none detected" if enabled else "")
+
+    def toggle_adaptive_sampling(self):
+        self.engine.set_adaptive_sampling(self.adaptive_sampling_var.get())
+
+    def update_throttle_status(self, sample):
+        detector = self.engine.throttle_detector
+        if detector is None:
+            return
+        count = len(detector.episodes)
+        if sample.throttle > 0:
+            self.throttle_label.config(
+                text=f"Thermal Throttling: ACTIVE, frequency {sample.throttle * 100:.0f}% below baseline "
+                     f"({count} earlier episodes)", foreground='red')
+        elif count:
+            last = detector.episodes[-1]
+            self.throttle_label.config(
+                text=f"Thermal Throttling: {count} episodes, last at "
+                     f"{datetime.fromtimestamp(last.start):%H:%M:%S} for {last.end - last.start:.0f} s, "
+                     f"depth {last.depth * 100:.0f}%", foreground='orange')
+        else:
+            self.throttle_label.config(text="Thermal Throttling: none detected", foreground='green')
+
     def toggle_fan_control(self):
-        self.fan_control_enabled = self.fan_control_var.get()
-        if not self.fan_control_enabled:
+        self.engine.fan_control_enabled = self.fan_control_var.get()
+        if not self.engine.fan_control_enabled:
             self.fan_speed.set(50)
             self.update_fan_speed(50)
 
@@ -537,129 +562,33 @@ class CPUCoolingAgent:
             if not 0 <= speed <= 100:
                 print(f"Invalid fan speed value: {speed}")
                 return
-            self.current_fan_speed = speed
             self.fan_speed_value.config(text=f"{speed}%")
-            if self.fan_control_enabled:
-                self.apply_fan_speed(speed)
+            if not self.engine.set_fan_speed(speed):
+                self.handle_error("Failed to control fan speed")
+                self.fan_control_var.set(False)
         except ValueError as e:
             print(f"Error setting fan speed: {str(e)}")
             self.handle_error("Invalid fan speed value")
 
     def change_cooling_profile(self, profile):
-        if profile not in self.cooling_profiles:
-            print(f"Invalid cooling profile: {profile}")
+        try:
+            new_speed = self.engine.set_profile(profile)
+        except ValueError as e:
+            print(str(e))
             return
 
-        self.current_profile = profile
-        profile_settings = self.cooling_profiles[profile]
-
         # Update fan speed based on current temperature if available
-        if self.temp_history:
-            current_temp = self.temp_history[-1]
-            new_speed = profile_settings['fan_curve'](current_temp)
+        if new_speed is not None:
             self.fan_speed.set(new_speed)
             self.update_fan_speed(new_speed)
 
         # Update thresholds based on profile
-        self.warning_threshold = profile_settings['temp_threshold']
         self.warning_threshold_var.set(str(self.warning_threshold))
-        self.critical_threshold = profile_settings['temp_threshold'] + 15
         self.critical_threshold_var.set(str(self.critical_threshold))
-
-    def apply_fan_speed(self, speed):
-        if not 0 <= speed <= 100:
-            print(f"Invalid fan speed value: {speed}")
-            return
-            
-        try:
-            import win32com.client
-            import comtypes.client
-            
-            # Initialize WMI interface
-            w = wmi.WMI(namespace="root\\wmi")
-            
-            # Get fan control interface with enhanced error handling
-            try:
-                fans = w.instances("Win32_Fan")
-                fan_controlled = False
-                
-                for fan in fans:
-                    if hasattr(fan, 'DesiredSpeed'):
-                        try:
-                            # Convert percentage to actual fan speed
-                            max_speed = fan.MaxSpeed if hasattr(fan, 'MaxSpeed') else 5000
-                            desired_speed = int((speed / 100.0) * max_speed)
-                            
-                            # Set fan speed with validation
-                            if 0 <= desired_speed <= max_speed:
-                                fan.DesiredSpeed = desired_speed
-                                fan_controlled = True
-                            else:
-                                print(f"Calculated fan speed {desired_speed} is outside valid range for this fan")
-                        except Exception as fan_e:
-                            print(f"Error controlling individual fan: {str(fan_e)}")
-                            continue
-                
-                if not fan_controlled:
-                    self.handle_error("No controllable fans found or all control attempts failed")
-                    
-            except Exception as wmi_e:
-                self.handle_error(f"Failed to access fan controls: {str(wmi_e)}")
-                
-        except Exception as e:
-            self.handle_error(f"Fan control system error: {str(e)}")
-            print(f"Detailed fan control error: {str(e)}")
-            # Fallback to ACPI fan control if available
-            try:
-                w = wmi.WMI(namespace="root\\wmi")
-                acpi = w.instances("ACPI_FanSpeed")
-                acpi_controlled = False
-                
-                for fan in acpi:
-                    if hasattr(fan, 'FanSpeed'):
-                        fan.FanSpeed = speed
-                        acpi_controlled = True
-                        
-                if not acpi_controlled:
-                    raise Exception("No ACPI fan control available")
-                    
-            except Exception as e2:
-                print(f"ACPI fan control error: {str(e2)}")
-                self.handle_error("Failed to control fan speed")
-                self.fan_control_var.set(False)
-                self.fan_control_enabled = False
-
-    def calculate_health(self, temp):
-        # Calculate system health based on temperature
-        if temp <= self.optimal_temp_min:
-            return 100
-        elif temp >= self.critical_threshold:
-            return max(0, 40 - (temp - self.critical_threshold) * 5)  # More gradual decline
-        elif temp >= self.warning_threshold:
-            # Linear decline between warning and critical thresholds
-            warning_range = self.critical_threshold - self.warning_threshold
-            temp_over_warning = temp - self.warning_threshold
-            return max(0, 80 - (temp_over_warning / warning_range) * 40)
-        else:
-            # Gradual decline between optimal and warning
-            optimal_range = self.warning_threshold - self.optimal_temp_min
-            temp_over_optimal = temp - self.optimal_temp_min
-            return max(0, 100 - (temp_over_optimal / optimal_range) * 20)
-
-    def adjust_fan_speed(self, temp, usage):
-        if temp >= self.critical_threshold:
-            self.fan_speed.set(100)
-        elif temp >= self.warning_threshold:
-            target_speed = min(int(70 + (temp - self.warning_threshold) * 2), 100)
-            self.fan_speed.set(target_speed)
-        else:
-            base_speed = max(30, int(usage / 2))
-            self.fan_speed.set(base_speed)
+        self.renderer.set_thresholds(self.warning_threshold, self.critical_threshold)
 
     def get_current_temperature(self):
-        if self.temp_history:
-            return self.temp_history[-1]
-        return None
+        return self.history.latest("temperature")
 
     def quick_cool(self):
         try:
@@ -682,7 +611,7 @@ class CPUCoolingAgent:
                 # Activate force cooling
                 self.cool_button.config(text="Force Cooling Activated!", foreground='green')
                 self.fan_control_var.set(True)
-                self.fan_control_enabled = True
+                self.engine.fan_control_enabled = True
                 self.is_quick_cooling = True
                 self.quick_cool_start_time = time.time()
                 self.quick_cool_duration = 30  # 30 seconds of cooling
@@ -762,133 +691,281 @@ class CPUCoolingAgent:
         if url:
             webbrowser.open(url)
 
-    def run(self):
-        try:
-            self.root.mainloop()
-        finally:
-            self.running = False  # Signal the update thread to stop
-            if hasattr(self, 'update_thread'):
-                self.update_thread.join(timeout=1.0)  # Wait for thread to finish
-
-    def update_data(self):
-        while self.running:
-            try:
-                # Get CPU temperature and usage
-                cpu_usage = psutil.cpu_percent()
-                cpu_temp = None
-                error_message = None
-                
-                # Try multiple methods to get temperature with fallback options
-                try:
-                    # Try OpenHardwareMonitor first
-                    import wmi
-                    try:
-                        w = wmi.WMI(namespace="root\\OpenHardwareMonitor")
-                        temperature_infos = w.Sensor()
-                        cpu_temp = None
-                        for sensor in temperature_infos:
-                            if sensor.SensorType==u'Temperature' and 'CPU' in sensor.Name:
-                                cpu_temp = float(sensor.Value)
-                                break
-                        if cpu_temp is None:
-                            raise Exception("No CPU temperature sensors found.")
-                        print(f"Temperature read from OpenHardwareMonitor: {cpu_temp}°C")
-                        if cpu_temp is None:
-                            raise Exception("CPU temperature sensor not found")
-                    except Exception as e:
-                        error_message = f"OpenHardwareMonitor error: {str(e)}\nPlease ensure OpenHardwareMonitor is running."
-                        print(error_message)
-
-                    # Fallback to Windows Management Instrumentation
-                    if cpu_temp is None:
-                        try:
-                            w = wmi.WMI(namespace="root\\wmi")
-                            temperature_info = w.MSAcpi_ThermalZoneTemperature()[0]
-                            cpu_temp = float(temperature_info.CurrentTemperature) / 10.0 - 273.15
-                            print(f"Temperature read from WMI: {cpu_temp}°C")
-                        except Exception as e:
-                            if error_message:
-                                error_message += f"\nWMI error: {str(e)}"
-                            else:
-                                error_message = f"WMI error: {str(e)}"
-                            print(error_message)
-
-                    # Simulated temperature as final fallback
-                    if cpu_temp is None:
-                        # Base temperature calculation on CPU usage
-                        base_temp = 25  # Base temperature when idle
-                        usage_factor = cpu_usage / 100.0
-                        temp_range = 15  # Maximum temperature increase based on usage
-                        cpu_temp = base_temp + (usage_factor * temp_range)
-                        
-                        # Add some realistic variation
-                        import random
-                        cpu_temp += random.uniform(-0.5, 0.5)
-                        cpu_temp = round(cpu_temp, 1)
-                        print(f"Using simulated temperature: {cpu_temp}°C (based on CPU usage: {cpu_usage}%)")
-                    
-                except Exception as e:
-                    print(f"General error in temperature monitoring: {str(e)}")
-                    error_message = str(e)
-
-                # Update UI with temperature and error information
-                if cpu_temp is not None:
-                    self.root.after(0, self.update_ui, cpu_temp, cpu_usage)
-                    self.temp_history.append(cpu_temp)
-                    self.time_history.append(datetime.now())
-                    
-                    # Keep history within limits
-                    if len(self.temp_history) > self.max_history_points:
-                        self.temp_history.pop(0)
-                        self.time_history.pop(0)
-                    
-                    # Update graph
-                    self.root.after(0, self.update_graph)
-                    
-                    # Check temperature status
-                    self.root.after(0, self.check_temperature_status, cpu_temp)
-                    
-                    # Adjust fan speed if auto-optimization is enabled
-                    if self.auto_optimize_var.get() and self.fan_control_enabled:
-                        self.root.after(0, self.adjust_fan_speed, cpu_temp, cpu_usage)
-
-                time.sleep(1)  # Update interval
-                
-            except Exception as e:
-                print(f"Critical error in update loop: {str(e)}")
-                time.sleep(2)  # Longer delay on error
-
     def export_logs(self):
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"cpu_cooling_logs_{timestamp}.csv"
             
-            with open(filename, 'w') as f:
-                f.write("Timestamp,Temperature,CPU Usage,Power Consumption,Fan Speed,System Health\n")
-                
-                for i in range(len(self.time_history)):
-                    time_str = self.time_history[i].strftime("%Y-%m-%d %H:%M:%S")
-                    temp = self.temp_history[i]
-                    usage = psutil.cpu_percent()
-                    power = list(self.power_history)[i] if i < len(self.power_history) else 0
-                    health = self.calculate_health(temp)
-                    
-                    f.write(f"{time_str},{temp:.1f},{usage},{power:.1f},{self.current_fan_speed},{health:.1f}\n")
-                    
+            export_history(self.history, filename)
             print(f"Logs exported to {filename}")
         except Exception as e:
             print(f"Error exporting logs: {str(e)}")
             
     
     
+    def open_diagnostics(self):
+        # Optional panel with the per-stage latency histograms; refreshed while it is open
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        instruments = self.engine.instruments
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("640x360")
+        self.diagnostics_window = window
+
+        controls = ttk.Frame(window)
+        controls.pack(fill='x', padx=5, pady=5)
+        self.diagnostics_enabled_var = tk.BooleanVar(value=instruments.enabled)
+        ttk.Checkbutton(controls, text="Enable Instrumentation", variable=self.diagnostics_enabled_var,
+                        command=lambda: instruments.set_enabled(self.diagnostics_enabled_var.get())
+                        ).pack(side='left')
+        ttk.Button(controls, text="Reset", command=instruments.reset).pack(side='left', padx=5)
+        ttk.Button(controls, text="Save JSON", command=self.save_diagnostics).pack(side='left')
+
+        columns = ("count", "p50", "p90", "p99", "max", "mean")
+        self.diagnostics_table = ttk.Treeview(window, columns=columns, height=12)
+        self.diagnostics_table.heading("#0", text="Stage")
+        for column in columns:
+            self.diagnostics_table.heading(column, text=column if column == "count" else f"{column} (ms)")
+            self.diagnostics_table.column(column, width=80, anchor='e')
+        self.diagnostics_table.pack(fill='both', expand=True, padx=5, pady=5)
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        window = self.diagnostics_window
+        if window is None or not window.winfo_exists():
+            self.diagnostics_window = None
+            return
+        table = self.diagnostics_table
+        table.delete(*table.get_children())
+        for stage, stats in self.engine.instruments.snapshot()["stages"].items():
+            values = [stats["count"]] + [
+                "--" if stats[key] is None else f"{stats[key]:.3f}"
+                for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms", "mean_ms")]
+            table.insert("", "end", text=stage, values=values)
+        window.after(1000, self.refresh_diagnostics)
+
+    def save_diagnostics(self):
+        try:
+            filename = f"cpu_cooling_diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            self.engine.instruments.dump_json(filename)
+            print(f"Diagnostics saved to {filename}")
+        except Exception as e:
+            print(f"Error saving diagnostics: {str(e)}")
+
     def run(self):
+        self.engine.start()
         try:
             self.root.mainloop()
         finally:
-            self.running = False  # Signal the update thread to stop
-            if hasattr(self, 'update_thread'):
-                self.update_thread.join(timeout=1.0)  # Wait for thread to finish
+            self.engine.stop()  # Signal the sampling thread to stop
+
+
+def _horizon_label(seconds):
+    return f"{seconds / 60:g} min" if seconds >= 60 else f"{seconds:g} s"
+
+
+def run_headless(engine, diagnostics_path=None):
+    # Service mode: no Tk window or matplotlib figure, only status changes are reported
+    last_status = [None]
+
+    def report(sample):
+        if sample.status != last_status[0]:
+            last_status[0] = sample.status
+            print(f"{datetime.fromtimestamp(sample.timestamp):%Y-%m-%d %H:%M:%S} "
+                  f"{sample.status.upper()}: {sample.temperature:.1f} °C, "
+                  f"usage {sample.usage}%, fan {sample.fan_speed}%")
+
+    def report_throttling(episode):
+        # Called by the detector when an episode opens and again once it has closed
+        if episode.end is None:
+            print(f"{datetime.fromtimestamp(episode.start):%Y-%m-%d %H:%M:%S} THROTTLING: "
+                  f"frequency {episode.depth * 100:.0f}% below baseline at {episode.peak_temperature:.1f} °C")
+        else:
+            print(f"{datetime.fromtimestamp(episode.end):%Y-%m-%d %H:%M:%S} THROTTLING ENDED: "
+                  f"{episode.end - episode.start:.0f} s, depth {episode.depth * 100:.0f}%")
+
+    engine.subscribe(report)
+    if engine.throttle_detector is not None:
+        engine.throttle_detector.subscribe(report_throttling)
+
+    # kill -USR1 <pid> dumps the latency histograms without stopping the service (POSIX only)
+    if hasattr(signal, "SIGUSR1"):
+        def dump_diagnostics(signum, frame):
+            path = diagnostics_path or f"cpu_cooling_diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            engine.instruments.dump_json(path)
+            print(f"Diagnostics saved to {path}")
+        signal.signal(signal.SIGUSR1, dump_diagnostics)
+
+    try:
+        engine.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CPU Cooling Agent")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Monitoring interval in seconds (default: 1)")
+    parser.add_argument("--threshold", type=float, default=40,
+                        help="Warning temperature threshold in °C; critical is 15 °C above (default: 40)")
+    parser.add_argument("--log", default=None,
+                        help="Append every sample to this CSV file "
+                             "(headless default: cpu_cooling_logs_[timestamp].csv)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run the sampler, fan controller and logger without the GUI")
+    parser.add_argument("--monitor-only", action="store_true",
+                        help="In headless mode, do not adjust fan speed automatically")
+    parser.add_argument("--log-max-mb", type=float, default=None,
+                        help="Rotate the log once it reaches this size in MB")
+    parser.add_argument("--log-rotate-hours", type=float, default=None,
+                        help="Rotate the log after this many hours")
+    parser.add_argument("--log-gzip", action="store_true",
+                        help="Compress rotated log segments with gzip")
+    parser.add_argument("--log-keep", type=int, default=None,
+                        help="Number of rotated log segments to keep (default: all)")
+    parser.add_argument("--history-size", type=int, default=3600,
+                        help="Number of samples kept in memory (default: 3600)")
+    parser.add_argument("--sensor", choices=["ohm", "acpi", "hwmon", "simulated"], default=None,
+                        help="Try this temperature backend first")
+    parser.add_argument("--fan", choices=["wmi", "acpi", "hwmon", "mock"], default=None,
+                        help="Try this fan control interface first (mock drives no hardware)")
+    parser.add_argument("--fan-channel", action="append", default=None, metavar="CHIP[/pwmN]",
+                        help="Linux hwmon pwm channel the agent may drive, e.g. nct6775/pwm2; repeatable "
+                             "(default: only channels labelled as the CPU fan)")
+    parser.add_argument("--fan-mode", choices=["pid", "step", "curve"], default="pid",
+                        help="Automatic fan control: closed-loop PID (default), the original threshold steps, "
+                             "or the cooling profile's fan curve")
+    parser.add_argument("--profiles", default=None, metavar="PATH",
+                        help="Cooling profile file, reloaded when it changes (default: cooling_profiles.json "
+                             "next to the agent, if present)")
+    parser.add_argument("--prediction-model", choices=["rc", "trend"], default="rc",
+                        help="Forecast from the fitted thermal model (default) or the 10-sample trend line only")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="Record per-stage latency histograms from startup")
+    parser.add_argument("--diagnostics-json", default=None,
+                        help="Write the latency histograms to this JSON file on exit (implies --diagnostics)")
+    parser.add_argument("--per-core", action="store_true",
+                        help="Sample usage, frequency and temperature of every core from startup")
+    parser.add_argument("--throttle-detection", action="store_true",
+                        help="Detect thermal throttling episodes from startup")
+    parser.add_argument("--adaptive-sampling", action="store_true",
+                        help="Sample faster near the warning threshold and slower when idle on battery")
+    parser.add_argument("--min-interval", type=float, default=0.2,
+                        help="Shortest adaptive sampling interval in seconds (default: 0.2)")
+    parser.add_argument("--max-interval", type=float, default=10.0,
+                        help="Longest adaptive sampling interval in seconds, used on battery (default: 10)")
+    parser.add_argument("--fleet", default=None, metavar="URL",
+                        help="Push samples to a fleet collector, e.g. udp://collector:9470 or tcp://collector:9470")
+    parser.add_argument("--fleet-id", default=None,
+                        help="Name this machine reports to the fleet collector (default: host name)")
+    parser.add_argument("--shared-feed", nargs="?", const="cpu_cooling_feed", default=None, metavar="NAME",
+                        help="Publish samples into a shared-memory ring other local tools can read "
+                             "(default name: cpu_cooling_feed)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics on this port (default: off)")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="Interface the metrics endpoint binds to (default: 127.0.0.1)")
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.adaptive_sampling and not 0 < args.min_interval <= args.interval <= args.max_interval:
+        parser.error("--min-interval, --interval and --max-interval must be positive and in that order")
+    if args.fleet:
+        from fleet_telemetry import parse_url
+        try:
+            parse_url(args.fleet)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.history_size < 1:
+        parser.error("--history-size must be at least 1")
+    return args
+
+
+def _exit_on_signal(signum, frame):
+    # Unwinds through the finally blocks and atexit, which hand manually driven fans back to the firmware
+    raise SystemExit(128 + signum)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _exit_on_signal)
+    log_path = args.log
+    if log_path is None and args.headless:
+        log_path = f"cpu_cooling_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    engine = CoolingEngine(interval=args.interval,
+                           warning_threshold=args.threshold,
+                           critical_threshold=args.threshold + 15,
+                           log_path=log_path,
+                           log_max_bytes=int(args.log_max_mb * 1024 * 1024) if args.log_max_mb else None,
+                           log_rotate_interval=args.log_rotate_hours * 3600 if args.log_rotate_hours else None,
+                           log_compress=args.log_gzip,
+                           log_backup_count=args.log_keep,
+                           sensor=args.sensor,
+                           fan_backend=args.fan,
+                           fan_channels=args.fan_channel,
+                           fan_mode=args.fan_mode,
+                           profiles_path=args.profiles,
+                           prediction_model=args.prediction_model,
+                           history_capacity=args.history_size,
+                           adaptive_sampling=args.adaptive_sampling,
+                           min_interval=args.min_interval,
+                           max_interval=args.max_interval,
+                           instrument=args.diagnostics or bool(args.diagnostics_json))
+    if args.per_core:
+        engine.set_core_monitoring(True)
+    if args.throttle_detection:
+        engine.set_throttle_detection(True)
+    exporter = None
+    if args.metrics_port is not None:
+        from metrics_exporter import MetricsExporter
+        exporter = MetricsExporter(engine, host=args.metrics_host, port=args.metrics_port)
+        exporter.start()
+    pusher = None
+    if args.fleet:
+        from fleet_telemetry import FleetPusher
+        pusher = FleetPusher(args.fleet, host_id=args.fleet_id)
+        engine.subscribe(pusher.write)
+    feed = None
+    if args.shared_feed:
+        from shared_feed import SharedFeedWriter
+        try:
+            feed = SharedFeedWriter(args.shared_feed)
+        except OSError as e:
+            print(f"Shared feed disabled: {str(e)}")
+        else:
+            engine.subscribe(feed.write)
+            print(f"Publishing samples to {feed.path}")
+    try:
+        if args.headless:
+            engine.auto_optimize = not args.monitor_only
+            run_headless(engine, args.diagnostics_json)
+        else:
+            app = CPUCoolingAgent(engine)
+            if args.per_core:
+                app.core_monitoring_var.set(True)
+                app.toggle_core_monitoring()
+            if args.throttle_detection:
+                app.throttle_detection_var.set(True)
+                app.toggle_throttle_detection()
+            app.run()
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        if pusher is not None:
+            pusher.close()
+        if feed is not None:
+            engine.stop()  # No sample may reach the feed once it is unmapped
+            feed.close()
+        if args.diagnostics_json:
+            engine.instruments.dump_json(args.diagnostics_json)
+
 
 if __name__ == "__main__":
-    app = CPUCoolingAgent()
-    app.run()
\ No newline at end of file
+    main()
@@ -0,0 +1,468 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import atexit
+import glob
+import json
+import os
+import re
+import stat
+import sys
+import threading
+import time
+
+PWM_MAX = 255  # hwmon pwm attributes take 0-255
+PWM_MANUAL = b"1"  # pwmN_enable value for manual control
+# Laptop embedded controllers whose only pwm channel is the CPU fan
+CPU_FAN_CHIPS = ("thinkpad",)
+# Original pwmN_enable values of the channels in manual mode, for the next start after a kill. The agent
+# runs as root and writes whatever the file names back into sysfs, so it lives in a private, root-owned directory
+PWM_STATE_DIR = "/run/cpu_cooling_agent"
+PWM_STATE_PATH = os.path.join(PWM_STATE_DIR, "pwm_modes.json")
+_ENABLE_VALUE = re.compile(r"\d{1,2}")
+
+
+class FanActuator:
+    """Base class for a fan control interface with long-lived handles."""
+
+    name = "base"
+
+    def open(self):
+        # Discover controllable fans once. Return True when at least one was found.
+        return False
+
+    def set_speed(self, speed):
+        # Drive every discovered fan to `speed` percent. Return True if any fan accepted it.
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class WmiFanActuator(FanActuator):
+    name = "WMI Win32_Fan"
+
+    def __init__(self):
+        self._fans = []  # (fan instance, max speed)
+
+    def open(self):
+        if sys.platform != "win32":
+            return False
+        try:
+            # The instances are bound to the COM apartment of the thread that opens them
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except ImportError:
+                pass
+            import wmi
+            conn = wmi.WMI(namespace="root\\wmi")
+            for fan in conn.instances("Win32_Fan"):
+                if hasattr(fan, 'DesiredSpeed'):
+                    max_speed = fan.MaxSpeed if hasattr(fan, 'MaxSpeed') and fan.MaxSpeed else 5000
+                    self._fans.append((fan, max_speed))
+        except Exception as e:
+            print(f"WMI fan control error: {str(e)}")
+        return bool(self._fans)
+
+    def set_speed(self, speed):
+        controlled = False
+        for fan, max_speed in self._fans:
+            try:
+                # Convert percentage to actual fan speed
+                fan.DesiredSpeed = int((speed / 100.0) * max_speed)
+                controlled = True
+            except Exception as e:
+                print(f"Error controlling individual fan: {str(e)}")
+        return controlled
+
+    def close(self):
+        self._fans = []
+
+
+class AcpiFanActuator(FanActuator):
+    name = "ACPI fan"
+
+    def __init__(self):
+        self._fans = []
+
+    def open(self):
+        if sys.platform != "win32":
+            return False
+        try:
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except ImportError:
+                pass
+            import wmi
+            conn = wmi.WMI(namespace="root\\wmi")
+            self._fans = [fan for fan in conn.instances("ACPI_FanSpeed") if hasattr(fan, 'FanSpeed')]
+        except Exception as e:
+            print(f"ACPI fan control error: {str(e)}")
+        return bool(self._fans)
+
+    def set_speed(self, speed):
+        controlled = False
+        for fan in self._fans:
+            try:
+                fan.FanSpeed = speed
+                controlled = True
+            except Exception as e:
+                print(f"Error controlling ACPI fan: {str(e)}")
+        return controlled
+
+    def close(self):
+        self._fans = []
+
+
+class HwmonPwmActuator(FanActuator):
+    """Linux fans driven through /sys/class/hwmon/hwmon*/pwmN.
+
+    Only CPU fans are taken over: channels listed in `channels` ("chip",
+    "chip/pwmN" or "hwmonX/pwmN", chip being the hwmon name attribute), or
+    without a list the channels labelled as the CPU or processor fan and
+    the fan of CPU_FAN_CHIPS. GPU, case and other fans are never touched.
+
+    Taken channels are switched to manual mode on open() and kept open for
+    writing; close() puts back the mode it found (usually automatic), so the
+    firmware takes over again. close() also runs at interpreter exit, which
+    covers unhandled exceptions and, with the agent's handlers, SIGTERM and
+    SIGHUP. A SIGKILL or power loss leaves the fans in manual mode at the
+    last duty cycle written; the original modes are kept in `state_path`
+    and restored by the next open().
+    """
+
+    name = "Linux hwmon pwm"
+
+    def __init__(self, hwmon_root="/sys/class/hwmon", channels=None, state_path=PWM_STATE_PATH):
+        self.hwmon_root = hwmon_root
+        self.channels = channels
+        self.state_path = state_path
+        self._channels = []  # (pwm fd, enable path, original enable value)
+        self._lock = threading.Lock()  # close() may run from the fan worker and at exit at the same time
+
+    def open(self):
+        if not sys.platform.startswith("linux") and self.hwmon_root == "/sys/class/hwmon":
+            return False
+        restore_saved_pwm_modes(self.state_path, self.hwmon_root)
+        candidates = []
+        for pwm_path in sorted(glob.glob(os.path.join(self.hwmon_root, "hwmon*", "pwm*"))):
+            if not re.search(r"/pwm\d+$", pwm_path):
+                continue  # pwmN_enable, pwmN_mode, ...
+            if not os.path.exists(pwm_path + "_enable"):
+                continue
+            channel = self._channel_name(pwm_path)
+            if self._wanted(pwm_path, channel):
+                self._take(pwm_path)
+            else:
+                candidates.append(channel)
+        if not self._channels and candidates:
+            print(f"hwmon pwm: no CPU fan channel identified among {', '.join(candidates)}; "
+                  f"pick one with --fan-channel")
+        if self._channels:
+            atexit.register(self.close)
+        return bool(self._channels)
+
+    @staticmethod
+    def _channel_name(pwm_path):
+        return f"{_read_text(os.path.join(os.path.dirname(pwm_path), 'name')) or '?'}/{os.path.basename(pwm_path)}"
+
+    def _wanted(self, pwm_path, channel):
+        chip, pwm = channel.split("/")
+        if self.channels is not None:
+            hwmon = os.path.basename(os.path.dirname(pwm_path))
+            return any(entry in (chip, channel, f"{hwmon}/{pwm}") for entry in self.channels)
+        if chip in CPU_FAN_CHIPS:
+            return True
+        # The fan a pwm channel drives usually carries the same index
+        label = _read_text(pwm_path + "_label") or _read_text(pwm_path.replace("/pwm", "/fan") + "_label")
+        return bool(label) and re.search(r"cpu|processor", label, re.IGNORECASE) is not None
+
+    def _take(self, pwm_path):
+        enable_path = pwm_path + "_enable"
+        try:
+            with open(enable_path, "rb") as f:
+                original = f.read().strip()
+            # Recorded before the switch, so a kill right after it can still be undone
+            modes = {path: value.decode("ascii") for _, path, value in self._channels}
+            modes[enable_path] = original.decode("ascii")
+            self._save_state(modes)
+            with open(enable_path, "wb") as f:
+                f.write(PWM_MANUAL)
+        except OSError:
+            return  # Not controllable, or not permitted
+        try:
+            fd = os.open(pwm_path, os.O_WRONLY)
+        except OSError as e:
+            print(f"hwmon pwm error: {str(e)}")
+            _restore_enable(enable_path, original)
+            return
+        self._channels.append((fd, enable_path, original))
+
+    def _save_state(self, modes):
+        # Written to a fresh private file, then renamed over the old one: never follows a planted symlink
+        directory = os.path.dirname(self.state_path)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            _check_private(directory, os.lstat(directory))
+            try:
+                os.unlink(tmp_path)  # Left by a killed run with the same pid
+            except FileNotFoundError:
+                pass
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"pid": os.getpid(), "modes": modes}, f)
+            os.replace(tmp_path, self.state_path)
+        except (OSError, ValueError) as e:
+            print(f"hwmon pwm: cannot record the original fan modes in {self.state_path}: {str(e)}")
+
+    def set_speed(self, speed):
+        value = str(round(speed * PWM_MAX / 100)).encode("ascii")
+        controlled = False
+        for fd, _, _ in self._channels:
+            try:
+                os.pwrite(fd, value, 0)
+                controlled = True
+            except OSError as e:
+                print(f"hwmon pwm error: {str(e)}")
+        return controlled
+
+    def close(self):
+        with self._lock:
+            channels, self._channels = self._channels, []
+            for fd, enable_path, original in channels:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+                _restore_enable(enable_path, original)
+            if channels:
+                atexit.unregister(self.close)
+                try:
+                    os.remove(self.state_path)
+                except OSError:
+                    pass
+
+
+class MockFanActuator(FanActuator):
+    """In-memory fan for tests and benchmarks: records every write, optionally slow or failing."""
+
+    name = "Mock"
+
+    def __init__(self, write_delay=0.0, fail=False):
+        self.write_delay = write_delay
+        self.fail = fail
+        self.speed = None
+        self.writes = []  # (monotonic time, speed)
+
+    def open(self):
+        return True
+
+    def set_speed(self, speed):
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        if self.fail:
+            return False
+        self.speed = speed
+        self.writes.append((time.monotonic(), speed))
+        return True
+
+    @property
+    def calls(self):
+        return len(self.writes)
+
+
+FAN_ACTUATORS = {
+    "wmi": WmiFanActuator,
+    "acpi": AcpiFanActuator,
+    "hwmon": HwmonPwmActuator,
+    "mock": MockFanActuator,
+}
+
+
+def select_fan_actuator(preferred=None, hwmon_channels=None):
+    """Open the first fan interface with controllable fans, trying `preferred` first. None if there is none.
+
+    `hwmon_channels` is the allow-list handed to HwmonPwmActuator.
+    """
+    order = ["wmi", "acpi", "hwmon"]
+    if preferred:
+        if preferred not in FAN_ACTUATORS:
+            raise ValueError(f"Unknown fan actuator: {preferred}")
+        if preferred in order:
+            order.remove(preferred)
+        order.insert(0, preferred)
+
+    for key in order:
+        actuator = HwmonPwmActuator(channels=hwmon_channels) if key == "hwmon" else FAN_ACTUATORS[key]()
+        if actuator.open():
+            print(f"Using {actuator.name} fan control")
+            return actuator
+    print("No controllable fans found")
+    return None
+
+
+class FanWorker:
+    """Applies fan speeds from a dedicated thread so callers never block on hardware.
+
+    set_speed() only records the target and returns. The worker opens the
+    actuator once, then writes the newest target at most every `min_interval`
+    seconds; targets superseded in between (e.g. while a slider is dragged)
+    are dropped, and a target within `min_delta` percent of the speed already
+    applied is skipped, except for the 0 % and 100 % endpoints.
+    """
+
+    def __init__(self, open_actuator, min_delta=2, min_interval=0.2):
+        self._open_actuator = open_actuator  # Called on the worker thread; returns a FanActuator or None
+        self.min_delta = min_delta
+        self.min_interval = min_interval
+        self.actuator = None
+        self.available = True  # False once discovery or a write has failed
+        self.applied = None  # Last speed the hardware accepted
+        self.written = 0
+        self.skipped = 0  # Targets within min_delta of the applied speed
+        self.coalesced = 0  # Targets replaced by a newer one before they were written
+        self._cond = threading.Condition()
+        self._target = None
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="fan-actuator", daemon=True)
+        self._thread.start()
+
+    def set_speed(self, speed):
+        with self._cond:
+            if self._target is not None:
+                self.coalesced += 1
+            self._target = speed
+            self._cond.notify()
+        return self.available
+
+    def close(self, timeout=1.0):
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        try:
+            self.actuator = self._open_actuator()
+        except Exception as e:
+            print(f"Fan control error: {str(e)}")
+        if self.actuator is None:
+            self.available = False
+            return
+
+        next_write = 0.0
+        try:
+            while True:
+                with self._cond:
+                    while not self._closing:
+                        delay = next_write - time.monotonic()
+                        if self._target is not None and delay <= 0:
+                            break
+                        self._cond.wait(delay if self._target is not None else None)
+                    if self._closing:
+                        break
+                    speed, self._target = self._target, None
+
+                if self.applied is not None and (speed == self.applied or (
+                        abs(speed - self.applied) < self.min_delta and speed not in (0, 100))):
+                    self.skipped += 1
+                    continue
+                next_write = time.monotonic() + self.min_interval
+                if self._write(speed):
+                    self.applied = speed
+                    self.written += 1
+                else:
+                    print(f"{self.actuator.name} rejected fan speed {speed}%")
+                    self.available = False
+        finally:
+            self.actuator.close()
+
+    def _write(self, speed):
+        return self.actuator.set_speed(speed)
+
+
+def restore_saved_pwm_modes(state_path=PWM_STATE_PATH, hwmon_root="/sys/class/hwmon"):
+    """Hand fans left in manual mode by a killed agent back to the firmware. Returns the channels restored.
+
+    Only a private file owned by this user is trusted, and of it only
+    entries naming a pwmN_enable attribute under `hwmon_root` with a small
+    integer value; anything else is ignored.
+    """
+    try:
+        _check_private(os.path.dirname(state_path), os.lstat(os.path.dirname(state_path)))
+        fd = os.open(state_path, os.O_RDONLY | os.O_NOFOLLOW)
+        with os.fdopen(fd) as f:
+            _check_private(state_path, os.fstat(f.fileno()))
+            state = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"hwmon pwm: ignoring fan mode state {state_path}: {str(e)}")
+        return 0
+    if not isinstance(state, dict) or not isinstance(state.get("modes"), dict):
+        return 0
+    pid = state.get("pid")
+    if pid != os.getpid() and _pid_alive(pid):
+        return 0  # Another agent still drives these fans
+    # Resolved, so a link planted among the attributes cannot point the restore elsewhere
+    allowed = {real for real in (os.path.realpath(path)
+                                 for path in glob.glob(os.path.join(hwmon_root, "hwmon*", "pwm*_enable")))
+               if re.search(r"/hwmon\d+/pwm\d+_enable$", real)}
+    restored = 0
+    for enable_path, value in state["modes"].items():
+        if (not isinstance(value, str) or not _ENABLE_VALUE.fullmatch(value)
+                or os.path.realpath(enable_path) not in allowed):
+            print(f"hwmon pwm: ignoring fan mode state entry {enable_path!r}: {value!r}")
+            continue
+        _restore_enable(enable_path, value.encode("ascii"))
+        restored += 1
+    try:
+        os.remove(state_path)
+    except OSError:
+        pass
+    if restored:
+        print(f"Restored the fan modes left behind by agent process {pid}")
+    return restored
+
+
+def _check_private(path, st):
+    """Raise ValueError unless `st` describes a file or directory only this user can write."""
+    if stat.S_ISLNK(st.st_mode) or not (stat.S_ISREG(st.st_mode) or stat.S_ISDIR(st.st_mode)):
+        raise ValueError(f"{path} is not a regular file or directory")
+    if st.st_uid != os.geteuid():
+        raise ValueError(f"{path} is owned by uid {st.st_uid}, not {os.geteuid()}")
+    if st.st_mode & 0o022:
+        raise ValueError(f"{path} is writable by other users")
+
+
+def _pid_alive(pid):
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_text(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _restore_enable(path, value):
+    try:
+        with open(path, "wb") as f:
+            f.write(value)
+    except OSError:
+        pass
@@ -0,0 +1,116 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+FAN_MODES = ("pid", "step", "curve")
+
+
+class PidFanController:
+    """Closed-loop fan controller holding the CPU at a target temperature.
+
+    The integral term carries the steady-state fan speed and is clamped to
+    [min_speed, max_speed]; it stops integrating while the output is
+    saturated in the direction of the error (anti-windup). The derivative
+    acts on the measured temperature rather than the error, so setpoint
+    changes do not kick the fan. With a prediction, `feed_forward` adds fan
+    speed in proportion to the rise the trend predicts before the error
+    shows up.
+
+    Output changes smaller than `hysteresis` percent are held back, larger
+    ones are applied at most `slew_rate` percent per second, and errors
+    within `deadband` °C count as zero, so sensor noise does not reach the
+    fan. The slewed speed is kept as a float and only rounded for the fan,
+    so the slew limit holds at any sampling interval. The fan speed changes
+    at most once every `min_hold` seconds; in between the slewed speed keeps
+    moving and the next change catches up with it. At or above the critical
+    temperature the fan goes to `max_speed` at once.
+
+    The controller starts from whatever speed the fan is at and restarts the
+    same way after a gap longer than `max_gap` seconds or when something else
+    (the user, quick cool) has changed the speed, so switching to automatic
+    control never makes the fan jump.
+    """
+
+    def __init__(self, kp=6.0, ki=0.1, kd=10.0, feed_forward=1.5, min_speed=25, max_speed=100,
+                 slew_rate=5.0, hysteresis=3, deadband=0.5, min_hold=5.0, max_gap=30.0):
+        self.kp = kp  # % per °C of error
+        self.ki = ki  # % per °C·s of accumulated error
+        self.kd = kd  # % per °C/s of temperature change
+        self.feed_forward = feed_forward  # % per °C of predicted rise
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.slew_rate = slew_rate  # % per second
+        self.hysteresis = hysteresis  # %
+        self.deadband = deadband  # °C
+        self.min_hold = min_hold  # Seconds between fan speed changes
+        self.max_gap = max_gap  # Seconds without an update after which the controller restarts
+        self.reset()
+
+    def reset(self):
+        self.output = None  # Last speed returned
+        self.level = None  # Slewed speed, unrounded
+        self.integral = 0.0
+        self._derivative = 0.0  # Low-pass filtered dT/dt
+        self._last_time = None
+        self._last_temp = None
+        self._changed_at = None  # Time of the last change of output
+
+    def configure(self, **tuning):
+        """Change tuning parameters in place; the running state is kept."""
+        for name, value in tuning.items():
+            if not hasattr(self, name) or name.startswith("_"):
+                raise ValueError(f"Unknown controller parameter: {name}")
+            setattr(self, name, value)
+
+    def update(self, timestamp, temp, setpoint, predicted=None, current=None, critical=None):
+        """Return the fan speed (int %) for this sample.
+
+        `predicted` is the temperature expected at the prediction horizon,
+        `current` the speed the fan is actually at and `critical` the
+        temperature that forces full speed.
+        """
+        dt = None if self._last_time is None else timestamp - self._last_time
+        if (self.output is None or dt is None or not 0 < dt <= self.max_gap
+                or (current is not None and current != self.output)):
+            self._restart(timestamp, temp, current)
+            if critical is not None and temp >= critical:
+                self.output = self.level = self.integral = self.max_speed
+            return self.output
+
+        error = temp - setpoint
+        if abs(error) < self.deadband:
+            error = 0.0
+        self._derivative += 0.5 * ((temp - self._last_temp) / dt - self._derivative)
+        self._last_time, self._last_temp = timestamp, temp
+
+        correction = self.kp * error + self.kd * self._derivative
+        if predicted is not None:
+            correction += self.feed_forward * (predicted - temp)
+        integral = self.integral + self.ki * error * dt
+        unclamped = integral + correction
+        # Conditional integration: do not wind up while pinned against a limit
+        if not ((unclamped > self.max_speed and error > 0) or (unclamped < self.min_speed and error < 0)):
+            self.integral = min(self.max_speed, max(self.min_speed, integral))
+        target = min(self.max_speed, max(self.min_speed, self.integral + correction))
+
+        if critical is not None and temp >= critical:
+            if self.output != self.max_speed:
+                self._changed_at = timestamp
+            self.output = self.level = self.max_speed
+            return self.output
+        if abs(target - self.level) >= self.hysteresis or target in (self.min_speed, self.max_speed):
+            step = self.slew_rate * dt
+            self.level = min(self.level + step, max(self.level - step, target))
+        speed = int(round(self.level))
+        if speed != self.output and (self._changed_at is None or timestamp - self._changed_at >= self.min_hold):
+            self.output = speed
+            self._changed_at = timestamp
+        return self.output
+
+    def _restart(self, timestamp, temp, current):
+        speed = self.min_speed if current is None else current
+        self.output = int(min(self.max_speed, max(self.min_speed, speed)))
+        self.level = self.integral = float(self.output)
+        self._derivative = 0.0
+        self._last_time, self._last_temp = timestamp, temp
+        self._changed_at = None
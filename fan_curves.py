@@ -0,0 +1,287 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+"""Cooling profiles loaded from a JSON file.
+
+Each profile has a piecewise-linear fan curve of [temperature °C, speed %]
+points with a hysteresis band, its warning and critical thresholds, the
+PID mode's target margin and controller tuning:
+
+    {"version": 1, "profiles": {"balanced": {
+        "warning_threshold": 20, "critical_threshold": 35,
+        "curve": [[29.25, 90], [30.5, 100]], "hysteresis": 1.5,
+        "target_margin": 3, "controller": {"kp": 6.0, "ki": 0.1}}}}
+
+Curves are compiled into lookup tables when the file is loaded, so the
+control loop evaluates them with one index computation. The engine polls
+the file and swaps in the new profiles when it changes; a file that fails
+validation is reported and the running profiles are kept.
+
+    python fan_curves.py check cooling_profiles.json
+    python fan_curves.py defaults > cooling_profiles.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from fan_controller import PidFanController
+
+CONFIG_VERSION = 1
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cooling_profiles.json")
+
+# Lookup tables cover this range in steps of 1 / TABLE_STEPS_PER_DEGREE °C; readings outside it are clamped
+TABLE_MIN_TEMP = 0.0
+TABLE_MAX_TEMP = 125.0
+TABLE_STEPS_PER_DEGREE = 10
+
+CONTROLLER_PARAMETERS = ("kp", "ki", "kd", "feed_forward", "min_speed", "max_speed", "slew_rate", "hysteresis",
+                         "deadband", "min_hold", "max_gap")
+PROFILE_KEYS = {"warning_threshold", "critical_threshold", "curve", "hysteresis", "target_margin", "controller"}
+
+# Built-in profiles, used when no profile file exists; cooling_profiles.json ships the same values
+DEFAULT_PROFILES = {
+    "silent": {
+        "warning_threshold": 18,
+        "critical_threshold": 33,
+        "curve": [[26.43, 80], [29.29, 100]],
+        "hysteresis": 2.0,
+        "target_margin": 0,
+        "controller": dict(kp=4.0, ki=0.05, kd=5.0, feed_forward=1.0, min_speed=20,
+                           slew_rate=2.0, hysteresis=4, deadband=1.0),
+    },
+    "balanced": {
+        "warning_threshold": 20,
+        "critical_threshold": 35,
+        "curve": [[29.25, 90], [30.5, 100]],
+        "hysteresis": 1.5,
+        "target_margin": 3,
+        "controller": dict(kp=6.0, ki=0.1, kd=10.0, feed_forward=1.5, min_speed=25,
+                           slew_rate=5.0, hysteresis=3, deadband=0.5),
+    },
+    "performance": {
+        "warning_threshold": 22,
+        "critical_threshold": 37,
+        "curve": [[20, 100]],
+        "hysteresis": 1.0,
+        "target_margin": 6,
+        "controller": dict(kp=8.0, ki=0.15, kd=10.0, feed_forward=2.0, min_speed=35,
+                           slew_rate=10.0, hysteresis=2, deadband=0.5),
+    },
+}
+
+
+class FanCurve:
+    """Piecewise-linear temperature -> fan speed curve compiled to a lookup table.
+
+    Below the first point and above the last the curve stays flat. With a
+    hysteresis band of h °C, speed(temp, current) raises the fan as soon as
+    the curve asks for more, but lowers it only once the temperature is h °C
+    below where the curve would give the current speed.
+    """
+
+    def __init__(self, points, hysteresis=0.0):
+        self.points = [(float(temp), float(speed)) for temp, speed in points]
+        self.hysteresis = float(hysteresis)
+        temps, speeds = zip(*self.points)
+        grid = np.linspace(TABLE_MIN_TEMP, TABLE_MAX_TEMP,
+                           int(round((TABLE_MAX_TEMP - TABLE_MIN_TEMP) * TABLE_STEPS_PER_DEGREE)) + 1)
+        # A plain list: indexing it is cheaper than indexing a NumPy array for one value
+        self._table = np.rint(np.interp(grid, temps, speeds)).astype(int).tolist()
+        self._last = len(self._table) - 1
+        self._band = int(round(self.hysteresis * TABLE_STEPS_PER_DEGREE))
+
+    def _index(self, temp):
+        i = int((temp - TABLE_MIN_TEMP) * TABLE_STEPS_PER_DEGREE + 0.5)
+        return 0 if i < 0 else self._last if i > self._last else i
+
+    def __call__(self, temp):
+        """Speed (int %) the curve gives at `temp`, without hysteresis."""
+        return self._table[self._index(temp)]
+
+    def speed(self, temp, current=None):
+        """Speed (int %) for `temp` when the fan currently runs at `current` %."""
+        i = self._index(temp)
+        up = self._table[i]
+        if current is None or up >= current:
+            return up
+        down = self._table[min(i + self._band, self._last)]
+        return down if down < current else current
+
+
+def _number(value, where, low=None, high=None):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        raise ValueError(f"{where}: expected a number, got {value!r}")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f"{where}: {value} is outside [{low}, {high}]")
+    return value
+
+
+def validate_profile(name, spec):
+    """Raise ValueError describing the first problem in one profile definition.
+
+    Returns a PidFanController with the profile's tuning, defaults filled in.
+    """
+    where = f"profiles.{name}"
+    if not isinstance(spec, dict):
+        raise ValueError(f"{where}: expected an object")
+    unknown = set(spec) - PROFILE_KEYS
+    if unknown:
+        raise ValueError(f"{where}: unknown keys {sorted(unknown)}")
+    missing = {"warning_threshold", "critical_threshold", "curve"} - set(spec)
+    if missing:
+        raise ValueError(f"{where}: missing keys {sorted(missing)}")
+
+    warning = _number(spec["warning_threshold"], f"{where}.warning_threshold", TABLE_MIN_TEMP, TABLE_MAX_TEMP)
+    critical = _number(spec["critical_threshold"], f"{where}.critical_threshold", TABLE_MIN_TEMP, TABLE_MAX_TEMP)
+    if critical <= warning:
+        raise ValueError(f"{where}: critical_threshold must be above warning_threshold")
+    _number(spec.get("hysteresis", 0.0), f"{where}.hysteresis", 0.0, 20.0)
+    _number(spec.get("target_margin", 0.0), f"{where}.target_margin", 0.0, warning)
+
+    curve = spec["curve"]
+    if not isinstance(curve, list) or not curve:
+        raise ValueError(f"{where}.curve: expected a non-empty list of [temperature, speed] points")
+    previous = None
+    for i, point in enumerate(curve):
+        if not isinstance(point, list) or len(point) != 2:
+            raise ValueError(f"{where}.curve[{i}]: expected [temperature, speed]")
+        temp = _number(point[0], f"{where}.curve[{i}] temperature", TABLE_MIN_TEMP, TABLE_MAX_TEMP)
+        speed = _number(point[1], f"{where}.curve[{i}] speed", 0, 100)
+        if previous is not None:
+            if temp <= previous[0]:
+                raise ValueError(f"{where}.curve[{i}]: temperatures must increase")
+            if speed < previous[1]:
+                raise ValueError(f"{where}.curve[{i}]: the fan may not slow down as the temperature rises")
+        previous = (temp, speed)
+
+    controller = spec.get("controller", {})
+    if not isinstance(controller, dict):
+        raise ValueError(f"{where}.controller: expected an object")
+    for key, value in controller.items():
+        if key not in CONTROLLER_PARAMETERS:
+            raise ValueError(f"{where}.controller: unknown parameter {key!r}")
+        _number(value, f"{where}.controller.{key}", 0)
+    tuned = PidFanController(**controller)
+    if not 0 <= tuned.min_speed <= tuned.max_speed <= 100:
+        raise ValueError(f"{where}.controller: need 0 <= min_speed <= max_speed <= 100")
+    return tuned
+
+
+def compile_profiles(definitions):
+    """Validate profile definitions and compile them for the engine.
+
+    Returns {name: profile}; each profile carries the thresholds, target
+    margin, the full controller tuning and "fan_curve", a FanCurve.
+    """
+    if not isinstance(definitions, dict) or not definitions:
+        raise ValueError("profiles: expected a non-empty object")
+    profiles = {}
+    for name, spec in definitions.items():
+        tuned = validate_profile(name, spec)
+        profiles[name] = {
+            "warning_threshold": spec["warning_threshold"],
+            "critical_threshold": spec["critical_threshold"],
+            "target_margin": spec.get("target_margin", 0),
+            # Every parameter, so switching profiles never leaves a setting from the previous one behind
+            "controller": {param: getattr(tuned, param) for param in CONTROLLER_PARAMETERS},
+            "fan_curve": FanCurve(spec["curve"], spec.get("hysteresis", 0.0)),
+        }
+    return profiles
+
+
+def load_profiles(path):
+    """Read, validate and compile a profile file; ValueError names the file and the problem."""
+    with open(path) as f:
+        try:
+            config = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: not valid JSON ({str(e)})")
+    if not isinstance(config, dict):
+        raise ValueError(f"{path}: expected an object with 'version' and 'profiles'")
+    if config.get("version") != CONFIG_VERSION:
+        raise ValueError(f"{path}: profile file version {config.get('version')!r}, expected {CONFIG_VERSION}")
+    try:
+        return compile_profiles(config.get("profiles"))
+    except ValueError as e:
+        raise ValueError(f"{path}: {str(e)}")
+
+
+class ProfileFile:
+    """Profile file watched for changes by modification time and size.
+
+    poll() is cheap while the file is unchanged (one stat) and returns the
+    current profiles; after a change it loads and validates the new file.
+    A file that fails to load is reported once and the previous profiles
+    stay in effect until it is fixed. With `fallback`, a file that cannot be
+    loaded at all is reported the same way and the fallback profiles are
+    used until it can; without one, the error is raised.
+    """
+
+    def __init__(self, path, fallback=None):
+        self.path = path
+        self.reloads = 0
+        self.errors = 0
+        self._stamp = self._stat()
+        try:
+            self.profiles = load_profiles(path)
+        except (OSError, ValueError) as e:
+            if fallback is None:
+                raise
+            self.errors += 1
+            print(f"Cooling profiles not loaded: {str(e)}; using the built-in profiles")
+            self.profiles = fallback
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self):
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return self.profiles
+        self._stamp = stamp
+        try:
+            self.profiles = load_profiles(self.path)
+        except (OSError, ValueError) as e:
+            self.errors += 1
+            print(f"Cooling profiles not reloaded: {str(e)}")
+            return self.profiles
+        self.reloads += 1
+        print(f"Reloaded cooling profiles from {self.path}")
+        return self.profiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and generate cooling profile files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("check", help="Validate a profile file and print its curves")
+    check.add_argument("path")
+    sub.add_parser("defaults", help="Print the built-in profiles as a profile file")
+    args = parser.parse_args(argv)
+
+    if args.command == "defaults":
+        print(json.dumps({"version": CONFIG_VERSION, "profiles": DEFAULT_PROFILES}, indent=2))
+        return 0
+    try:
+        profiles = load_profiles(args.path)
+    except (OSError, ValueError) as e:
+        print(str(e))
+        return 1
+    for name, profile in profiles.items():
+        curve = profile["fan_curve"]
+        points = ", ".join(f"{temp:g} °C: {speed:g}%" for temp, speed in curve.points)
+        print(f"{name}: warning {profile['warning_threshold']} °C, critical {profile['critical_threshold']} °C, "
+              f"hysteresis {curve.hysteresis:g} °C, curve {points}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
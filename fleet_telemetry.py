@@ -0,0 +1,578 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+"""Fleet telemetry: agents push batched samples to one collector.
+
+Each packet is a 12-byte header (magic, version, host id length, record
+count, per-sender sequence number), the host id in UTF-8 and `count`
+fixed-width FLEET_DTYPE records. Over UDP one packet is one datagram; over
+TCP every packet is preceded by its length as a little-endian uint32.
+
+    python fleet_telemetry.py collect --port 9470 --http-port 9471
+    python cpu_cooling_agent.py --headless --fleet udp://collector:9470
+
+The collector keeps a ring of recent samples per host and answers
+"hottest hosts now" and per-host history queries over HTTP/JSON:
+    /hottest?n=10   /hosts   /hosts/<host>/history?seconds=600   /stats
+"""
+
+import argparse
+import heapq
+import json
+import queue
+import selectors
+import socket
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from history_store import SampleHistory
+
+MAGIC = b"CFLT"
+VERSION = 1
+DEFAULT_PORT = 9470
+DEFAULT_HTTP_PORT = 9471
+MAX_DATAGRAM = 1400  # Stays under a 1500-byte Ethernet MTU with IP/UDP headers
+MAX_FRAME = 1 << 20  # Largest TCP frame the collector accepts
+
+# 36 bytes per sample
+FLEET_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("temperature", "<f4"),
+    ("usage", "<f4"),
+    ("power", "<f4"),
+    ("fan_speed", "<f4"),
+    ("health", "<f4"),
+    ("throttle", "<f4"),  # Frequency drop below baseline while throttled, 0 otherwise
+    ("flags", "<u4"),
+])
+FLEET_FIELDS = FLEET_DTYPE.names
+
+FLAG_WARNING = 1
+FLAG_CRITICAL = 2
+FLAG_THROTTLED = 4
+
+# magic, version, host id length, record count, sequence number
+_HEADER = struct.Struct("<4sBBHI")
+_FRAME = struct.Struct("<I")
+
+
+def sample_flags(sample):
+    flags = FLAG_WARNING if sample.status == "warning" else FLAG_CRITICAL if sample.status == "critical" else 0
+    if sample.throttle > 0:
+        flags |= FLAG_THROTTLED
+    return flags
+
+
+def records_from_samples(samples):
+    records = np.empty(len(samples), dtype=FLEET_DTYPE)
+    for name in FLEET_FIELDS[:-1]:
+        records[name] = [getattr(sample, name) for sample in samples]
+    records["flags"] = [sample_flags(sample) for sample in samples]
+    return records
+
+
+def encode_packet(host_id, seq, records):
+    host = host_id.encode("utf-8")
+    if len(host) > 255:
+        raise ValueError("Host id must be at most 255 bytes")
+    return _HEADER.pack(MAGIC, VERSION, len(host), len(records), seq & 0xFFFFFFFF) + host + records.tobytes()
+
+
+def decode_packet(data):
+    """Return (host id, sequence number, records) of one packet; records is a view into `data`."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated fleet packet")
+    magic, version, host_len, count, seq = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a fleet packet")
+    if version != VERSION:
+        raise ValueError(f"Fleet packet version {version}, expected {VERSION}")
+    start = _HEADER.size + host_len
+    if len(data) != start + count * FLEET_DTYPE.itemsize:
+        raise ValueError("Fleet packet length does not match its record count")
+    host = bytes(data[_HEADER.size:start]).decode("utf-8")
+    return host, seq, np.frombuffer(data, dtype=FLEET_DTYPE, count=count, offset=start)
+
+
+def max_records(host_id, transport):
+    """Largest batch that fits one packet on `transport` ("udp" or "tcp")."""
+    limit = MAX_DATAGRAM if transport == "udp" else MAX_FRAME
+    return (limit - _HEADER.size - len(host_id.encode("utf-8"))) // FLEET_DTYPE.itemsize
+
+
+def parse_url(url):
+    """("udp" | "tcp", host, port) from udp://host:port or tcp://host:port."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("udp", "tcp") or not parts.hostname:
+        raise ValueError(f"Fleet URL must look like udp://host:port or tcp://host:port, got {url}")
+    return parts.scheme, parts.hostname, parts.port or DEFAULT_PORT
+
+
+class FleetPusher:
+    """Sends the engine's samples to a fleet collector in batches.
+
+    write() only enqueues the sample (subscribe it to the engine); a
+    background thread sends a packet once `batch_size` samples are waiting
+    or every `flush_interval` seconds. The collector's name is resolved
+    when the socket is opened, not per packet. A failed send drops that
+    batch and the socket; the next one resolves and connects again no
+    sooner than `reconnect_delay` seconds later, so a collector outage never
+    backs up into the agent.
+    """
+
+    def __init__(self, url, host_id=None, batch_size=None, flush_interval=5.0, queue_size=10000,
+                 reconnect_delay=5.0):
+        self.transport, self.host, self.port = parse_url(url)
+        self.host_id = host_id or socket.gethostname()
+        limit = max_records(self.host_id, self.transport)
+        self.batch_size = limit if batch_size is None else min(batch_size, limit)
+        self.flush_interval = flush_interval
+        self.reconnect_delay = reconnect_delay
+
+        self.sent = 0  # Samples handed to the network
+        self.packets = 0
+        self.dropped = 0  # Samples lost to a full queue or a failed send
+        self._seq = 0
+        self._socket = None
+        self._address = None  # Resolved collector address, set with the socket
+        self._next_connect = 0.0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="fleet-pusher", daemon=True)
+        self._thread.start()
+
+    def write(self, sample):
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        self._queue.put(None)  # Sentinel: send what is left and stop
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        batch = []
+        last_flush = time.monotonic()
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+                    while len(batch) < self.batch_size:
+                        item = self._queue.get_nowait()
+                        if item is None:
+                            stopping = True
+                            break
+                        batch.append(item)
+            except queue.Empty:
+                pass
+
+            if batch and (stopping or len(batch) >= self.batch_size
+                          or time.monotonic() - last_flush >= self.flush_interval):
+                self._send(batch)
+                batch = []
+                last_flush = time.monotonic()
+        if self._socket is not None:
+            self._socket.close()
+
+    def _send(self, batch):
+        packet = encode_packet(self.host_id, self._seq, records_from_samples(batch))
+        self._seq += 1
+        try:
+            sock = self._connect()
+            if sock is None:
+                self.dropped += len(batch)
+                return
+            if self.transport == "udp":
+                sock.sendto(packet, self._address)
+            else:
+                sock.sendall(_FRAME.pack(len(packet)) + packet)
+        except OSError as e:
+            print(f"Fleet send error: {str(e)}")
+            self.dropped += len(batch)
+            # The collector may have moved: resolve its name again with the next socket
+            self._socket.close()
+            self._socket = None
+            self._next_connect = time.monotonic() + self.reconnect_delay
+            return
+        self.sent += len(batch)
+        self.packets += 1
+
+    def _connect(self):
+        if self._socket is not None:
+            return self._socket
+        if time.monotonic() < self._next_connect:
+            return None
+        if self.transport == "udp":
+            try:
+                family, kind, proto, _, address = socket.getaddrinfo(self.host, self.port, socket.AF_INET,
+                                                                     socket.SOCK_DGRAM)[0]
+            except OSError as e:
+                print(f"Fleet collector unreachable: {str(e)}")
+                self._next_connect = time.monotonic() + self.reconnect_delay
+                return None
+            self._address = address
+            self._socket = socket.socket(family, kind, proto)
+            return self._socket
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.flush_interval)
+        except OSError as e:
+            print(f"Fleet collector unreachable: {str(e)}")
+            self._next_connect = time.monotonic() + self.reconnect_delay
+            return None
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket = sock
+        return sock
+
+
+class _HostState:
+    __slots__ = ("history", "latest", "temperature", "last_seen", "samples", "packets", "lost_packets", "next_seq")
+
+    def __init__(self, capacity):
+        self.history = SampleHistory(capacity, FLEET_FIELDS)
+        self.latest = None  # Newest record
+        self.temperature = 0.0  # Its temperature as a float, so ranking hosts touches no numpy scalars
+        self.last_seen = 0.0  # Collector wall time of the newest packet
+        self.samples = 0
+        self.packets = 0
+        self.lost_packets = 0  # Sequence gaps, i.e. UDP datagrams that never arrived
+        self.next_seq = None
+
+
+class FleetCollector:
+    """Ingests fleet packets into one SampleHistory ring per host.
+
+    A single thread serves the UDP socket, the TCP listener and every TCP
+    connection through a selector, decoding each packet as a zero-copy
+    record view and appending the whole batch to the host's ring in one
+    block copy. Queries may run from any thread.
+
+    Packets are not authenticated, so every new host id costs a ring of
+    `capacity` samples on anyone's say-so. At most `max_hosts` hosts are
+    kept: once full, hosts silent for longer than `stale_after` are evicted
+    to make room and packets from new host ids are dropped while none is.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, capacity=3600, stale_after=60.0, udp=True, tcp=True,
+                 http_port=None, receive_buffer=4 << 20, max_hosts=4096):
+        self.host = host
+        self.port = port
+        self.capacity = capacity  # Samples kept per host
+        self.stale_after = stale_after  # Hosts silent for longer are left out of hottest() and may be evicted
+        self.max_hosts = max_hosts
+        self.udp = udp
+        self.tcp = tcp
+        self.http_port = http_port
+        self.receive_buffer = receive_buffer
+
+        self.samples = 0
+        self.packets = 0
+        self.errors = 0  # Malformed packets
+        self.evicted_hosts = 0  # Stale hosts dropped to make room for new ones
+        self.rejected_packets = 0  # Packets from new host ids that arrived while max_hosts were live
+        self._next_eviction = 0.0  # Earliest time of the next stale-host sweep while full
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._selector = None
+        self._udp_socket = None
+        self._tcp_socket = None
+        self._stopped = False
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        self._selector = selectors.DefaultSelector()
+        if self.udp:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+            sock.bind((self.host, self.port))
+            sock.setblocking(False)
+            self.port = sock.getsockname()[1]  # Resolved when port 0 was requested
+            self._udp_socket = sock
+            self._selector.register(sock, selectors.EVENT_READ, self._read_datagrams)
+        if self.tcp:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port))  # Same port number as UDP
+            sock.listen(128)
+            sock.setblocking(False)
+            self.port = sock.getsockname()[1]
+            self._tcp_socket = sock
+            self._selector.register(sock, selectors.EVENT_READ, self._accept)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="fleet-collector", daemon=True)
+        self._thread.start()
+        if self.http_port is not None:
+            self._start_http()
+        print(f"Collecting fleet samples on {self.host}:{self.port}")
+
+    def stop(self, timeout=2.0):
+        self._stopped = True
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _run(self):
+        selector = self._selector
+        while not self._stopped:
+            for key, _ in selector.select(timeout=0.5):
+                key.data(key.fileobj)
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+
+    def _read_datagrams(self, sock):
+        # Drain everything queued so one wakeup handles a burst
+        while True:
+            try:
+                data = sock.recv(65536)
+            except BlockingIOError:
+                return
+            self._ingest_packet(data)
+
+    def _accept(self, sock):
+        try:
+            conn, _ = sock.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        buffer = bytearray()
+        self._selector.register(conn, selectors.EVENT_READ, lambda c: self._read_stream(c, buffer))
+
+    def _read_stream(self, conn, buffer):
+        try:
+            data = conn.recv(262144)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._selector.unregister(conn)
+            conn.close()
+            return
+        buffer += data
+        offset = 0
+        while len(buffer) - offset >= _FRAME.size:
+            length, = _FRAME.unpack_from(buffer, offset)
+            if length > MAX_FRAME:
+                self.errors += 1
+                self._selector.unregister(conn)
+                conn.close()
+                return
+            end = offset + _FRAME.size + length
+            if end > len(buffer):
+                break
+            self._ingest_packet(bytes(buffer[offset + _FRAME.size:end]))
+            offset = end
+        del buffer[:offset]
+
+    def _ingest_packet(self, data):
+        try:
+            host, seq, records = decode_packet(data)
+        except ValueError:
+            self.errors += 1
+            return
+        self.ingest(host, records, seq)
+
+    def ingest(self, host, records, seq=None):
+        """Append a batch of FLEET_DTYPE records for `host`, oldest first."""
+        if not len(records):
+            return
+        block = np.vstack([records[name] for name in FLEET_FIELDS])
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                if len(self._hosts) >= self.max_hosts and not self._evict_stale():
+                    self.rejected_packets += 1
+                    return
+                state = self._hosts[host] = _HostState(self.capacity)
+            if seq is not None:
+                if state.next_seq is not None and seq > state.next_seq:
+                    state.lost_packets += seq - state.next_seq
+                state.next_seq = seq + 1  # A lower number means the agent restarted; resync
+            state.history.extend(block)
+            state.latest = records[-1].copy()
+            state.temperature = float(block[1, -1])
+            state.last_seen = time.time()
+            state.samples += len(records)
+            state.packets += 1
+            self.samples += len(records)
+            self.packets += 1
+
+    def _evict_stale(self):
+        # Called with the lock held once full; a flood of new ids triggers at most one O(hosts) sweep per second
+        now = time.time()
+        if now < self._next_eviction:
+            return False
+        self._next_eviction = now + 1.0
+        cutoff = now - self.stale_after
+        stale = [host for host, state in self._hosts.items() if state.last_seen < cutoff]
+        for host in stale:
+            del self._hosts[host]
+        self.evicted_hosts += len(stale)
+        return bool(stale)
+
+    def host_ids(self):
+        with self._lock:
+            return list(self._hosts)
+
+    def hosts(self):
+        """Latest status of every host, hottest first."""
+        now = time.time()
+        with self._lock:
+            summaries = [self._summary(host, state, now) for host, state in self._hosts.items()]
+        summaries.sort(key=lambda summary: summary["temperature"], reverse=True)
+        return summaries
+
+    def hottest(self, n=10, max_age=None):
+        """The `n` hosts with the highest latest temperature among those heard from in the last `max_age` s."""
+        now = time.time()
+        max_age = self.stale_after if max_age is None else max_age
+        with self._lock:
+            cutoff = now - max_age
+            top = heapq.nlargest(n, ((host, state) for host, state in self._hosts.items()
+                                     if state.last_seen >= cutoff), key=lambda entry: entry[1].temperature)
+            return [self._summary(host, state, now) for host, state in top]
+
+    def history(self, host, seconds=None):
+        """Columns of `host`'s retained samples (the last `seconds` of them), oldest first; None if unknown."""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                return None
+            window = state.history.window()
+            if seconds is not None and window.shape[1]:
+                timestamps = window[0]
+                start = int(np.searchsorted(timestamps, timestamps[-1] - seconds, side="left"))
+                window = window[:, start:]
+            window = window.copy()  # The ring keeps moving once the lock is released
+        return {name: window[i] for i, name in enumerate(FLEET_FIELDS)}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hosts": len(self._hosts),
+                "samples": self.samples,
+                "packets": self.packets,
+                "errors": self.errors,
+                "evicted_hosts": self.evicted_hosts,
+                "rejected_packets": self.rejected_packets,
+                "lost_packets": sum(state.lost_packets for state in self._hosts.values()),
+            }
+
+    @staticmethod
+    def _summary(host, state, now):
+        latest = state.latest
+        flags = int(latest["flags"])
+        return {
+            "host": host,
+            "timestamp": float(latest["timestamp"]),
+            "age_s": now - state.last_seen,
+            "temperature": float(latest["temperature"]),
+            "usage": float(latest["usage"]),
+            "power": float(latest["power"]),
+            "fan_speed": float(latest["fan_speed"]),
+            "health": float(latest["health"]),
+            "throttle": float(latest["throttle"]),
+            "status": "critical" if flags & FLAG_CRITICAL else "warning" if flags & FLAG_WARNING else "normal",
+            "throttled": bool(flags & FLAG_THROTTLED),
+            "samples": state.samples,
+            "lost_packets": state.lost_packets,
+        }
+
+    def _start_http(self):
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                parts = [unquote(part) for part in url.path.strip("/").split("/")]
+                try:
+                    if parts == ["hottest"]:
+                        max_age = float(query["max_age"][0]) if "max_age" in query else None
+                        body = collector.hottest(int(query.get("n", ["10"])[0]), max_age)
+                    elif parts == ["hosts"]:
+                        body = collector.hosts()
+                    elif len(parts) == 3 and parts[0] == "hosts" and parts[2] == "history":
+                        seconds = float(query["seconds"][0]) if "seconds" in query else None
+                        history = collector.history(parts[1], seconds)
+                        if history is None:
+                            self.send_error(404, "Unknown host")
+                            return
+                        body = {name: column.tolist() for name, column in history.items()}
+                    elif parts == ["stats"]:
+                        body = collector.stats()
+                    else:
+                        self.send_error(404)
+                        return
+                except ValueError:
+                    self.send_error(400)
+                    return
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.http_port), Handler)
+        self._server.daemon_threads = True
+        self.http_port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="fleet-http", daemon=True).start()
+        print(f"Serving fleet queries on http://{self.host}:{self.http_port}/hottest")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU Cooling Agent fleet collector")
+    sub = parser.add_subparsers(dest="command", required=True)
+    collect = sub.add_parser("collect", help="Receive samples from agents and serve queries")
+    collect.add_argument("--host", default="127.0.0.1",
+                         help="Interface to listen on (default: 127.0.0.1). Packets and queries are not "
+                              "authenticated: with 0.0.0.0 anyone who can reach the ports can report hosts and "
+                              "read the fleet's data, so expose it only on a trusted network")
+    collect.add_argument("--port", type=int, default=DEFAULT_PORT,
+                         help=f"UDP and TCP port agents send to (default: {DEFAULT_PORT})")
+    collect.add_argument("--http-port", type=int, default=DEFAULT_HTTP_PORT,
+                         help=f"Port of the JSON query API (default: {DEFAULT_HTTP_PORT})")
+    collect.add_argument("--capacity", type=int, default=3600, help="Samples kept per host (default: 3600)")
+    collect.add_argument("--stale-after", type=float, default=60.0,
+                         help="Seconds after which a silent host drops out of the hottest list (default: 60)")
+    collect.add_argument("--max-hosts", type=int, default=4096,
+                         help="Most hosts kept, about 460 KB each at the default --capacity (default: 4096)")
+    args = parser.parse_args(argv)
+
+    collector = FleetCollector(args.host, args.port, capacity=args.capacity, stale_after=args.stale_after,
+                               http_port=args.http_port, max_hosts=args.max_hosts)
+    collector.start()
+    try:
+        while True:
+            time.sleep(60)
+            stats = collector.stats()
+            print(f"{stats['hosts']} hosts, {stats['samples']} samples, {stats['lost_packets']} packets lost")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
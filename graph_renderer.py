@@ -0,0 +1,387 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import time
+
+import numpy as np
+from matplotlib.figure import Figure
+
+# Extra room added above the data when a panel has to grow its y-range
+Y_HEADROOM = 1.25
+# Raw samples are drawn directly up to this many points; longer spans read a rollup tier
+MAX_RAW_POINTS = 5000
+# (largest span in seconds, axis unit label, seconds per unit)
+TIME_UNITS = ((600, "s", 1), (6 * 3600, "min", 60), (3 * 86400, "h", 3600), (float("inf"), "days", 86400))
+
+
+class GraphRenderer:
+    """Draws the four history panels with blitting.
+
+    The static parts of the figure (axes, grid, titles, tick labels) are
+    rendered once into a cached background. Each frame only restores that
+    background and redraws the line artists. The full figure is redrawn
+    only when the background is stale: on resize, or when a panel's
+    limits have to change to fit the data. The x-axis is "time before the
+    latest sample", so tick labels never change between frames.
+
+    The visible span is set with set_span(). Short spans plot raw samples
+    from `history`; spans too long for that read the matching tier of
+    `rollups` (a RollupHistory) and also show the min/max envelope.
+
+    Pass a Tk `master` to embed the figure in the GUI, or leave it out to
+    render offscreen on an Agg canvas (benchmarks, exports).
+    """
+
+    def __init__(self, history, master=None, rollups=None, span=60, horizon=10, prediction_horizon=None,
+                 critical_threshold=55, max_fps=4.0, figsize=(16, 8)):
+        self.history = history
+        self.rollups = rollups
+        self.source = "raw"  # Name of the tier the panels are currently drawn from
+        self.horizon = horizon  # Seconds covered by the prediction panel
+        # Seconds ahead of a trend Prediction, which only carries its horizon in samples
+        self.prediction_horizon = horizon if prediction_horizon is None else prediction_horizon
+        self.max_fps = max_fps
+        self.prediction = None
+        self.forecast = None
+
+        self.dirty = False
+        self.frames = 0
+        self.full_redraws = 0
+        self.last_frame_ms = 0.0
+        self._last_frame_time = 0.0
+        self._background = None
+        self._needs_full_redraw = True
+        self._span = float(span)  # Visible seconds
+
+        self.fig = Figure(figsize=figsize)
+        if master is not None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.fig)
+
+        self._setup_axes(critical_threshold)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('resize_event', self.on_resize)
+
+    def _setup_axes(self, critical_threshold):
+        # 2x2 layout; spacing is left to tight_layout
+        self.ax = self.fig.add_subplot(2, 2, 1)
+        self.health_ax = self.fig.add_subplot(2, 2, 2)
+        self.power_ax = self.fig.add_subplot(2, 2, 3)
+        self.prediction_ax = self.fig.add_subplot(2, 2, 4)
+
+        # Setup temperature graph with enhanced styling
+        self.line = self._style(self.ax, 'CPU Temperature History', 'Temperature (°C)', '#FF6B6B',
+                                (0, max(80, critical_threshold + 20)))
+
+        # Setup health graph with enhanced styling
+        self.health_line = self._style(self.health_ax, 'System Health Report', 'Health %', '#4BC0C0', (0, 100))
+
+        # Setup power consumption graph
+        self.power_line = self._style(self.power_ax, 'Power Consumption', 'Power (W)', '#36A2EB', (0, 100))
+
+        # Setup prediction graph
+        self.prediction_line = self._style(self.prediction_ax, 'Temperature Prediction', 'Temperature (°C)',
+                                           '#FF9F40', (0, max(80, critical_threshold + 20)))
+        self.prediction_band_low, = self.prediction_ax.plot([], [], color='#FF9F40', linewidth=1,
+                                                            linestyle=':', animated=True)
+        self.prediction_band_high, = self.prediction_ax.plot([], [], color='#FF9F40', linewidth=1,
+                                                             linestyle=':', animated=True)
+        self.prediction_ax.set_xlabel('Time (Future, s)', fontsize=11)
+        self.prediction_ax.set_xlim(0, self.horizon)
+
+        # Min/max envelope of the temperature, only populated when reading a rollup tier
+        self.temp_min_line, = self.ax.plot([], [], linewidth=1, color='#FF6B6B', alpha=0.5, animated=True)
+        self.temp_max_line, = self.ax.plot([], [], linewidth=1, color='#FF6B6B', alpha=0.5, animated=True)
+        # Band along the top of the temperature panel wherever the CPU was thermally throttled
+        self.throttle_line, = self.ax.plot([], [], linewidth=6, color='#8E44AD', alpha=0.8,
+                                           solid_capstyle='butt', animated=True)
+        self._apply_span()
+
+        # Artists redrawn on every frame, grouped by the axes they belong to
+        self.animated = [
+            (self.ax, [self.line, self.temp_min_line, self.temp_max_line, self.throttle_line]),
+            (self.health_ax, [self.health_line]),
+            (self.power_ax, [self.power_line]),
+            (self.prediction_ax, [self.prediction_line, self.prediction_band_low, self.prediction_band_high]),
+        ]
+        self.fig.tight_layout(pad=2.0)
+
+    @staticmethod
+    def _style(ax, title, ylabel, color, ylim):
+        ax.set_title(title, pad=12, fontsize=12, weight='bold')
+        ax.set_ylabel(ylabel, fontsize=11)
+        line, = ax.plot([], [], linewidth=2.5, color=color, animated=True)
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.set_ylim(*ylim)
+        ax.tick_params(axis='both', which='major', labelsize=10)
+        ax.set_facecolor('#F8F9FA')
+        return line
+
+    def _apply_span(self):
+        for max_span, unit, seconds in TIME_UNITS:
+            if self._span <= max_span:
+                break
+        self._unit_seconds = seconds
+        for ax in (self.ax, self.health_ax, self.power_ax):
+            ax.set_xlabel(f'Time ({unit} before latest)', fontsize=11)
+            ax.set_xlim(-self._span / seconds, 0)
+
+    def set_span(self, span):
+        """Switch zoom level to the last `span` seconds."""
+        self._span = float(span)
+        self._apply_span()
+        self.invalidate()
+
+    def get_tk_widget(self):
+        return self.canvas.get_tk_widget()
+
+    def on_resize(self, event=None):
+        # Layout only changes with the window size, so this is the one place it is recomputed
+        self.fig.tight_layout(pad=2.0)
+        self.invalidate()
+
+    def invalidate(self):
+        """Force a full redraw (new background) on the next frame."""
+        self._needs_full_redraw = True
+        self.dirty = True
+
+    def _on_draw(self, event):
+        # A full draw just happened: cache everything except the animated artists
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for ax, artists in self.animated:
+            for artist in artists:
+                ax.draw_artist(artist)
+
+    def set_thresholds(self, warning_threshold, critical_threshold):
+        top = max(80, critical_threshold + 20)
+        for ax in (self.ax, self.prediction_ax):
+            if ax.get_ylim()[1] < top:
+                ax.set_ylim(0, top)
+                self.invalidate()
+
+    def set_prediction(self, prediction, forecast=None):
+        """Show a trend_predictor.Prediction, or the multi-horizon thermal_model.Forecast when there is one."""
+        self.prediction = prediction
+        self.forecast = forecast
+        self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def frame_due(self, now=None):
+        """True when there is something new to draw and the frame-rate cap allows it."""
+        now = time.monotonic() if now is None else now
+        return self.dirty and now - self._last_frame_time >= 1.0 / self.max_fps
+
+    def render(self):
+        """Draw one frame. Returns the time it took in milliseconds."""
+        start = time.perf_counter()
+        self._last_frame_time = time.monotonic()
+        self.dirty = False
+        self._update_artists()
+
+        if self._needs_full_redraw or self._background is None:
+            self._needs_full_redraw = False
+            self.full_redraws += 1
+            self.canvas.draw()  # draw_event refreshes the background and draws the lines
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+        self.frames += 1
+        self.last_frame_ms = (time.perf_counter() - start) * 1000.0
+        return self.last_frame_ms
+
+    def _fit_y(self, ax, values):
+        # Grow (never shrink) the y-range when the data no longer fits; this needs a new background
+        if not len(values):
+            return
+        low, high = ax.get_ylim()
+        data_low, data_high = float(np.min(values)), float(np.max(values))
+        if data_high > high or data_low < low:
+            pad = (max(high, data_high) - min(low, data_low)) * (Y_HEADROOM - 1)
+            ax.set_ylim(low if data_low >= low else data_low - pad,
+                        high if data_high <= high else data_high + pad)
+            self._needs_full_redraw = True
+
+    def _select_rows(self):
+        """Return (timestamps, temperature, temp min, temp max, power, health, throttle) for the visible span."""
+        latest = self.history.latest("timestamp")
+        start = latest - self._span
+        timestamps = self.history.column("timestamp")
+        first = int(np.searchsorted(timestamps, start, side="left"))
+        raw_covers = first > 0 or len(self.history) < self.history.capacity
+
+        tier = None
+        if self.rollups is not None and (not raw_covers or len(timestamps) - first > MAX_RAW_POINTS):
+            tier = self.rollups.tier_for_span(self._span, MAX_RAW_POINTS)
+            if not len(tier):
+                tier = None  # Nothing committed yet, keep showing raw samples
+
+        if tier is None:
+            self.source = "raw"
+            window = self.history.window(len(timestamps) - first)
+            column = self.history.fields.index
+            return (window[column("timestamp")], window[column("temperature")], None, None,
+                    window[column("power")], window[column("health")], window[column("throttle")])
+
+        self.source = tier.name
+        rows = tier.since(start)
+        return (rows[0], rows[tier.column_index("temperature")],
+                rows[tier.column_index("temperature", "min")], rows[tier.column_index("temperature", "max")],
+                rows[tier.column_index("power")], rows[tier.column_index("health")],
+                rows[tier.column_index("throttle", "max")])
+
+    def _update_artists(self):
+        if not len(self.history):
+            return
+        timestamps, temps, temp_min, temp_max, power, health, throttle = self._select_rows()
+        latest = self.history.latest("timestamp")
+        x = (timestamps - latest) / self._unit_seconds
+
+        self.line.set_data(x, temps)
+        if temp_min is not None:
+            self.temp_min_line.set_data(x, temp_min)
+            self.temp_max_line.set_data(x, temp_max)
+            self._fit_y(self.ax, temp_max)
+        else:
+            self.temp_min_line.set_data([], [])
+            self.temp_max_line.set_data([], [])
+            self._fit_y(self.ax, temps)
+        self.health_line.set_data(x, health)
+        self.power_line.set_data(x, power)
+        self._fit_y(self.power_ax, power)
+        if throttle.any():
+            # NaN gaps split the band into one segment per throttle episode
+            top = self.ax.get_ylim()[1] * 0.97
+            self.throttle_line.set_data(x, np.where(throttle > 0, top, np.nan))
+        else:
+            self.throttle_line.set_data([], [])
+
+        prediction = self.prediction
+        if prediction is None:
+            for line in (self.prediction_line, self.prediction_band_low, self.prediction_band_high):
+                line.set_data([], [])
+            return
+        forecast = self.forecast
+        if forecast is not None:
+            # One point per forecast horizon, starting from the latest reading
+            future = (0.0,) + forecast.horizons
+            now = [prediction.fitted]
+            self.prediction_line.set_data(future, np.concatenate((now, forecast.values)))
+            self.prediction_band_low.set_data(future, np.concatenate((now, forecast.low)))
+            self.prediction_band_high.set_data(future, np.concatenate((now, forecast.high)))
+            self._fit_y(self.prediction_ax, np.concatenate((forecast.low, forecast.high)))
+            return
+        future = [0, self.prediction_horizon]
+        self.prediction_line.set_data(future, [prediction.fitted, prediction.value])
+        self.prediction_band_low.set_data(future, [prediction.fitted, prediction.low])
+        self.prediction_band_high.set_data(future, [prediction.fitted, prediction.high])
+        self._fit_y(self.prediction_ax, [prediction.low, prediction.high])
+
+
+class CoreHeatmap:
+    """Compact per-core heatmap (one row per logical CPU, one column per sample).
+
+    Shows temperature when the cores report it and usage otherwise. Like
+    GraphRenderer, the axes are drawn once into a cached background and each
+    frame only redraws the image.
+    """
+
+    def __init__(self, core_monitor, master=None, samples=120, max_fps=2.0, figsize=(16, 2.5)):
+        self.core_monitor = core_monitor
+        self.samples = samples
+        self.max_fps = max_fps
+        self.dirty = False
+        self._last_frame_time = 0.0
+        self._background = None
+        self._needs_full_redraw = True
+        self._metric = None
+        self._rows = core_monitor.cpu_count
+
+        self.fig = Figure(figsize=figsize)
+        if master is not None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.fig)
+
+        self.ax = self.fig.add_subplot(1, 1, 1)
+        blank = np.full((core_monitor.cpu_count, samples), np.nan)
+        self.image = self.ax.imshow(blank, aspect='auto', interpolation='nearest', cmap='inferno',
+                                    origin='lower', extent=(-samples, 0, -0.5, core_monitor.cpu_count - 0.5),
+                                    animated=True)
+        self.colorbar = self.fig.colorbar(self.image, ax=self.ax, pad=0.01)
+        self.ax.set_xlabel('Samples before latest', fontsize=9)
+        self.ax.set_ylabel('CPU', fontsize=9)
+        self.ax.tick_params(axis='both', which='major', labelsize=8)
+        self.fig.tight_layout(pad=1.0)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('resize_event', lambda event: self.invalidate())
+
+    def get_tk_widget(self):
+        return self.canvas.get_tk_widget()
+
+    def invalidate(self):
+        self._needs_full_redraw = True
+        self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def frame_due(self, now=None):
+        now = time.monotonic() if now is None else now
+        return self.dirty and now - self._last_frame_time >= 1.0 / self.max_fps
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.image)
+
+    def _set_metric(self, metric):
+        # Title and colour scale change only when switching between temperature and usage
+        self._metric = metric
+        if metric == "temperature":
+            self.ax.set_title('Per-core temperature (°C)', fontsize=10, weight='bold')
+            self.image.set_clim(20, 100)
+        else:
+            self.ax.set_title('Per-core usage (%)', fontsize=10, weight='bold')
+            self.image.set_clim(0, 100)
+        self._needs_full_redraw = True
+
+    def render(self):
+        self._last_frame_time = time.monotonic()
+        self.dirty = False
+        cores = self.core_monitor
+        metric = "temperature" if cores.has_temperature else "usage"
+        if metric != self._metric:
+            self._set_metric(metric)
+
+        block = cores.temperature(self.samples) if metric == "temperature" else cores.usage(self.samples)
+        if cores.cpu_count != self._rows:
+            # CPU hotplug: resize the image to the new number of CPUs
+            self._rows = cores.cpu_count
+            self.image.set_extent((-self.samples, 0, -0.5, self._rows - 0.5))
+            self._needs_full_redraw = True
+        if block.shape[1] < self.samples:
+            # Pad on the left until enough samples exist so columns stay one sample wide
+            padded = np.full((cores.cpu_count, self.samples), np.nan)
+            padded[:, self.samples - block.shape[1]:] = block
+            block = padded
+        self.image.set_data(block)
+
+        if self._needs_full_redraw or self._background is None:
+            self._needs_full_redraw = False
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self.ax.draw_artist(self.image)
+        self.canvas.blit(self.fig.bbox)
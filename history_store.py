@@ -0,0 +1,105 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import numpy as np
+
+# Columns kept for every sample, in storage order
+HISTORY_FIELDS = ("timestamp", "temperature", "usage", "frequency", "power", "fan_speed", "health", "throttle")
+
+
+class SampleHistory:
+    """Preallocated columnar ring buffer of samples.
+
+    Every row is written twice, at `i` and `i + capacity`, so the most recent
+    n samples always occupy one contiguous slice. That makes append O(1) and
+    window() / column() zero-copy views in chronological order. A view of
+    n < capacity samples stays valid for the next capacity - n appends.
+    """
+
+    def __init__(self, capacity=3600, fields=HISTORY_FIELDS):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._data = np.zeros((len(self.fields), 2 * capacity), dtype=np.float64)
+        self._next = 0  # Slot the next sample is written to
+        self._count = 0
+        self.total_appended = 0  # Samples ever appended, including overwritten ones
+
+    def __len__(self):
+        return self._count
+
+    def append(self, sample):
+        """Store a Sample (or any object with attributes named like the fields)."""
+        self.append_row([getattr(sample, name) for name in self.fields])
+
+    def append_row(self, values):
+        i = self._next
+        self._data[:, i] = values
+        self._data[:, i + self.capacity] = values
+        self._next = i + 1 if i + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+        self.total_appended += 1
+
+    def extend(self, rows):
+        """Append a (fields x n) block of samples, oldest first, in one copy."""
+        rows = np.asarray(rows, dtype=np.float64)
+        n = rows.shape[1]
+        self.total_appended += n
+        i = self._next
+        if n > self.capacity:
+            # Only the newest `capacity` rows survive; start where they would have landed
+            i = (i + n - self.capacity) % self.capacity
+            rows = rows[:, n - self.capacity:]
+            n = self.capacity
+        first = min(n, self.capacity - i)
+        self._data[:, i:i + first] = rows[:, :first]
+        self._data[:, i + self.capacity:i + self.capacity + first] = rows[:, :first]
+        rest = n - first
+        if rest:
+            self._data[:, :rest] = rows[:, first:]
+            self._data[:, self.capacity:self.capacity + rest] = rows[:, first:]
+        self._next = (i + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def _bounds(self, n):
+        n = self._count if n is None else max(0, min(n, self._count))
+        end = self._next + self.capacity
+        return end - n, end
+
+    def window(self, n=None):
+        """Return a (fields x n) view of the last n samples, oldest first."""
+        start, end = self._bounds(n)
+        return self._data[:, start:end]
+
+    def column(self, name, n=None):
+        """Return a view of the last n values of one field, oldest first."""
+        start, end = self._bounds(n)
+        return self._data[self._index[name], start:end]
+
+    def latest(self, name):
+        if not self._count:
+            return None
+        return float(self._data[self._index[name], self._next + self.capacity - 1])
+
+    def set_column(self, name, values):
+        """Overwrite a field for the stored samples, e.g. after a bulk recompute."""
+        start, end = self._bounds(None)
+        row = self._index[name]
+        self._data[row, start:end] = values
+        # Keep the mirrored copy in step with the slice that was just written
+        if start < self.capacity:
+            self._data[row, start + self.capacity:self.capacity * 2] = values[:self.capacity - start]
+        if end > self.capacity:
+            self._data[row, 0:end - self.capacity] = values[len(values) - (end - self.capacity):]
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
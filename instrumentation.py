@@ -0,0 +1,136 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import json
+import time
+from bisect import bisect_left
+
+# Upper bucket edges in seconds: 1-2-5 steps from 1 us to 10 s, plus an overflow bucket
+BUCKET_BOUNDS = tuple(float(f"{m}e{e}") for e in range(-6, 1) for m in (1, 2, 5)) + (10.0,)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; record() is O(log buckets) and allocation-free."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the q-th percentile (0-100), capped at the maximum seen."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": _ms(self.total / self.count) if self.count else None,
+            "p50_ms": _ms(self.percentile(50)),
+            "p90_ms": _ms(self.percentile(90)),
+            "p99_ms": _ms(self.percentile(99)),
+            "max_ms": _ms(self.max),
+            # Bucket counts keyed by upper edge in ms; empty buckets are left out
+            "buckets": {f"{_ms(bound):g}": n for bound, n in zip(BUCKET_BOUNDS, self.counts) if n},
+            "overflow": self.counts[-1],
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000.0, 6)
+
+
+class Instrumentation:
+    """Per-stage latency histograms for the sample -> predict -> control -> render pipeline.
+
+    Stages are registered with instrument(obj, method, stage). While enabled,
+    each registered method is shadowed on its instance by a wrapper that
+    times it with a monotonic clock. set_enabled(False) removes the wrappers,
+    so a disabled pipeline runs its original methods with no added cost.
+
+    Each stage is normally recorded from one thread; concurrent calls of the
+    same stage from two threads may occasionally lose a count.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self._targets = []  # (obj, method name, stage)
+        self._installed = []  # (obj, method name, had an instance attribute, previous value)
+        self.started = time.time()
+
+    def instrument(self, obj, method, stage):
+        self.histograms.setdefault(stage, LatencyHistogram())
+        self._targets.append((obj, method, stage))
+        if self.enabled:
+            self._install(obj, method, stage)
+
+    def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            for target in self._targets:
+                self._install(*target)
+        elif not enabled and self.enabled:
+            for obj, method, had_own, previous in reversed(self._installed):
+                if had_own:
+                    setattr(obj, method, previous)
+                else:
+                    delattr(obj, method)
+            self._installed = []
+        self.enabled = enabled
+
+    def _install(self, obj, method, stage):
+        had_own = method in getattr(obj, "__dict__", {})
+        original = getattr(obj, method)
+        record = self.histograms[stage].record
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                record(clock() - start)
+
+        self._installed.append((obj, method, had_own, original if had_own else None))
+        setattr(obj, method, timed)
+
+    def record(self, stage, seconds):
+        """Record a duration measured by the caller."""
+        self.histograms.setdefault(stage, LatencyHistogram()).record(seconds)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.started = time.time()
+
+    def snapshot(self):
+        return {
+            "enabled": self.enabled,
+            "since": self.started,
+            "stages": {stage: histogram.to_dict() for stage, histogram in self.histograms.items()},
+        }
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
@@ -0,0 +1,176 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import glob
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+LOG_HEADER = "Timestamp,Temperature,CPU Usage,Power Consumption,Fan Speed,System Health\n"
+
+
+def format_log_row(sample):
+    time_str = datetime.fromtimestamp(sample.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+    return (f"{time_str},{sample.temperature:.1f},{sample.usage},{sample.power:.1f},"
+            f"{int(sample.fan_speed)},{sample.health:.1f}\n")
+
+
+def export_history(history, path):
+    """Write every sample held in a SampleHistory to `path` as CSV. Returns the row count."""
+    row_type = namedtuple("HistoryRow", history.fields)
+    # Every column comes from the same stored row, so values are the ones actually sampled
+    rows = [format_log_row(row_type(*row)) for row in history.window().T]
+    with open(path, 'w') as f:
+        f.write(LOG_HEADER)
+        f.write("".join(rows))
+    return len(rows)
+
+
+class StreamingLogWriter:
+    """Append-only sample log written by a dedicated background thread.
+
+    write() only enqueues the sample, so the sampling loop never touches the
+    disk. The writer thread formats and writes samples in batches, flushing
+    at least every `flush_interval` seconds. The active file is rotated when
+    it grows past `max_bytes` or is older than `rotate_interval` seconds.
+    Rotated segments are renamed with a timestamp suffix and, with
+    `compress=True`, gzipped. Only the newest `backup_count` segments are kept.
+
+    For binary formats pass `binary=True`, a bytes `header` and a
+    `batch_formatter` that encodes a whole list of samples at once.
+    """
+
+    def __init__(self, path, max_bytes=None, rotate_interval=None, compress=False, backup_count=None,
+                 batch_size=256, flush_interval=1.0, queue_size=100000,
+                 header=LOG_HEADER, formatter=format_log_row, batch_formatter=None, binary=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.header = header
+        self.formatter = formatter
+        self.batch_formatter = batch_formatter
+        self.binary = binary
+
+        self.written = 0
+        self.dropped = 0  # Samples lost because the queue was full
+        self.rotations = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._bytes = 0
+        self._opened_at = 0.0
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, sample):
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(None, timeout=timeout)  # Sentinel: drain and stop
+        except queue.Full:
+            # The writer is stuck or gone; shutting down matters more than the samples still queued
+            print(f"Log writer not responding; {self._queue.qsize()} samples were not written to {self.path}")
+            return
+        self._thread.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def _open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'ab' if self.binary else 'a')
+        self._bytes = self._file.tell()
+        self._opened_at = time.time()
+        if self._bytes == 0 and self.header:
+            self._file.write(self.header)
+            self._bytes += len(self.header)
+
+    def _run(self):
+        batch = []
+        last_flush = time.monotonic()
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+                    # Grab whatever else is already waiting without blocking
+                    while len(batch) < self.batch_size:
+                        item = self._queue.get_nowait()
+                        if item is None:
+                            stopping = True
+                            break
+                        batch.append(item)
+            except queue.Empty:
+                pass
+
+            if batch and (stopping or len(batch) >= self.batch_size
+                          or time.monotonic() - last_flush >= self.flush_interval):
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    print(f"Error writing log batch: {str(e)}")
+                batch = []
+                last_flush = time.monotonic()
+        self._file.close()
+
+    def _write_batch(self, batch):
+        if self._file.closed:
+            self._open()  # A failed rotation could not reopen the file; try again
+        if self.batch_formatter is not None:
+            data = self.batch_formatter(batch)
+        else:
+            data = "".join(self.formatter(sample) for sample in batch)
+        self._file.write(data)
+        self._file.flush()
+        self._bytes += len(data)
+        self.written += len(batch)
+        if self._rotation_due():
+            self._rotate()
+
+    def _rotation_due(self):
+        if self.max_bytes and self._bytes >= self.max_bytes:
+            return True
+        return bool(self.rotate_interval) and time.time() - self._opened_at >= self.rotate_interval
+
+    def _rotate(self):
+        self._file.close()
+        try:
+            stem, ext = os.path.splitext(self.path)
+            rotated = f"{stem}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{ext}"
+            os.replace(self.path, rotated)
+            if self.compress:
+                with open(rotated, 'rb') as src, gzip.open(rotated + ".gz", 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(rotated)
+            self.rotations += 1
+            self._prune(stem, ext)
+        finally:
+            # Logging goes on even if the rename failed, appending to the file that could not be moved
+            self._open()
+
+    def _prune(self, stem, ext):
+        if not self.backup_count:
+            return
+        pattern = f"{glob.escape(stem)}.*{ext}" + (".gz" if self.compress else "")
+        segments = sorted(glob.glob(pattern))
+        for old in segments[:-self.backup_count]:
+            try:
+                os.remove(old)
+            except OSError as e:
+                print(f"Error removing old log {old}: {str(e)}")
@@ -0,0 +1,175 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from snapshot_channel import SnapshotChannel
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+STATUSES = ("normal", "warning", "critical")
+
+# (metric name, type, help, Sample field)
+SAMPLE_GAUGES = (
+    ("cpu_cooling_temperature_celsius", "gauge", "CPU temperature.", "temperature"),
+    ("cpu_cooling_usage_percent", "gauge", "CPU usage.", "usage"),
+    ("cpu_cooling_frequency_mhz", "gauge", "CPU frequency.", "frequency"),
+    ("cpu_cooling_power_watts", "gauge", "Estimated CPU power.", "power"),
+    ("cpu_cooling_fan_speed_percent", "gauge", "Fan speed.", "fan_speed"),
+    ("cpu_cooling_health_percent", "gauge", "System health score.", "health"),
+    ("cpu_cooling_last_sample_timestamp_seconds", "gauge", "Time of the latest sample.", "timestamp"),
+)
+
+# (metric name, type, help, Probe attribute), one series per sampling probe
+PROBE_METRICS = (
+    ("cpu_cooling_probe_period_seconds", "gauge", "Current sampling period of the probe.", "period"),
+    ("cpu_cooling_probe_runs_total", "counter", "Reads run by the probe.", "runs"),
+    ("cpu_cooling_probe_errors_total", "counter", "Reads that raised an error.", "errors"),
+    ("cpu_cooling_probe_missed_deadlines_total", "counter", "Reads that completed after their deadline.",
+     "missed"),
+    ("cpu_cooling_probe_skipped_total", "counter", "Scheduled reads dropped while the probe was busy.", "skipped"),
+)
+
+
+class MetricsExporter:
+    """Prometheus text endpoint serving the engine's latest sample.
+
+    Scrapes never touch a sensor: the engine publishes every sample into a
+    latest-wins channel, and the response body is rendered at most once per
+    new sample and then reused byte-for-byte by every scrape until the next
+    one arrives.
+    """
+
+    def __init__(self, engine, host="127.0.0.1", port=9464):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.scrapes = 0
+        self._channel = SnapshotChannel()
+        self._body = self._render(None)
+        self._render_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        engine.subscribe(self._channel.publish)
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.body()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # One line per scrape would flood the console
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]  # Resolved when port 0 was requested
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def body(self):
+        """Current response body, re-rendered only if a new sample arrived since the last scrape."""
+        self.scrapes += 1
+        sample = self._channel.take()
+        if sample is not None:
+            with self._render_lock:
+                self._body = self._render(sample)
+        return self._body
+
+    def _render(self, sample):
+        engine = self.engine
+        lines = []
+
+        def metric(name, kind, help_text, value, labels=""):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{labels} {value}")
+
+        if sample is not None:
+            for name, kind, help_text, field in SAMPLE_GAUGES:
+                metric(name, kind, help_text, _format(getattr(sample, field)))
+            if sample.prediction is not None:
+                metric("cpu_cooling_predicted_temperature_celsius", "gauge",
+                       f"Temperature predicted {engine.prediction_horizon} s ahead.",
+                       _format(sample.prediction.value))
+            if sample.forecast is not None:
+                name = "cpu_cooling_forecast_temperature_celsius"
+                lines.append(f"# HELP {name} Thermal model forecast at each horizon.")
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f'{name}{{horizon_seconds="{horizon:g}"}} {_format(value)}'
+                             for horizon, value in zip(sample.forecast.horizons, sample.forecast.values))
+            lines.append("# HELP cpu_cooling_status Current thermal status (1 for the active one).")
+            lines.append("# TYPE cpu_cooling_status gauge")
+            for status in STATUSES:
+                lines.append(f'cpu_cooling_status{{status="{status}"}} {int(sample.status == status)}')
+
+        backend = engine.sensor_backend.name if engine.sensor_backend is not None else "none"
+        metric("cpu_cooling_sensor_info", "gauge", "Temperature backend in use.", 1,
+               f'{{backend="{_escape(backend)}"}}')
+        metric("cpu_cooling_sample_duration_seconds", "gauge",
+               "Time spent on the latest sample, sensor reads included.", _format(engine.last_sample_seconds))
+        metric("cpu_cooling_warning_threshold_celsius", "gauge", "Warning threshold.",
+               _format(engine.warning_threshold))
+        metric("cpu_cooling_critical_threshold_celsius", "gauge", "Critical threshold.",
+               _format(engine.critical_threshold))
+        metric("cpu_cooling_samples_total", "counter", "Samples taken since start.",
+               engine.history.total_appended)
+        detector = engine.throttle_detector
+        if detector is not None:
+            metric("cpu_cooling_throttle_depth_ratio", "gauge",
+                   "Frequency drop below baseline while thermally throttled, 0 when not throttling.",
+                   _format(sample.throttle if sample is not None else 0.0))
+            metric("cpu_cooling_throttle_episodes_total", "counter", "Finished thermal throttling episodes.",
+                   len(detector.episodes))
+        cores = engine.core_monitor
+        if cores is not None and len(cores.history):
+            for metric_name, help_text, values in (
+                    ("cpu_cooling_core_usage_percent", "Per-CPU usage.", cores.usage(1)[:, 0]),
+                    ("cpu_cooling_core_frequency_mhz", "Per-CPU frequency.", cores.frequency(1)[:, 0]),
+                    ("cpu_cooling_core_temperature_celsius", "Per-CPU temperature.", cores.temperature(1)[:, 0])):
+                lines.append(f"# HELP {metric_name} {help_text}")
+                lines.append(f"# TYPE {metric_name} gauge")
+                lines.extend(f'{metric_name}{{cpu="{cpu}"}} {_format(value)}'
+                             for cpu, value in zip(cores.cpu_ids, values) if value == value)  # Skip NaN
+        scheduler = engine.scheduler
+        if scheduler is not None:
+            for metric_name, kind, help_text, field in PROBE_METRICS:
+                lines.append(f"# HELP {metric_name} {help_text}")
+                lines.append(f"# TYPE {metric_name} {kind}")
+                lines.extend(f'{metric_name}{{probe="{probe.name}"}} {getattr(probe, field)}'
+                             for probe in scheduler.probes)
+        if engine.fan_rpm:
+            lines.append("# HELP cpu_cooling_fan_rpm Fan speed reported by the platform.")
+            lines.append("# TYPE cpu_cooling_fan_rpm gauge")
+            lines.extend(f'cpu_cooling_fan_rpm{{fan="{_escape(fan)}"}} {_format(rpm)}'
+                         for fan, rpm in engine.fan_rpm.items())
+        if engine.logger is not None:
+            metric("cpu_cooling_log_written_total", "counter", "Samples written to the log.", engine.logger.written)
+            metric("cpu_cooling_log_dropped_total", "counter", "Samples dropped by the log writer.",
+                   engine.logger.dropped)
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _format(value):
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,123 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import math
+
+import numpy as np
+
+from history_store import SampleHistory
+
+# (name, bucket length in seconds, buckets kept): 10 s buckets for a day, 1 min buckets for 30 days.
+# Raw samples stay in the engine's SampleHistory.
+DEFAULT_TIERS = (("10s", 10, 8640), ("1min", 60, 43200))
+ROLLUP_FIELDS = ("temperature", "power", "health", "throttle")
+ROLLUP_STATS = ("min", "mean", "max")
+
+# Zoom levels offered by the GUI, as seconds of history shown
+ZOOM_LEVELS = {
+    "1 min": 60,
+    "10 min": 600,
+    "1 hour": 3600,
+    "1 day": 86400,
+    "30 days": 30 * 86400,
+}
+
+
+class RollupTier:
+    """Fixed-width time buckets holding min/mean/max per field.
+
+    The bucket that is still filling lives in small accumulators and is
+    appended to the ring buffer once a sample for a later bucket arrives,
+    so each add() is O(1) regardless of how long the agent has been running.
+    """
+
+    def __init__(self, name, bucket_seconds, capacity, fields=ROLLUP_FIELDS):
+        self.name = name
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        columns = ["timestamp"] + [f"{field}_{stat}" for field in self.fields for stat in ROLLUP_STATS]
+        self.history = SampleHistory(capacity, fields=columns)
+        self._bucket = None
+        n = len(self.fields)
+        self._min = np.empty(n)
+        self._max = np.empty(n)
+        self._sum = np.empty(n)
+        self._count = 0
+
+    def __len__(self):
+        return len(self.history)
+
+    @property
+    def span_seconds(self):
+        return self.bucket_seconds * self.capacity
+
+    def add(self, timestamp, values):
+        bucket = math.floor(timestamp / self.bucket_seconds)
+        if bucket != self._bucket:
+            self.flush()
+            self._bucket = bucket
+            self._min[:] = values
+            self._max[:] = values
+            self._sum[:] = values
+            self._count = 1
+            return
+        np.minimum(self._min, values, out=self._min)
+        np.maximum(self._max, values, out=self._max)
+        self._sum += values
+        self._count += 1
+
+    def flush(self):
+        # Commit the bucket in progress, stamped with the bucket's start time
+        if not self._count:
+            return
+        mean = self._sum / self._count
+        row = [self._bucket * self.bucket_seconds]
+        for i in range(len(self.fields)):
+            row.extend((self._min[i], mean[i], self._max[i]))
+        self.history.append_row(row)
+        self._count = 0
+
+    def since(self, start):
+        """Zero-copy (columns x n) view of the committed buckets starting at or after `start`."""
+        timestamps = self.history.column("timestamp")
+        first = int(np.searchsorted(timestamps, start, side="left"))
+        return self.history.window(len(timestamps) - first)
+
+    def column_index(self, field, stat="mean"):
+        return self.history.fields.index(f"{field}_{stat}")
+
+
+class RollupHistory:
+    """Maintains every rollup tier incrementally from the sample stream.
+
+    Health is rolled up as it was recorded; buckets are not recomputed when
+    the thresholds change later.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS, fields=ROLLUP_FIELDS):
+        self.fields = tuple(fields)
+        self.tiers = [RollupTier(name, seconds, capacity, self.fields) for name, seconds, capacity in tiers]
+
+    def add(self, sample):
+        values = [getattr(sample, field) for field in self.fields]
+        for tier in self.tiers:
+            tier.add(sample.timestamp, values)
+
+    def tier(self, name):
+        for tier in self.tiers:
+            if tier.name == name:
+                return tier
+        raise KeyError(name)
+
+    def tier_for_span(self, span_seconds, max_points=5000):
+        """Finest tier that covers `span_seconds` with at most `max_points` buckets."""
+        for tier in self.tiers:
+            if tier.span_seconds >= span_seconds and span_seconds / tier.bucket_seconds <= max_points:
+                return tier
+        return self.tiers[-1]
+
+    @property
+    def nbytes(self):
+        return sum(tier.history.nbytes for tier in self.tiers)
@@ -0,0 +1,178 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import LatencyHistogram
+
+
+class Probe:
+    """One signal read on its own schedule.
+
+    `read` is called every `period` seconds and its result is kept as the
+    probe's latest value. A run that completes more than `deadline` seconds
+    after it was due counts as a missed deadline. Blocking probes run on a
+    worker thread so a slow read never delays the others; if the previous
+    read is still in flight when the next one is due, that run is skipped
+    rather than queued.
+    """
+
+    def __init__(self, name, read, period, deadline=None, blocking=False):
+        self.name = name
+        self.read = read
+        self.period = period
+        self.deadline = period if deadline is None else deadline
+        self.blocking = blocking
+        self.value = None
+        self.timestamp = None  # Wall time of the latest successful read
+        self.runs = 0
+        self.errors = 0
+        self.missed = 0  # Runs that completed after their deadline
+        self.skipped = 0  # Runs dropped because the probe was still busy or the scheduler fell behind
+        self.jitter = LatencyHistogram()  # Start delay after the scheduled time
+        self.duration = LatencyHistogram()
+        self._due = 0.0
+        self._in_flight = False
+
+    def stats(self):
+        return {"period_s": self.period, "runs": self.runs, "errors": self.errors, "missed": self.missed,
+                "skipped": self.skipped, "blocking": self.blocking}
+
+
+class SamplingScheduler:
+    """Multi-rate sampler merging every probe's latest value into one sample stream.
+
+    Non-blocking probes run on the scheduler thread in registration order, so
+    a probe can use the value of one registered before it that was due at the
+    same time. Blocking probes go to a small worker pool. Every run of the
+    `primary` probe emits one merged sample: on_sample(timestamp, values),
+    with the newest value of every probe. All probes run once, in order and
+    inline, before the first sample, so it is complete.
+
+    Jitter and duration histograms are kept per probe; pass `histograms`
+    (e.g. Instrumentation.histograms) to have them registered there as
+    "<probe>_jitter" and "<probe>_read".
+    """
+
+    def __init__(self, probes, primary, on_sample, workers=2, histograms=None, clock=time.monotonic):
+        self.probes = list(probes)
+        self._by_name = {probe.name: probe for probe in self.probes}
+        if primary not in self._by_name:
+            raise ValueError(f"Unknown primary probe: {primary}")
+        self.primary = self._by_name[primary]
+        if self.primary.blocking:
+            raise ValueError("The primary probe must not be blocking")
+        self.on_sample = on_sample
+        self.clock = clock
+        self.last_tick_seconds = 0.0  # Inline reads plus on_sample for the latest merged sample
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe")
+        if histograms is not None:
+            for probe in self.probes:
+                histograms[f"{probe.name}_jitter"] = probe.jitter
+                histograms[f"{probe.name}_read"] = probe.duration
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def values(self):
+        with self._lock:
+            return {probe.name: probe.value for probe in self.probes}
+
+    def set_period(self, name, period, deadline=None):
+        """Change a probe's period; the next run is pulled in if the new period is shorter."""
+        probe = self._by_name[name]
+        probe.period = period
+        probe.deadline = period if deadline is None else deadline
+        probe._due = min(probe._due, self.clock() + period)
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def stats(self):
+        return {probe.name: probe.stats() for probe in self.probes}
+
+    def run(self):
+        """Sample until stop() is called. Blocks the calling thread."""
+        now = self.clock()
+        for probe in self.probes:
+            probe._due = now
+            self._run_probe(probe, now)
+            probe._due = now + probe.period
+        self._emit(time.perf_counter())
+
+        while not self._stopped:
+            now = self.clock()
+            tick_start = time.perf_counter()
+            primary_ran = False
+            for probe in self.probes:
+                if probe._due > now:
+                    continue
+                scheduled = probe._due
+                self._advance(probe, now)
+                if probe.blocking:
+                    self._submit(probe, scheduled)
+                else:
+                    self._run_probe(probe, scheduled)
+                    primary_ran = primary_ran or probe is self.primary
+            if primary_ran:
+                self._emit(tick_start)
+
+            delay = min(probe._due for probe in self.probes) - self.clock()
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+        self._pool.shutdown(wait=False)
+
+    def _emit(self, tick_start):
+        try:
+            self.on_sample(time.time(), self.values())
+        except Exception as e:
+            print(f"Critical error in update loop: {str(e)}")
+        self.last_tick_seconds = time.perf_counter() - tick_start
+
+    def _advance(self, probe, now):
+        # Fixed cadence; after a stall the slots that were missed are dropped, not replayed
+        probe._due += probe.period
+        if probe._due <= now:
+            probe.skipped += int((now - probe._due) // probe.period) + 1
+            probe._due = now + probe.period
+
+    def _submit(self, probe, scheduled):
+        if probe._in_flight:
+            probe.skipped += 1
+            return
+        probe._in_flight = True
+
+        def job():
+            try:
+                self._run_probe(probe, scheduled)
+            finally:
+                probe._in_flight = False
+
+        self._pool.submit(job)
+
+    def _run_probe(self, probe, scheduled):
+        start = self.clock()
+        probe.jitter.record(max(0.0, start - scheduled))
+        try:
+            value = probe.read()
+        except Exception as e:
+            probe.errors += 1
+            print(f"{probe.name} probe error: {str(e)}")
+        else:
+            with self._lock:
+                probe.value = value
+                probe.timestamp = time.time()
+        end = self.clock()
+        probe.runs += 1
+        probe.duration.record(end - start)
+        if end - scheduled > probe.deadline:
+            probe.missed += 1
@@ -0,0 +1,244 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import os
+import sys
+import glob
+import random
+
+import psutil
+
+# hwmon chip names that report the CPU die / package temperature
+CPU_HWMON_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal", "cpu-thermal", "soc_thermal", "acpitz")
+# Preferred sensor labels, most representative first
+CPU_SENSOR_LABELS = ("Package id 0", "Tdie", "Tctl", "Tccd1", "CPU")
+
+
+class SensorBackend:
+    """Base class for a CPU temperature source with a long-lived connection."""
+
+    name = "base"
+
+    def open(self):
+        # Acquire handles once. Return True when the backend can deliver readings.
+        return False
+
+    def read_temperature(self, cpu_usage):
+        # Return the current CPU temperature in °C, or None if unavailable
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class OpenHardwareMonitorBackend(SensorBackend):
+    name = "OpenHardwareMonitor"
+
+    def __init__(self):
+        self._conn = None
+        self._query = None
+
+    def open(self):
+        if sys.platform != "win32":
+            return False
+        try:
+            # The connection is bound to the COM apartment of the thread that opens it
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except ImportError:
+                pass
+            import wmi
+            self._conn = wmi.WMI(namespace="root\\OpenHardwareMonitor")
+            for sensor in self._conn.Sensor():
+                if sensor.SensorType == u'Temperature' and 'CPU' in sensor.Name:
+                    # Query only the chosen sensor on every tick instead of enumerating all of them
+                    self._query = f"SELECT Value FROM Sensor WHERE Identifier='{sensor.Identifier}'"
+                    return True
+            print("OpenHardwareMonitor error: No CPU temperature sensors found.")
+        except Exception as e:
+            print(f"OpenHardwareMonitor error: {str(e)}\nPlease ensure OpenHardwareMonitor is running.")
+        self.close()
+        return False
+
+    def read_temperature(self, cpu_usage):
+        result = self._conn.query(self._query)
+        if not result:
+            return None
+        return float(result[0].Value)
+
+    def close(self):
+        self._conn = None
+        self._query = None
+
+
+class AcpiThermalZoneBackend(SensorBackend):
+    name = "ACPI thermal zone"
+
+    def __init__(self):
+        self._conn = None
+
+    def open(self):
+        if sys.platform != "win32":
+            return False
+        try:
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except ImportError:
+                pass
+            import wmi
+            self._conn = wmi.WMI(namespace="root\\wmi")
+            if self.read_temperature(0) is not None:
+                return True
+        except Exception as e:
+            print(f"WMI error: {str(e)}")
+        self.close()
+        return False
+
+    def read_temperature(self, cpu_usage):
+        zones = self._conn.MSAcpi_ThermalZoneTemperature()
+        if not zones:
+            return None
+        # CurrentTemperature is reported in tenths of a Kelvin
+        return float(zones[0].CurrentTemperature) / 10.0 - 273.15
+
+    def close(self):
+        self._conn = None
+
+
+class HwmonBackend(SensorBackend):
+    """Linux backend reading /sys/class/hwmon directly, with psutil as a fallback."""
+
+    name = "Linux hwmon"
+
+    def __init__(self, hwmon_root="/sys/class/hwmon"):
+        self.hwmon_root = hwmon_root
+        self.sensor_path = None
+        self._fd = None
+        self._psutil_key = None
+        self._psutil_label = None
+
+    def open(self):
+        if not sys.platform.startswith("linux"):
+            return False
+        self.sensor_path = self._find_sensor_input()
+        if self.sensor_path:
+            try:
+                # Keep the attribute open and re-read it with pread on every tick
+                self._fd = os.open(self.sensor_path, os.O_RDONLY)
+                if self.read_temperature(0) is not None:
+                    return True
+            except OSError as e:
+                print(f"hwmon error: {str(e)}")
+            self.close()
+
+        # psutil walks the same sysfs tree, but understands a few more layouts
+        try:
+            temps = psutil.sensors_temperatures()
+        except (AttributeError, OSError):
+            temps = {}
+        for key in list(CPU_HWMON_CHIPS) + sorted(temps):
+            entries = temps.get(key)
+            if not entries:
+                continue
+            self._psutil_key = key
+            self._psutil_label = self._pick_label([entry.label for entry in entries])
+            return self.read_temperature(0) is not None
+        return False
+
+    def read_temperature(self, cpu_usage):
+        if self._fd is not None:
+            # Values are reported in millidegrees Celsius
+            return int(os.pread(self._fd, 32, 0)) / 1000.0
+        entries = psutil.sensors_temperatures().get(self._psutil_key, [])
+        for entry in entries:
+            if entry.label == self._psutil_label:
+                return float(entry.current)
+        return float(entries[0].current) if entries else None
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+        self._fd = None
+
+    def _find_sensor_input(self):
+        chips = {}
+        for hwmon_dir in sorted(glob.glob(os.path.join(self.hwmon_root, "hwmon*"))):
+            try:
+                with open(os.path.join(hwmon_dir, "name")) as f:
+                    chips.setdefault(f.read().strip(), hwmon_dir)
+            except OSError:
+                continue
+
+        for chip in CPU_HWMON_CHIPS:
+            hwmon_dir = chips.get(chip)
+            if hwmon_dir is None:
+                continue
+            labels = {}
+            for input_path in sorted(glob.glob(os.path.join(hwmon_dir, "temp*_input"))):
+                label_path = input_path[:-len("_input")] + "_label"
+                try:
+                    with open(label_path) as f:
+                        labels[f.read().strip()] = input_path
+                except OSError:
+                    labels.setdefault("", input_path)
+            if labels:
+                return labels[self._pick_label(list(labels))]
+        return None
+
+    @staticmethod
+    def _pick_label(labels):
+        for preferred in CPU_SENSOR_LABELS:
+            if preferred in labels:
+                return preferred
+        return labels[0]
+
+
+class SimulatedBackend(SensorBackend):
+    """Usage-based temperature estimate used when no hardware sensor is reachable."""
+
+    name = "Simulated"
+
+    def __init__(self, base_temp=25, temp_range=15):
+        self.base_temp = base_temp  # Base temperature when idle
+        self.temp_range = temp_range  # Maximum temperature increase based on usage
+
+    def open(self):
+        return True
+
+    def read_temperature(self, cpu_usage):
+        cpu_temp = self.base_temp + (cpu_usage / 100.0 * self.temp_range)
+        # Add some realistic variation
+        cpu_temp += random.uniform(-0.5, 0.5)
+        return round(cpu_temp, 1)
+
+
+SENSOR_BACKENDS = {
+    "ohm": OpenHardwareMonitorBackend,
+    "acpi": AcpiThermalZoneBackend,
+    "hwmon": HwmonBackend,
+    "simulated": SimulatedBackend,
+}
+
+
+def select_sensor_backend(preferred=None):
+    """Open the first working backend, trying `preferred` before the default order."""
+    order = ["ohm", "acpi", "hwmon", "simulated"]
+    if preferred:
+        if preferred not in SENSOR_BACKENDS:
+            raise ValueError(f"Unknown sensor backend: {preferred}")
+        order.remove(preferred)
+        order.insert(0, preferred)
+
+    for key in order:
+        backend = SENSOR_BACKENDS[key]()
+        if backend.open():
+            print(f"Using {backend.name} temperature sensor")
+            return backend
+    # SimulatedBackend always opens, so this is only reached if it was removed from the order
+    return SimulatedBackend()
@@ -4,21 +4,23 @@ import os
 
 def create_executable():
     script_path = os.path.join(os.path.dirname(__file__), 'cpu_cooling_agent.py')
+    # --onedir skips unpacking the whole bundle to a temp dir on every launch
+    bundle_mode = '--onedir' if '--onedir' in sys.argv else '--onefile'
     PyInstaller.__main__.run([
         script_path,
-        '--onefile',
+        bundle_mode,
         '--windowed',
         '--name=CPU_Cooling_Agent',
         '--icon=NONE',
         '--add-data=requirements.txt;.',
-        '--hidden-import=sklearn.linear_model',
-        '--hidden-import=sklearn.utils._typedefs',
-        '--hidden-import=sklearn.utils._heap',
-        '--hidden-import=sklearn.utils._sorting',
-        '--hidden-import=sklearn.utils._vector_sentinel',
+        '--add-data=cooling_profiles.json;.',
         '--hidden-import=wmi',
         '--hidden-import=comtypes',
-        '--hidden-import=win32com.client'
+        '--hidden-import=win32com.client',
+        # Never used by the agent, but picked up by optional matplotlib/numpy hooks
+        '--exclude-module=sklearn',
+        '--exclude-module=scipy',
+        '--exclude-module=pandas',
     ])
 
 if __name__ == '__main__':
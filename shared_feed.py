@@ -0,0 +1,283 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+"""Live sample feed in a shared memory-mapped ring buffer.
+
+The agent writes every sample into a fixed-size file mapped into memory
+(under /dev/shm on Linux, so it never reaches a disk); any number of local
+readers map the same file read-only and read the stream directly from
+memory, at any rate, without a sensor read, a syscall per sample or a
+message to the agent.
+
+Layout: a HEADER_SIZE-byte header, then `capacity` FEED_DTYPE records used
+as a ring. The header holds a magic string, the format version, the record
+size, the capacity, an epoch that changes whenever a writer (re)opens the
+feed, a seqlock counter, the number of records ever written, the writer's
+pid and the record layout as JSON.
+
+The single writer bumps the seqlock counter to an odd value, writes the
+record and the written count, then bumps it back to even. A reader copies
+what it needs and keeps the copy only if the counter was even and
+unchanged across the copy; otherwise it retries.
+
+    python shared_feed.py tail            # print samples as the agent publishes them
+    python shared_feed.py info
+"""
+
+import argparse
+import json
+import mmap
+import os
+import stat
+import struct
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+MAGIC = b"CPUFEED\0"
+VERSION = 1
+HEADER_SIZE = 512
+DEFAULT_NAME = "cpu_cooling_feed"
+DEFAULT_CAPACITY = 4096
+
+STATUS_CODES = {"normal": 0, "warning": 1, "critical": 2}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+
+# 44 bytes per sample; timestamps need double precision, everything else fits in float32
+FEED_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("temperature", "<f4"),
+    ("usage", "<f4"),
+    ("frequency", "<f4"),
+    ("power", "<f4"),
+    ("fan_speed", "<f4"),
+    ("health", "<f4"),
+    ("throttle", "<f4"),
+    ("predicted", "<f4"),  # Temperature predicted at the engine's prediction horizon, NaN if none
+    ("status", "<u4"),  # STATUS_CODES
+])
+
+# magic, version, header size, record size, capacity, schema length, epoch
+_PREFIX = struct.Struct("<8sHHIIIQ")
+_COUNTERS_OFFSET = 32  # seqlock counter, records written, writer pid (uint64 each)
+_SCHEMA_OFFSET = 64
+
+
+def feed_path(name=DEFAULT_NAME):
+    """File backing the feed `name`; a tmpfs path on Linux."""
+    if os.path.sep in name:
+        return name
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, name)
+
+
+class SharedFeedWriter:
+    """Publishes samples into the shared ring; subscribe write() to the engine.
+
+    Opening the writer (re)initialises the feed in place with a new epoch,
+    so readers that were attached to a previous run notice and start over.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, capacity=DEFAULT_CAPACITY):
+        self.path = feed_path(name)
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * FEED_DTYPE.itemsize
+        # The name is predictable and /dev/shm is shared: never follow a planted link or adopt another user's file
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o644)
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode) or st.st_uid != os.geteuid():
+                raise PermissionError(f"{self.path} is not a regular file owned by uid {os.geteuid()}; "
+                                      f"remove it or choose another feed name")
+            # Never shrink: a reader still mapping a bigger feed would fault on the missing pages
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        schema = json.dumps(FEED_DTYPE.descr).encode("ascii")
+        epoch = time.time_ns()
+        self._counters = np.ndarray(3, dtype="<u8", buffer=self._map, offset=_COUNTERS_OFFSET)
+        self._records = np.ndarray(capacity, dtype=FEED_DTYPE, buffer=self._map, offset=HEADER_SIZE)
+        self._counters[:] = (0, 0, os.getpid())
+        self._map[_SCHEMA_OFFSET:_SCHEMA_OFFSET + len(schema)] = schema
+        # The prefix goes last: a reader only trusts the feed once the magic is in place
+        self._map[:_PREFIX.size] = _PREFIX.pack(MAGIC, VERSION, HEADER_SIZE, FEED_DTYPE.itemsize, capacity,
+                                                len(schema), epoch)
+        self.written = 0
+
+    def write(self, sample):
+        prediction = sample.prediction
+        counters = self._counters
+        counters[0] += 1  # Odd: a write is in progress
+        self._records[self.written % self.capacity] = (
+            sample.timestamp, sample.temperature, sample.usage, sample.frequency, sample.power,
+            sample.fan_speed, sample.health, sample.throttle,
+            prediction.value if prediction is not None else np.nan, STATUS_CODES.get(sample.status, 0))
+        self.written += 1
+        counters[1] = self.written
+        counters[0] += 1
+
+    def close(self):
+        """Mark the feed as having no writer; the file stays so readers can finish."""
+        if self._map is None:
+            return
+        self._counters[2] = 0
+        del self._counters, self._records  # Views must go before the map can close
+        self._map.close()
+        self._map = None
+
+
+class SharedFeedReader:
+    """Reads the agent's live feed from shared memory.
+
+    latest() returns the newest record and read_since(cursor) every record
+    after `cursor`, both as copies that are guaranteed consistent. records
+    is a zero-copy view of the whole ring for readers that do their own
+    checking with begin()/valid().
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.path = feed_path(name)
+        self._map = None
+        self.lost = 0  # Records overwritten before read_since() got to them
+        self._open()
+
+    def _open(self):
+        self._close_map()
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER_SIZE:
+            raise ValueError(f"{self.path} is too short to be a sample feed")
+        magic, version, header_size, record_size, capacity, schema_len, epoch = _PREFIX.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a sample feed")
+        if version != VERSION:
+            raise ValueError(f"{self.path} uses feed format version {version}, expected {VERSION}")
+        schema = json.loads(bytes(self._map[_SCHEMA_OFFSET:_SCHEMA_OFFSET + schema_len]).decode("ascii"))
+        dtype = np.dtype([tuple(field) for field in schema])
+        if (dtype.itemsize != record_size or header_size != HEADER_SIZE
+                or len(self._map) < HEADER_SIZE + capacity * record_size):
+            raise ValueError(f"{self.path} has an inconsistent feed header")
+        self.capacity = capacity
+        self.epoch = epoch
+        self._counters = np.ndarray(3, dtype="<u8", buffer=self._map, offset=_COUNTERS_OFFSET)
+        self.records = np.ndarray(capacity, dtype=dtype, buffer=self._map, offset=HEADER_SIZE)
+
+    def _close_map(self):
+        if self._map is not None:
+            del self._counters, self.records
+            self._map.close()
+            self._map = None
+
+    def close(self):
+        self._close_map()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def written(self):
+        """Records written since the writer opened the feed."""
+        return int(self._counters[1])
+
+    @property
+    def writer_pid(self):
+        """Pid of the publishing agent, 0 once it has closed the feed."""
+        return int(self._counters[2])
+
+    def restarted(self):
+        """True (and the feed re-mapped) if a new writer has opened the feed since the last call."""
+        epoch = _PREFIX.unpack_from(self._map)[6]
+        if epoch == self.epoch:
+            return False
+        self._open()
+        return True
+
+    def begin(self):
+        """Seqlock counter to pass to valid() after reading from `records`; waits out a write in progress."""
+        while True:
+            seq = int(self._counters[0])
+            if not seq & 1:
+                return seq
+            time.sleep(0)
+
+    def valid(self, seq):
+        """True if no write happened since begin() returned `seq`."""
+        return int(self._counters[0]) == seq
+
+    def latest(self):
+        """Newest record (a copy), or None if nothing was written yet."""
+        while True:
+            seq = self.begin()
+            written = int(self._counters[1])
+            record = self.records[(written - 1) % self.capacity].copy() if written else None
+            if self.valid(seq):
+                return record
+
+    def read_since(self, cursor):
+        """Return (records after `cursor`, new cursor); start with cursor 0.
+
+        Records are copied in chronological order. If the writer lapped the
+        reader, the overwritten ones are skipped and counted in `lost`.
+        """
+        if self.restarted():
+            cursor = 0
+        while True:
+            seq = self.begin()
+            written = int(self._counters[1])
+            if written < cursor:
+                cursor = 0  # The writer re-initialised the feed in place
+            start = max(cursor, written - self.capacity)
+            first, last = start % self.capacity, written % self.capacity
+            if start == written:
+                records = self.records[:0].copy()
+            elif first < last:
+                records = self.records[first:last].copy()
+            else:
+                records = np.concatenate((self.records[first:], self.records[:last]))
+            if self.valid(seq):
+                self.lost += start - cursor
+                return records, written
+
+    def follow(self, poll_interval=0.1, cursor=None):
+        """Yield records as they are published, starting after `cursor` (default: only new ones)."""
+        cursor = self.written if cursor is None else cursor
+        while True:
+            records, cursor = self.read_since(cursor)
+            yield from records
+            if not len(records):
+                time.sleep(poll_interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read the CPU Cooling Agent's shared-memory sample feed")
+    parser.add_argument("command", choices=["tail", "info"])
+    parser.add_argument("name", nargs="?", default=DEFAULT_NAME, help=f"Feed name or path (default: {DEFAULT_NAME})")
+    args = parser.parse_args(argv)
+
+    with SharedFeedReader(args.name) as reader:
+        if args.command == "info":
+            print(f"{reader.path}: format version {VERSION}, {reader.records.dtype.itemsize} bytes per record, "
+                  f"capacity {reader.capacity}, {reader.written} written, writer pid {reader.writer_pid or 'none'}")
+            return 0
+        try:
+            for record in reader.follow():
+                print(f"{datetime.fromtimestamp(float(record['timestamp'])):%H:%M:%S.%f}"[:-3]
+                      + f"  {record['temperature']:5.1f} °C  {record['usage']:5.1f}%  {record['power']:6.1f} W  "
+                        f"fan {record['fan_speed']:3.0f}%  {STATUS_NAMES.get(int(record['status']), '?')}")
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
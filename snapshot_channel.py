@@ -0,0 +1,47 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import threading
+
+
+class SnapshotChannel:
+    """Thread-safe, latest-wins hand-off of immutable snapshots.
+
+    The producer publishes as often as it likes; the consumer takes at most
+    one snapshot per frame and always gets the newest one. Anything published
+    in between is dropped instead of queued, so a stalled consumer never
+    builds up a backlog to replay later.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = None
+        self._seq = 0  # Number of snapshots published
+        self._taken_seq = 0  # Sequence number of the last snapshot handed out
+        self.taken = 0
+        self.dropped = 0
+
+    def publish(self, snapshot):
+        with self._lock:
+            self._latest = snapshot
+            self._seq += 1
+
+    def take(self):
+        """Return the newest unseen snapshot, or None if nothing new was published."""
+        with self._lock:
+            if self._seq == self._taken_seq:
+                return None
+            self.dropped += self._seq - self._taken_seq - 1
+            self._taken_seq = self._seq
+            self.taken += 1
+            return self._latest
+
+    def peek(self):
+        """Return the newest snapshot without marking it as taken."""
+        with self._lock:
+            return self._latest
+
+    @property
+    def published(self):
+        return self._seq
@@ -0,0 +1,202 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+"""Compact binary telemetry files.
+
+Layout: a fixed HEADER_SIZE-byte header followed by fixed-width records of
+RECORD_DTYPE. The header holds a magic string, the format version, the record
+size and the field layout as JSON. Files are plain appends, so a
+partly-written last record is ignored by readers and cut off before the
+agent appends to the file again.
+
+    python telemetry_format.py to-bin cpu_cooling_logs_20250328_160537.csv logs.tlm
+    python telemetry_format.py to-csv logs.tlm logs.csv
+    python telemetry_format.py info logs.tlm
+"""
+
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from log_writer import LOG_HEADER, format_log_row
+
+MAGIC = b"CPUTELEM"
+VERSION = 1
+HEADER_SIZE = 256
+TELEMETRY_EXTENSION = ".tlm"
+
+# 32 bytes per sample; timestamps need double precision, everything else fits in float32
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("temperature", "<f4"),
+    ("usage", "<f4"),
+    ("frequency", "<f4"),
+    ("power", "<f4"),
+    ("fan_speed", "<f4"),
+    ("health", "<f4"),
+])
+
+# magic, version, header size, record size, schema length
+_PREFIX = struct.Struct("<8sHHII")
+
+
+def build_header(dtype=RECORD_DTYPE):
+    schema = json.dumps(dtype.descr).encode("ascii")
+    header = _PREFIX.pack(MAGIC, VERSION, HEADER_SIZE, dtype.itemsize, len(schema)) + schema
+    if len(header) > HEADER_SIZE:
+        raise ValueError("Telemetry schema does not fit in the header")
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def read_header(path):
+    """Validate the header of `path` and return the record dtype it declares."""
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path} is too short to be a telemetry file")
+        magic, version, header_size, record_size, schema_len = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a telemetry file")
+        if version != VERSION:
+            raise ValueError(f"{path} uses telemetry format version {version}, expected {VERSION}")
+        schema = json.loads(f.read(schema_len).decode("ascii"))
+    dtype = np.dtype([tuple(field) for field in schema])
+    if dtype.itemsize != record_size or header_size != HEADER_SIZE:
+        raise ValueError(f"{path} has an inconsistent telemetry header")
+    return dtype
+
+
+def encode_samples(samples):
+    """Pack a batch of Samples into record bytes."""
+    records = np.empty(len(samples), dtype=RECORD_DTYPE)
+    for name in RECORD_DTYPE.names:
+        records[name] = [getattr(sample, name) for sample in samples]
+    return records.tobytes()
+
+
+def is_telemetry_path(path):
+    return os.path.splitext(path)[1].lower() == TELEMETRY_EXTENSION
+
+
+def check_appendable(path):
+    """Raise ValueError if `path` exists but cannot be appended to with the current format.
+
+    A partly-written last record (a crash mid-write) is truncated away, so
+    that appended records start on a record boundary again.
+    """
+    if not os.path.exists(path):
+        return
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    if size < HEADER_SIZE:
+        with open(path, "rb") as f:
+            if f.read() != build_header()[:size]:
+                raise ValueError(f"{path} is too short to be a telemetry file")
+        intact = 0  # Our own header, cut short before any record: the writer starts the file over
+    else:
+        if read_header(path) != RECORD_DTYPE:
+            raise ValueError(f"{path} uses a different record layout")
+        intact = size - (size - HEADER_SIZE) % RECORD_DTYPE.itemsize
+    if intact != size:
+        print(f"Truncating {size - intact} bytes left by an interrupted write at the end of {path}")
+        os.truncate(path, intact)
+
+
+def open_telemetry(path):
+    """Memory-map a telemetry file read-only and return its records as a structured array."""
+    dtype = read_header(path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count <= 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def time_range(records, start=None, end=None):
+    """Zero-copy slice of records with start <= timestamp < end (timestamps must be ascending)."""
+    timestamps = records["timestamp"]
+    lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+    hi = len(records) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+    return records[lo:hi]
+
+
+def write_telemetry(path, records):
+    with open(path, "wb") as f:
+        f.write(build_header(records.dtype))
+        f.write(np.ascontiguousarray(records).tobytes())
+
+
+def csv_to_telemetry(csv_path, out_path):
+    """Convert a cpu_cooling_logs_*.csv export into a telemetry file. Returns the record count."""
+    with open(csv_path, newline="") as f:
+        rows = [row for row in csv.DictReader(f) if row.get("Timestamp")]
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    records["timestamp"] = [datetime.strptime(row["Timestamp"], "%Y-%m-%d %H:%M:%S").timestamp() for row in rows]
+    records["temperature"] = [float(row["Temperature"]) for row in rows]
+    records["usage"] = [float(row["CPU Usage"]) for row in rows]
+    records["frequency"] = np.nan  # Not part of the CSV layout
+    records["power"] = [float(row["Power Consumption"]) for row in rows]
+    records["fan_speed"] = [float(row["Fan Speed"]) for row in rows]
+    records["health"] = [float(row["System Health"]) for row in rows]
+    write_telemetry(out_path, records)
+    return len(records)
+
+
+def telemetry_to_csv(path, csv_path):
+    """Convert a telemetry file back into the export_logs CSV layout. Returns the record count."""
+    records = open_telemetry(path)
+    with open(csv_path, "w") as f:
+        f.write(LOG_HEADER)
+        f.write("".join(format_log_row(_Row(record)) for record in records))
+    return len(records)
+
+
+class _Row:
+    # Attribute access over one structured record, so format_log_row can be reused
+    __slots__ = ("timestamp", "temperature", "usage", "power", "fan_speed", "health")
+
+    def __init__(self, record):
+        self.timestamp = float(record["timestamp"])
+        self.temperature = float(record["temperature"])
+        self.usage = round(float(record["usage"]), 1)
+        self.power = float(record["power"])
+        self.fan_speed = float(record["fan_speed"])
+        self.health = float(record["health"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert and inspect CPU Cooling Agent telemetry files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    to_bin = sub.add_parser("to-bin", help="Convert a CSV log to the binary format")
+    to_bin.add_argument("csv_path")
+    to_bin.add_argument("out_path")
+    to_csv = sub.add_parser("to-csv", help="Convert a binary telemetry file to CSV")
+    to_csv.add_argument("path")
+    to_csv.add_argument("csv_path")
+    info = sub.add_parser("info", help="Show the record count and time span of a telemetry file")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "to-bin":
+        print(f"Wrote {csv_to_telemetry(args.csv_path, args.out_path)} records to {args.out_path}")
+    elif args.command == "to-csv":
+        print(f"Wrote {telemetry_to_csv(args.path, args.csv_path)} records to {args.csv_path}")
+    else:
+        records = open_telemetry(args.path)
+        print(f"Format version {VERSION}, {RECORD_DTYPE.itemsize} bytes per record, {len(records)} records")
+        if len(records):
+            first = datetime.fromtimestamp(float(records["timestamp"][0]))
+            last = datetime.fromtimestamp(float(records["timestamp"][-1]))
+            print(f"From {first:%Y-%m-%d %H:%M:%S} to {last:%Y-%m-%d %H:%M:%S}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
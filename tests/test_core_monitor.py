@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from core_monitor import CoreMonitor, LinuxCoreReader
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def write_stat(proc, counters):
+    """counters: {cpu id: (busy, idle)} -> a /proc/stat with those per-CPU lines."""
+    lines = ["cpu  0 0 0 0 0 0 0 0 0 0"]
+    lines += [f"cpu{cpu} {busy} 0 0 {idle} 0 0 0 0 0 0" for cpu, (busy, idle) in sorted(counters.items())]
+    lines += ["intr 12345 0 0", "ctxt 6789", ""]
+    write(os.path.join(proc, "stat"), "\n".join(lines))
+
+
+def make_tree(tmp_path, frequencies):
+    proc, sys_root = str(tmp_path / "proc"), str(tmp_path / "sys")
+    for cpu, khz in frequencies.items():
+        base = os.path.join(sys_root, "devices", "system", "cpu", f"cpu{cpu}")
+        write(os.path.join(base, "topology", "physical_package_id"), "0\n")
+        write(os.path.join(base, "topology", "core_id"), f"{cpu}\n")
+        write(os.path.join(base, "cpufreq", "scaling_cur_freq"), f"{khz}\n")
+    return proc, sys_root
+
+
+def test_sysfs_is_indexed_by_cpu_id_when_a_cpu_is_offline(tmp_path):
+    proc, sys_root = make_tree(tmp_path, {0: 1000000, 1: 2000000, 2: 3000000})
+    write_stat(proc, {0: (100, 100), 2: (100, 100)})  # cpu1 is offline
+    reader = LinuxCoreReader(proc_root=proc, sys_root=sys_root)
+    assert reader.open()
+    try:
+        assert reader.cpu_ids == [0, 2]
+        _, frequency, _ = reader.read()
+        assert list(frequency) == [1000.0, 3000.0]
+    finally:
+        reader.close()
+
+
+def test_hotplug_reopens_and_resets_history(tmp_path):
+    proc, sys_root = make_tree(tmp_path, {0: 1000000, 1: 2000000, 2: 3000000})
+    write_stat(proc, {0: (100, 100), 2: (100, 100)})
+    reader = LinuxCoreReader(proc_root=proc, sys_root=sys_root)
+    assert reader.open()
+    monitor = CoreMonitor(reader=reader, capacity=10)
+    try:
+        write_stat(proc, {0: (150, 150), 2: (200, 100)})
+        monitor.sample(1.0)
+        assert np.allclose(monitor.usage(1)[:, 0], [50.0, 100.0])
+
+        write_stat(proc, {0: (200, 200), 1: (100, 100), 2: (300, 100)})  # cpu1 comes online
+        monitor.sample(2.0)
+        assert reader.cpu_ids == monitor.cpu_ids == [0, 1, 2]
+        assert monitor.cpu_count == 3 and len(monitor.history) == 1
+        assert list(monitor.frequency(1)[:, 0]) == [1000.0, 2000.0, 3000.0]
+
+        write_stat(proc, {0: (300, 200), 2: (400, 100)})  # and goes away again
+        monitor.sample(3.0)
+        assert monitor.cpu_ids == [0, 2]
+        assert sorted(cpu for cpu, _ in monitor.hottest(2)) == [0, 2]
+    finally:
+        monitor.close()
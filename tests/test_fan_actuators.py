@@ -0,0 +1,109 @@
+import atexit
+import json
+import os
+
+from fan_actuators import HwmonPwmActuator, restore_saved_pwm_modes
+
+
+def make_chip(root, index, name, pwms, labels=None):
+    chip = root / f"hwmon{index}"
+    chip.mkdir()
+    (chip / "name").write_text(name + "\n")
+    for pwm in pwms:
+        (chip / f"pwm{pwm}").write_text("128\n")
+        (chip / f"pwm{pwm}_enable").write_text("2\n")
+    for attribute, label in (labels or {}).items():
+        (chip / attribute).write_text(label + "\n")
+    return chip
+
+
+def enable(chip, pwm):
+    return (chip / f"pwm{pwm}_enable").read_text().strip()
+
+
+def test_only_the_cpu_fan_is_taken_over(tmp_path):
+    board = make_chip(tmp_path, 0, "nct6775", [1, 2], {"fan2_label": "CPU Fan"})
+    gpu = make_chip(tmp_path, 1, "amdgpu", [1])
+    actuator = HwmonPwmActuator(str(tmp_path), state_path=str(tmp_path / "state.json"))
+    assert actuator.open()
+    assert (enable(board, 1), enable(board, 2), enable(gpu, 1)) == ("2", "1", "2")
+    assert actuator.set_speed(100)
+    assert (board / "pwm2").read_text().strip() == "255"
+    assert (board / "pwm1").read_text().strip() == "128"
+    actuator.close()
+    assert enable(board, 2) == "2"
+    assert not os.path.exists(tmp_path / "state.json")
+
+
+def test_allow_list_replaces_the_cpu_fan_guess(tmp_path):
+    board = make_chip(tmp_path, 0, "nct6775", [1, 2], {"fan2_label": "CPU Fan"})
+    actuator = HwmonPwmActuator(str(tmp_path), channels=["nct6775/pwm1"], state_path=str(tmp_path / "state.json"))
+    assert actuator.open()
+    assert (enable(board, 1), enable(board, 2)) == ("1", "2")
+    actuator.close()
+
+
+def test_unlabelled_channels_are_left_alone(tmp_path):
+    board = make_chip(tmp_path, 0, "it87", [1, 2, 3])
+    actuator = HwmonPwmActuator(str(tmp_path), state_path=str(tmp_path / "state.json"))
+    assert not actuator.open()
+    assert [enable(board, pwm) for pwm in (1, 2, 3)] == ["2", "2", "2"]
+
+
+def test_modes_left_by_a_killed_agent_are_restored(tmp_path):
+    board = make_chip(tmp_path, 0, "thinkpad", [1])
+    state = str(tmp_path / "state.json")
+    killed = HwmonPwmActuator(str(tmp_path), state_path=state)
+    assert killed.open()
+    atexit.unregister(killed.close)  # Never closed, as after a SIGKILL
+    assert enable(board, 1) == "1"
+    assert restore_saved_pwm_modes(state, str(tmp_path)) == 1
+    assert enable(board, 1) == "2"
+    assert not os.path.exists(state)
+
+
+def plant_state(path, modes, pid=0):
+    with open(path, "w") as f:
+        json.dump({"pid": pid, "modes": modes}, f)
+    os.chmod(path, 0o600)
+
+
+def test_state_naming_a_foreign_path_or_value_is_ignored(tmp_path):
+    board = make_chip(tmp_path, 0, "thinkpad", [1])
+    (board / "pwm1_enable").write_text("1\n")
+    victim = tmp_path / "victim"
+    victim.write_text("untouched")
+    (board / "pwm2_enable").symlink_to(victim)
+    state = str(tmp_path / "state.json")
+    plant_state(state, {str(victim): "2", str(board / "pwm2_enable"): "2",
+                        str(board / "pwm1_enable"): "attacker-controlled"})
+    assert restore_saved_pwm_modes(state, str(tmp_path)) == 0
+    assert victim.read_text() == "untouched"
+    assert enable(board, 1) == "1"
+
+
+def test_state_writable_by_others_or_a_symlink_is_ignored(tmp_path):
+    board = make_chip(tmp_path, 0, "thinkpad", [1])
+    (board / "pwm1_enable").write_text("1\n")
+    state = str(tmp_path / "state.json")
+    plant_state(state, {str(board / "pwm1_enable"): "2"})
+    os.chmod(state, 0o666)
+    assert restore_saved_pwm_modes(state, str(tmp_path)) == 0
+    os.chmod(state, 0o600)
+    os.rename(state, str(tmp_path / "real.json"))
+    os.symlink(str(tmp_path / "real.json"), state)
+    assert restore_saved_pwm_modes(state, str(tmp_path)) == 0
+    assert enable(board, 1) == "1"
+
+
+def test_saving_state_never_follows_a_planted_symlink(tmp_path):
+    make_chip(tmp_path, 0, "thinkpad", [1])
+    victim = tmp_path / "victim"
+    victim.write_text("untouched")
+    state = tmp_path / "state.json"
+    state.symlink_to(victim)
+    actuator = HwmonPwmActuator(str(tmp_path), state_path=str(state))
+    assert actuator.open()
+    assert victim.read_text() == "untouched"
+    assert not state.is_symlink()
+    actuator.close()
@@ -0,0 +1,43 @@
+from fan_controller import PidFanController
+from fan_curves import DEFAULT_PROFILES
+
+
+def run(controller, temp, setpoint, seconds, dt, start=40):
+    speed = controller.update(0.0, temp, setpoint, current=start)
+    for i in range(1, int(round(seconds / dt)) + 1):
+        speed = controller.update(i * dt, temp, setpoint, current=speed)
+    return speed
+
+
+def test_slew_limit_moves_the_fan_at_sub_second_intervals():
+    # 2 %/s at 0.2 s is 0.4 % per tick, less than one rounding step
+    controller = PidFanController(**DEFAULT_PROFILES["silent"]["controller"])
+    speed = run(controller, 60.0, 50.0, 20.0, 0.2)
+    assert 70 <= speed <= 80
+    assert abs(controller.level - 80.0) < 1e-6
+
+
+def test_slew_limit_does_not_depend_on_the_interval():
+    fast = run(PidFanController(min_hold=0), 60.0, 50.0, 4.0, 0.1)
+    slow = run(PidFanController(min_hold=0), 60.0, 50.0, 4.0, 1.0)
+    assert fast == slow == 60
+
+
+def test_output_is_an_int_and_changes_at_most_once_per_hold():
+    controller = PidFanController(min_hold=5.0)
+    speed = controller.update(0.0, 60.0, 50.0, current=40)
+    changes = []
+    for i in range(1, 101):
+        new = controller.update(i * 0.2, 60.0, 50.0, current=speed)
+        assert isinstance(new, int)
+        if new != speed:
+            changes.append(i * 0.2)
+        speed = new
+    assert len(changes) == 4
+    assert all(later - earlier >= 5.0 - 1e-9 for earlier, later in zip(changes, changes[1:]))
+
+
+def test_critical_temperature_forces_full_speed_at_once():
+    controller = PidFanController()
+    speed = controller.update(0.0, 50.0, 50.0, current=40)
+    assert controller.update(0.2, 80.0, 50.0, current=speed, critical=75.0) == 100
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from fan_curves import DEFAULT_PROFILES, CONFIG_VERSION, ProfileFile, compile_profiles
+
+BUILT_IN = compile_profiles(DEFAULT_PROFILES)
+
+
+def write(path, profiles):
+    path.write_text(json.dumps({"version": CONFIG_VERSION, "profiles": profiles}))
+
+
+def test_invalid_file_at_startup_falls_back_and_is_picked_up_once_fixed(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text("{not json")
+    profiles = ProfileFile(str(path), fallback=BUILT_IN)
+    assert profiles.profiles is BUILT_IN
+    assert profiles.errors == 1
+
+    write(path, {"quiet": DEFAULT_PROFILES["silent"]})
+    assert list(profiles.poll()) == ["quiet"]
+    assert profiles.reloads == 1
+
+
+def test_invalid_file_without_fallback_raises(tmp_path):
+    path = tmp_path / "profiles.json"
+    write(path, {"silent": dict(DEFAULT_PROFILES["silent"], critical_threshold=10)})
+    with pytest.raises(ValueError, match="critical_threshold"):
+        ProfileFile(str(path))
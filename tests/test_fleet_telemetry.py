@@ -0,0 +1,61 @@
+import socket
+import time
+
+import numpy as np
+
+import fleet_telemetry
+from fleet_telemetry import FLEET_DTYPE, FleetCollector, FleetPusher
+
+
+def records(temperature, count=1):
+    out = np.zeros(count, dtype=FLEET_DTYPE)
+    out["timestamp"] = time.time()
+    out["temperature"] = temperature
+    return out
+
+
+def test_new_hosts_are_dropped_once_full_of_live_hosts():
+    collector = FleetCollector(capacity=10, max_hosts=2)
+    collector.ingest("a", records(50))
+    collector.ingest("b", records(60))
+    collector.ingest("spoofed", records(99))
+    assert sorted(collector.host_ids()) == ["a", "b"]
+    assert collector.stats()["rejected_packets"] == 1
+    collector.ingest("a", records(55))  # Known hosts keep reporting
+    assert collector.hottest(1)[0]["temperature"] == 60
+
+
+def test_stale_hosts_make_room_for_new_ones():
+    collector = FleetCollector(capacity=10, max_hosts=2, stale_after=30.0)
+    collector.ingest("a", records(50))
+    collector.ingest("b", records(60))
+    collector._hosts["a"].last_seen -= 60
+    collector.ingest("c", records(70))
+    assert sorted(collector.host_ids()) == ["b", "c"]
+    assert collector.stats()["evicted_hosts"] == 1
+
+
+def test_pusher_resolves_the_collector_once(monkeypatch):
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(2.0)
+    lookups = []
+    real_getaddrinfo = socket.getaddrinfo
+
+    def counting_getaddrinfo(*args, **kwargs):
+        lookups.append(args[0])
+        return real_getaddrinfo(*args, **kwargs)
+
+    monkeypatch.setattr(fleet_telemetry.socket, "getaddrinfo", counting_getaddrinfo)
+    pusher = FleetPusher(f"udp://localhost:{receiver.getsockname()[1]}", host_id="h", batch_size=1,
+                         flush_interval=0.05)
+    sample = type("Sample", (), dict(timestamp=1.0, temperature=40.0, usage=1.0, power=1.0, fan_speed=30.0,
+                                     health=90.0, throttle=0.0, status="normal"))()
+    for _ in range(3):
+        pusher.write(sample)
+    for _ in range(3):
+        host, _, got = fleet_telemetry.decode_packet(receiver.recv(2048))
+        assert host == "h" and len(got) == 1
+    pusher.close()
+    receiver.close()
+    assert lookups == ["localhost"]
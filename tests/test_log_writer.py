@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import log_writer
+from log_writer import StreamingLogWriter
+
+Row = namedtuple("Row", "timestamp temperature usage power fan_speed health")
+
+
+def row(i):
+    return Row(1700000000.0 + i, 40.0, 10.0, 20.0, 50.0, 90.0)
+
+
+def lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_failed_rotation_keeps_logging(tmp_path, monkeypatch):
+    path = str(tmp_path / "log.csv")
+    writer = StreamingLogWriter(path, max_bytes=1, flush_interval=0.01)
+
+    def failing_replace(src, dst):
+        raise OSError("disk says no")
+
+    monkeypatch.setattr(log_writer.os, "replace", failing_replace)
+    writer.write(row(0))
+    time.sleep(0.1)
+    writer.write(row(1))
+    writer.close()
+    assert len(lines(path)) == 3  # Header and both rows, all in the file that could not be rotated
+    assert writer.written == 2
+
+
+def test_close_returns_when_the_writer_is_stuck(tmp_path, monkeypatch):
+    path = str(tmp_path / "log.csv")
+    release = threading.Event()
+    writer = StreamingLogWriter(path, queue_size=2, flush_interval=0.01)
+    monkeypatch.setattr(writer, "_write_batch", lambda batch: release.wait())
+    writer.write(row(0))
+    time.sleep(0.1)  # The writer thread is now blocked in _write_batch
+    writer.write(row(1))
+    writer.write(row(2))
+    start = time.monotonic()
+    writer.close(timeout=0.2)
+    assert time.monotonic() - start < 1.0
+    release.set()
+    assert os.path.exists(path)
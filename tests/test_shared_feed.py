@@ -0,0 +1,117 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from shared_feed import SharedFeedReader, SharedFeedWriter
+
+Sample = namedtuple("Sample", "timestamp temperature usage frequency power fan_speed health throttle prediction "
+                              "status")
+
+
+def sample(i):
+    return Sample(float(i), 40.0 + i, 10.0, 3000.0, 20.0, 50.0, 90.0, 0.0, None, "normal")
+
+
+def write(writer, start, count):
+    for i in range(start, start + count):
+        writer.write(sample(i))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "feed")
+
+
+def test_read_since_returns_each_record_once_in_order(path):
+    writer = SharedFeedWriter(path, capacity=8)
+    reader = SharedFeedReader(path)
+    assert reader.latest() is None
+    write(writer, 0, 3)
+    records, cursor = reader.read_since(0)
+    assert list(records["timestamp"]) == [0.0, 1.0, 2.0]
+    write(writer, 3, 2)
+    records, cursor = reader.read_since(cursor)
+    assert list(records["timestamp"]) == [3.0, 4.0]
+    assert len(reader.read_since(cursor)[0]) == 0
+    assert reader.latest()["timestamp"] == 4.0
+    reader.close()
+    writer.close()
+
+
+def test_lapped_reader_skips_overwritten_records_and_counts_them(path):
+    writer = SharedFeedWriter(path, capacity=4)
+    reader = SharedFeedReader(path)
+    write(writer, 0, 2)
+    _, cursor = reader.read_since(0)
+    write(writer, 2, 7)  # Records 2..8; the ring only holds 5..8
+    records, cursor = reader.read_since(cursor)
+    assert list(records["timestamp"]) == [5.0, 6.0, 7.0, 8.0]  # Wraps around the end of the ring
+    assert cursor == 9
+    assert reader.lost == 3
+    reader.close()
+    writer.close()
+
+
+def test_writer_restart_resets_the_cursor(path):
+    writer = SharedFeedWriter(path, capacity=8)
+    reader = SharedFeedReader(path)
+    write(writer, 0, 6)
+    _, cursor = reader.read_since(0)
+    writer.close()
+    assert reader.writer_pid == 0
+
+    writer = SharedFeedWriter(path, capacity=8)
+    write(writer, 100, 2)
+    records, cursor = reader.read_since(cursor)  # Notices the new epoch and starts over
+    assert list(records["timestamp"]) == [100.0, 101.0]
+    assert cursor == 2
+    assert reader.writer_pid == os.getpid()
+    reader.close()
+    writer.close()
+
+
+def test_restarted_reports_each_new_writer_once(path):
+    writer = SharedFeedWriter(path, capacity=8)
+    reader = SharedFeedReader(path)
+    assert not reader.restarted()
+    writer.close()
+    writer = SharedFeedWriter(path, capacity=16)  # A bigger ring grows the file; the reader re-maps it
+    assert reader.restarted()
+    assert not reader.restarted()
+    assert reader.capacity == 16
+    reader.close()
+    writer.close()
+
+
+def test_write_in_progress_invalidates_a_read(path):
+    writer = SharedFeedWriter(path, capacity=8)
+    reader = SharedFeedReader(path)
+    write(writer, 0, 1)
+    seq = reader.begin()
+    copy = reader.records[0].copy()
+    assert reader.valid(seq)
+    writer.write(sample(1))
+    assert not reader.valid(seq)
+    assert copy["timestamp"] == 0.0
+    reader.close()
+    writer.close()
+
+
+def test_writer_refuses_a_planted_symlink_or_foreign_file(tmp_path):
+    victim = tmp_path / "victim"
+    victim.write_bytes(b"keep")
+    link = tmp_path / "feed"
+    link.symlink_to(victim)
+    with pytest.raises(OSError):
+        SharedFeedWriter(str(link))
+    assert victim.read_bytes() == b"keep"
+
+    foreign = tmp_path / "foreign"
+    foreign.write_bytes(b"")
+    if os.geteuid() == 0:
+        os.chown(foreign, 4242, -1)
+        with pytest.raises(PermissionError):
+            SharedFeedWriter(str(foreign))
+        assert foreign.stat().st_size == 0
@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pytest
+
+import telemetry_format
+
+
+def records(timestamps):
+    out = np.zeros(len(timestamps), dtype=telemetry_format.RECORD_DTYPE)
+    out["timestamp"] = timestamps
+    return out
+
+
+def test_torn_last_record_is_cut_before_appending(tmp_path):
+    path = str(tmp_path / "log.tlm")
+    telemetry_format.write_telemetry(path, records([1.0, 2.0, 3.0]))
+    os.truncate(path, os.path.getsize(path) - 10)
+    telemetry_format.check_appendable(path)
+    with open(path, "ab") as f:
+        f.write(records([4.0]).tobytes())
+    assert list(telemetry_format.open_telemetry(path)["timestamp"]) == [1.0, 2.0, 4.0]
+
+
+def test_torn_header_starts_the_file_over(tmp_path):
+    path = str(tmp_path / "log.tlm")
+    with open(path, "wb") as f:
+        f.write(telemetry_format.build_header()[:40])
+    telemetry_format.check_appendable(path)
+    assert os.path.getsize(path) == 0
+
+
+def test_foreign_file_is_refused(tmp_path):
+    path = str(tmp_path / "log.tlm")
+    with open(path, "wb") as f:
+        f.write(b"not telemetry")
+    with pytest.raises(ValueError):
+        telemetry_format.check_appendable(path)
+    assert os.path.getsize(path) == 13
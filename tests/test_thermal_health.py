@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+import thermal_health
+
+
+@pytest.mark.parametrize("thresholds", [(40, 55, 20), (20, 35, 20), (40, 40, 40)])
+def test_scalar_and_vectorized_scores_agree(thresholds):
+    temps = np.linspace(-10.0, 100.0, 2201)
+    bulk = thermal_health.calculate_health(temps, *thresholds)
+    assert list(bulk) == [thermal_health.health_score(float(t), *thresholds) for t in temps]
+
+
+def test_scalar_input_returns_a_float():
+    assert thermal_health.calculate_health(30, 40, 55, 20) == 90.0
+    assert isinstance(thermal_health.calculate_health(70.0, 40, 55, 20), float)
@@ -0,0 +1,37 @@
+from throttle_detector import ThrottleDetector
+
+
+def feed(detector, samples, start=0.0):
+    """Feed (throttled?) flags one second apart after a cool warm-up at full frequency."""
+    for t in range(5):
+        detector.update(start + t, 60.0, 90.0, 3000.0, 80.0)
+    for t, throttled in enumerate(samples, 5):
+        detector.update(start + t, 90.0, 90.0, 2000.0 if throttled else 3000.0, 80.0)
+
+
+def test_episode_spans_first_to_last_throttled_sample():
+    detector = ThrottleDetector(min_samples=3)
+    # Throttled at t=5..10, clean from t=11
+    feed(detector, [True] * 6 + [False] * 3)
+    (episode,) = detector.episodes
+    assert episode.start == 5.0
+    assert episode.end == 10.0
+    assert round(episode.depth, 3) == 0.333
+
+
+def test_short_clean_run_does_not_split_an_episode():
+    detector = ThrottleDetector(min_samples=2)
+    feed(detector, [True, True, False, True, True, False, False])
+    (episode,) = detector.episodes
+    assert (episode.start, episode.end) == (5.0, 9.0)
+
+
+def test_subscribers_see_the_episode_open_and_close():
+    detector = ThrottleDetector(min_samples=2)
+    seen = []
+    detector.subscribe(seen.append)
+    feed(detector, [True, True, True, False])
+    assert [(e.start, e.end) for e in seen] == [(5.0, None)]
+    detector.update(9.0, 90.0, 90.0, 3000.0, 80.0)
+    assert [(e.start, e.end) for e in seen] == [(5.0, None), (5.0, 7.0)]
+    assert seen[-1] == detector.episodes[-1]
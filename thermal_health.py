@@ -0,0 +1,49 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import numpy as np
+
+
+def health_score(temp, warning_threshold, critical_threshold, optimal_temp_min):
+    """System health % for one temperature; plain Python, for the per-sample path.
+
+    100 up to the optimal minimum, falling to 80 at the warning threshold,
+    to 40 at the critical threshold, then 5 points per °C beyond it.
+    """
+    if temp <= optimal_temp_min:
+        return 100.0
+    if temp >= critical_threshold:
+        health = 40 - (temp - critical_threshold) * 5  # More gradual decline
+    elif temp >= warning_threshold:
+        # Linear between warning and critical; the range guards keep bad thresholds from dividing by zero
+        health = 80 - (temp - warning_threshold) / max(critical_threshold - warning_threshold, 1e-9) * 40
+    else:
+        # Gradual decline between optimal and warning
+        health = 100 - (temp - optimal_temp_min) / max(warning_threshold - optimal_temp_min, 1e-9) * 20
+    return float(health) if health > 0 else 0.0
+
+
+def calculate_health(temps, warning_threshold, critical_threshold, optimal_temp_min):
+    """System health % for one temperature or a whole array of them.
+
+    Same scale as health_score(). Returns a float for scalar input and an
+    array otherwise; only arrays go through NumPy, whose per-call overhead
+    would dominate a single reading.
+    """
+    if isinstance(temps, (int, float)):
+        return health_score(temps, warning_threshold, critical_threshold, optimal_temp_min)
+    t = np.asarray(temps, dtype=np.float64)
+    # Guard the ranges so misconfigured thresholds cannot divide by zero
+    warning_range = max(critical_threshold - warning_threshold, 1e-9)
+    optimal_range = max(warning_threshold - optimal_temp_min, 1e-9)
+
+    health = np.select(
+        [t <= optimal_temp_min, t >= critical_threshold, t >= warning_threshold],
+        [100.0,
+         40 - (t - critical_threshold) * 5,  # More gradual decline
+         80 - (t - warning_threshold) / warning_range * 40],  # Linear between warning and critical
+        # Gradual decline between optimal and warning
+        default=100 - (t - optimal_temp_min) / optimal_range * 20)
+    np.maximum(health, 0, out=health)
+    return float(health) if health.ndim == 0 else health
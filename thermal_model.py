@@ -0,0 +1,152 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+from collections import namedtuple
+
+import numpy as np
+
+from trend_predictor import Prediction
+
+FORECAST_HORIZONS = (5, 30, 120)  # Seconds ahead
+
+# horizons: seconds ahead; values/low/high: forecast and confidence bounds at each horizon (arrays);
+# steady_state: temperature the model settles at with the current power and fan speed, None if unstable
+Forecast = namedtuple("Forecast", ["horizons", "values", "low", "high", "steady_state"])
+
+# Regressors are scaled to similar magnitudes so the covariance stays well conditioned
+_TEMP_SCALE = 100.0
+_POWER_SCALE = 100.0
+
+
+class RcThermalModel:
+    """Lumped RC thermal model of the CPU fitted online by recursive least squares.
+
+    The package is treated as one heat capacity C fed by the estimated power
+    P and cooled through a conductance that grows with fan speed f (0-1):
+
+        C dT/dt = P - (g0 + g1 f) (T - T_ambient)
+
+    which is linear in its parameters once expanded:
+
+        dT/dt = θ0 + θ1 T + θ2 P + θ3 f T + θ4 f
+
+    Each sample adds one observation of dT/dt over the interval that just
+    ended, so irregular sampling intervals are fine. The forgetting factor
+    lets the fit follow slow changes (dust, ambient, a different cooler).
+
+    For fixed P and f the model is a first-order system, so a forecast at any
+    set of horizons is one closed-form exp() over an array:
+    T(h) = T_ss + (T - T_ss) e^(a h).
+    """
+
+    def __init__(self, horizons=FORECAST_HORIZONS, forgetting=0.999, min_samples=30, max_gap=30.0,
+                 power_smoothing=0.3, cov_limit=1e4, z=1.96):
+        self.horizons = tuple(float(h) for h in sorted(horizons))
+        self._horizons = np.array(self.horizons)
+        self.forgetting = forgetting
+        self.min_samples = min_samples  # Observations needed before forecasting
+        self.max_gap = max_gap  # Longer gaps between samples are not used as observations
+        self.power_smoothing = power_smoothing  # EWMA weight of the newest power in forecasts
+        self.cov_limit = cov_limit  # Cap on the covariance trace
+        self.z = z  # Width of the confidence bounds in standard errors (1.96 ~ 95%)
+        self.reset()
+
+    def reset(self):
+        self.theta = np.zeros(5)
+        self._cov = np.eye(5) * 1e3
+        self.observations = 0
+        self._residual_var = 0.0  # EWMA of squared dT/dt prediction errors, (°C/s)²
+        self._mean_dt = 1.0
+        self._last = None  # (timestamp, temperature, power)
+        self._power = None  # Smoothed power, so one noisy usage reading does not swing the forecast
+
+    @staticmethod
+    def _regressors(temp, power, fan):
+        t = temp / _TEMP_SCALE
+        return np.array([1.0, t, power / _POWER_SCALE, fan * t, fan])
+
+    def update(self, timestamp, temp, power, fan_speed):
+        """Add a sample. `fan_speed` (%) is the speed the fan ran at since the previous sample."""
+        last, self._last = self._last, (timestamp, temp, power)
+        self._power = power if self._power is None else self._power + self.power_smoothing * (power - self._power)
+        if last is None:
+            return
+        dt = timestamp - last[0]
+        if not 0 < dt <= self.max_gap:
+            return
+        x = self._regressors(last[1], last[2], fan_speed / 100.0)
+        rate = (temp - last[1]) / dt
+        error = rate - float(self.theta @ x)
+
+        # Standard RLS step with exponential forgetting
+        cov = self._cov
+        px = cov @ x
+        gain = px / (self.forgetting + float(x @ px))
+        self.theta += gain * error
+        cov -= gain[:, None] * px
+        cov /= self.forgetting
+        # Keep the covariance from blowing up in directions the data does not excite
+        trace = cov.trace()
+        if trace > self.cov_limit:
+            cov *= self.cov_limit / trace
+
+        self.observations += 1
+        self._residual_var += 0.05 * (error * error - self._residual_var)
+        self._mean_dt += 0.05 * (dt - self._mean_dt)
+
+    @property
+    def ready(self):
+        return self.observations >= self.min_samples
+
+    def dynamics(self, power, fan_speed):
+        """Return (a, b) of dT/dt = a T + b for the given power and fan speed (%)."""
+        fan = fan_speed / 100.0
+        theta = self.theta
+        a = (theta[1] + theta[3] * fan) / _TEMP_SCALE
+        b = theta[0] + theta[2] * power / _POWER_SCALE + theta[4] * fan
+        return a, b
+
+    def forecast(self, fan_speed, power=None, temp=None):
+        """Forecast at every horizon assuming power and fan speed stay as they are.
+
+        Returns None until the model is fitted or while the fit is not a
+        stable (cooling) system.
+        """
+        if not self.ready or self._last is None:
+            return None
+        temp = self._last[1] if temp is None else temp
+        power = self._power if power is None else power
+        a, b = self.dynamics(power, fan_speed)
+        if a >= -1e-4 or self.theta[2] <= 0:
+            # Not physical (yet): the CPU must cool towards a steady state and heat up with power.
+            # Closed-loop data that the controller keeps flat can leave the fit like this for a while.
+            return None
+        steady = -b / a
+        decay = np.exp(a * self._horizons)
+        values = steady + (temp - steady) * decay
+        # Noise in dT/dt integrated through the first-order response (Ornstein-Uhlenbeck variance)
+        q = self._residual_var * self._mean_dt
+        spread = self.z * np.sqrt(q * (1.0 - decay * decay) / (-2.0 * a))
+        return Forecast(self.horizons, values, values - spread, values + spread, float(steady))
+
+    def time_constant(self, fan_speed):
+        """Seconds for 63% of a temperature step at this fan speed, None if unstable."""
+        a, _ = self.dynamics(0.0, fan_speed)
+        return -1.0 / a if a < 0 else None
+
+
+def value_at(forecast, horizon):
+    """Forecast (value, low, high) at `horizon` seconds, interpolated between the forecast horizons."""
+    if horizon in forecast.horizons:
+        i = forecast.horizons.index(horizon)
+        return float(forecast.values[i]), float(forecast.low[i]), float(forecast.high[i])
+    return tuple(float(np.interp(horizon, forecast.horizons, column))
+                 for column in (forecast.values, forecast.low, forecast.high))
+
+
+def prediction_from(forecast, temp, horizon, interval):
+    """Express the forecast at `horizon` seconds as a trend_predictor.Prediction for existing consumers."""
+    value, low, high = value_at(forecast, horizon)
+    samples = max(1, round(horizon / interval))
+    return Prediction(value, low, high, float(temp), (value - temp) / samples, samples)
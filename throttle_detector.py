@@ -0,0 +1,153 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+from collections import deque, namedtuple
+
+import numpy as np
+
+ThrottleEpisode = namedtuple("ThrottleEpisode", [
+    "start",              # timestamp of the first throttled sample
+    "end",                # timestamp of the last throttled sample, None while ongoing
+    "depth",              # deepest frequency drop below the baseline, as a fraction (0.25 = 25 %)
+    "min_frequency",      # lowest frequency seen on a throttled core, MHz
+    "baseline_frequency", # frequency the drop is measured against, MHz
+    "peak_temperature",   # hottest reading during the episode, °C
+    "cores",              # most cores throttled at once
+    "correlation",        # frequency/temperature correlation over the window when the episode started
+])
+
+
+class ThrottleDetector:
+    """Streaming thermal-throttling detector.
+
+    A core counts as throttled when it is busy (usage >= `usage_threshold`),
+    the CPU is hot (temperature >= the threshold passed to update()) and its
+    frequency has dropped at least `drop_threshold` below its baseline. The
+    baseline is the highest frequency the core reached over the last
+    `window` samples while it was not throttled, so it follows turbo and
+    power-plan changes but is frozen during an episode.
+
+    An episode opens after `min_samples` consecutive throttled samples and
+    closes after the same number of clean ones; its start and end are the
+    first and last throttled samples all the same. Callbacks registered with
+    subscribe() receive the episode when it opens (end None) and again when
+    it closes. Works on one aggregate frequency or on per-core arrays; the
+    core count may change at any time.
+    """
+
+    def __init__(self, window=60, usage_threshold=80.0, drop_threshold=0.10, min_samples=2, max_episodes=1000):
+        self.window = window
+        self.usage_threshold = usage_threshold
+        self.drop_threshold = drop_threshold
+        self.min_samples = min_samples
+        self.episodes = deque(maxlen=max_episodes)
+        self.current = None  # Open ThrottleEpisode
+        self.subscribers = []
+        self._first_hit = None  # Timestamp of the first sample in the current run of throttled ones
+        self._last_hit = None  # Timestamp of the latest throttled sample
+        self._reset(1)
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def _publish(self, episode):
+        for callback in self.subscribers:
+            callback(episode)
+
+    def _reset(self, cores):
+        self._cores = cores
+        self._freqs = np.zeros((self.window, cores))  # Ring of non-throttled frequencies (0 = unknown)
+        self._next = 0
+        self._hits = 0  # Consecutive throttled samples
+        self._clear = 0  # Consecutive clean samples during an episode
+        # Running sums for the frequency/temperature correlation over the last `window` samples
+        self._pairs = deque()
+        self._sums = [0.0] * 5  # f, t, f*f, t*t, f*t
+
+    def update(self, timestamp, temperature, usage, frequency, temp_threshold):
+        """Feed one sample; `usage` and `frequency` may be scalars or per-core arrays.
+
+        Returns the current throttle depth as a fraction, 0.0 when not throttling.
+        """
+        frequency = np.atleast_1d(np.asarray(frequency, dtype=np.float64))
+        if frequency.shape[0] != self._cores:
+            self._reset(frequency.shape[0])
+        mean_freq = float(frequency.mean())
+        if mean_freq == mean_freq:  # Skip NaN readings
+            self._track_correlation(mean_freq, temperature)
+
+        count = 0
+        if temperature >= temp_threshold:
+            # Only a hot CPU can be thermally throttled, so the cool path skips the comparison entirely
+            baseline = self._freqs.max(axis=0)
+            drop = 1.0 - frequency / np.maximum(baseline, 1e-9)  # Unknown baseline gives a large negative drop
+            throttled = (np.asarray(usage) >= self.usage_threshold) & (drop >= self.drop_threshold)
+            count = int(np.count_nonzero(throttled))
+
+        if count:
+            if not self._hits:
+                self._first_hit = timestamp
+            self._hits += 1
+            self._clear = 0
+            self._last_hit = timestamp
+            i = int(np.argmax(np.where(throttled, drop, -np.inf)))
+            depth = float(drop[i])
+        else:
+            self._hits = 0
+            depth = 0.0
+            # Only clean samples move the baseline, so a long episode cannot redefine "normal"
+            self._freqs[self._next] = np.nan_to_num(frequency)
+            self._next = (self._next + 1) % self.window
+
+        if self.current is None:
+            if self._hits >= self.min_samples:
+                self.current = ThrottleEpisode(self._first_hit, None, depth, float(frequency[i]),
+                                               float(baseline[i]), float(temperature), count, self.correlation())
+                self._publish(self.current)
+                return depth
+            return 0.0
+
+        if count:
+            episode = self.current
+            self.current = episode._replace(
+                depth=max(episode.depth, depth),
+                min_frequency=min(episode.min_frequency, float(frequency[i])),
+                peak_temperature=max(episode.peak_temperature, float(temperature)),
+                cores=max(episode.cores, count))
+            return depth
+
+        self._clear += 1
+        if self._clear >= self.min_samples:
+            episode = self.current._replace(end=self._last_hit)
+            self.episodes.append(episode)
+            self.current = None
+            self._publish(episode)
+        return 0.0
+
+    def _track_correlation(self, frequency, temperature):
+        pair = (frequency, temperature, frequency * frequency, temperature * temperature, frequency * temperature)
+        self._pairs.append(pair)
+        sums = self._sums
+        for k in range(5):
+            sums[k] += pair[k]
+        if len(self._pairs) > self.window:
+            old = self._pairs.popleft()
+            for k in range(5):
+                sums[k] -= old[k]
+
+    def correlation(self):
+        """Pearson correlation of mean frequency and temperature over the window, None if undefined."""
+        n = len(self._pairs)
+        if n < 3:
+            return None
+        f, t, ff, tt, ft = self._sums
+        var_f = ff - f * f / n
+        var_t = tt - t * t / n
+        if var_f <= 1e-9 or var_t <= 1e-9:
+            return None
+        return float((ft - f * t / n) / np.sqrt(var_f * var_t))
+
+    def all_episodes(self):
+        """Finished episodes plus the open one, oldest first."""
+        return list(self.episodes) + ([self.current] if self.current is not None else [])
@@ -0,0 +1,129 @@
+# Copyright (c) 2025 Arkaprava
+# This software is licensed under the MIT License and the OpenHardwareMonitor License.
+# See LICENSE file in the project root for full license information and the OpenHardwareMonitor License in the OpenHardwareMonitor folder.
+
+import math
+from collections import deque, namedtuple
+
+# value: forecast at the horizon, low/high: confidence bounds around it,
+# fitted: trend value at the latest sample, slope: °C per sample, horizon: samples ahead
+Prediction = namedtuple("Prediction", ["value", "low", "high", "fitted", "slope", "horizon"])
+
+# Rebuild the running sums from scratch this often to bound floating point drift
+RESYNC_EVERY = 4096
+
+
+class OnlineTrendPredictor:
+    """Streaming least-squares trend line with O(1) work per sample.
+
+    mode="window" fits the last `window` samples exactly like an ordinary
+    linear regression over them. mode="ewma" weights every past sample by
+    `decay ** age` instead, which reacts smoothly without a hard cut-off.
+    """
+
+    def __init__(self, window=10, horizon=10, mode="window", decay=0.8, z=1.96, min_samples=3):
+        if mode not in ("window", "ewma"):
+            raise ValueError(f"Unknown prediction mode: {mode}")
+        if window < 2:
+            raise ValueError("Prediction window must hold at least 2 samples")
+        if not 0 < decay < 1:
+            raise ValueError("Decay must be between 0 and 1")
+        self.window = window
+        self.horizon = horizon
+        self.mode = mode
+        self.decay = decay
+        self.z = z  # Width of the confidence bounds in standard errors (1.96 ~ 95%)
+        self.min_samples = max(3, min_samples)
+        self.reset()
+
+    def reset(self):
+        self._values = deque(maxlen=self.window)
+        self._updates = 0
+        # Window mode: x = 0..n-1 from oldest to newest
+        # EWMA mode: x = 0 for the newest sample, -1, -2, ... for older ones
+        self._w = self._w2 = self._sx = self._sxx = 0.0
+        self._sy = self._sxy = self._syy = 0.0
+
+    def __len__(self):
+        return len(self._values)
+
+    def update(self, y):
+        y = float(y)
+        if self.mode == "window":
+            self._update_window(y)
+        else:
+            self._update_ewma(y)
+        self._values.append(y)
+        self._updates += 1
+        if self.mode == "window" and self._updates % RESYNC_EVERY == 0:
+            self._resync_window()
+
+    def _update_window(self, y):
+        n = len(self._values)
+        if n < self.window:
+            # New sample lands at x = n, older samples keep their positions
+            self._sxy += n * y
+            self._sy += y
+            self._syy += y * y
+            n += 1
+            self._w = float(n)
+            self._sx = n * (n - 1) / 2.0
+            self._sxx = (n - 1) * n * (2 * n - 1) / 6.0
+            return
+        # Full window: drop the oldest (x = 0) and shift everyone one step left
+        oldest = self._values[0]
+        self._sxy += -(self._sy - oldest) + (n - 1) * y
+        self._sy += y - oldest
+        self._syy += y * y - oldest * oldest
+
+    def _update_ewma(self, y):
+        lam = self.decay
+        # Existing samples age by one step (x -> x - 1) and decay, then the new one enters at x = 0
+        self._sxx = lam * (self._sxx - 2 * self._sx + self._w)
+        self._sx = lam * (self._sx - self._w)
+        self._sxy = lam * (self._sxy - self._sy)
+        self._sy = lam * self._sy + y
+        self._syy = lam * self._syy + y * y
+        self._w = lam * self._w + 1.0
+        self._w2 = lam * lam * self._w2 + 1.0
+
+    def _resync_window(self):
+        values = list(self._values)
+        self.reset()
+        for y in values:
+            self._update_window(y)
+            self._values.append(y)
+
+    def fit(self):
+        """Return (intercept, slope, residual standard deviation, effective sample count)."""
+        if len(self._values) < self.min_samples:
+            return None
+        w, sx, sxx, sy, sxy, syy = self._w, self._sx, self._sxx, self._sy, self._sxy, self._syy
+        denom = w * sxx - sx * sx
+        if denom <= 0:
+            return None
+        slope = (w * sxy - sx * sy) / denom
+        intercept = (sy - slope * sx) / w
+        n_eff = w if self.mode == "window" else (w * w) / self._w2
+        sse = max(0.0, syy - intercept * sy - slope * sxy)
+        dof = n_eff - 2
+        sigma = math.sqrt(sse / w * n_eff / dof) if dof > 0 else 0.0
+        return intercept, slope, sigma, n_eff
+
+    def predict(self, horizon=None):
+        """Forecast `horizon` samples past the latest one, with confidence bounds."""
+        horizon = self.horizon if horizon is None else horizon
+        fit = self.fit()
+        if fit is None:
+            return None
+        intercept, slope, sigma, n_eff = fit
+        w, sx, sxx = self._w, self._sx, self._sxx
+        latest_x = w - 1 if self.mode == "window" else 0.0
+        target_x = latest_x + horizon
+
+        value = intercept + slope * target_x
+        x_mean = sx / w
+        spread = (sxx - sx * sx / w) * n_eff / w
+        se = sigma * math.sqrt(1 + 1 / n_eff + (target_x - x_mean) ** 2 / spread) if spread > 0 else 0.0
+        return Prediction(value, value - self.z * se, value + self.z * se,
+                          intercept + slope * latest_x, slope, horizon)